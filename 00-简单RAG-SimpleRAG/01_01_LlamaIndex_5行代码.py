@@ -10,11 +10,14 @@ set OPENAI_API_KEY=your-api-key
 """
 
 # 第一行代码：导入相关的库
-from llama_index.core import VectorStoreIndex, SimpleDirectoryReader 
-# 第二行代码：加载数据
-documents = SimpleDirectoryReader(input_files=["90-文档-Data/黑悟空/设定.txt"]).load_data() 
-# 第三行代码：构建索引
-index = VectorStoreIndex.from_documents(documents)
+import sys
+sys.path.append("01-数据导入-DataLoading")  # 共用的file_hashing模块
+from persistent_index import load_or_build_index
+# 第二、三行代码：加载数据并构建索引（持久化到磁盘，重启时只重新嵌入新增或修改过的文件）
+index = load_or_build_index(
+    "storage/llamaindex_openai",
+    input_files=["90-文档-Data/黑悟空/设定.txt"]
+)
 # 第四行代码：创建问答引擎
 query_engine = index.as_query_engine()
 # 第五行代码: 开始问答
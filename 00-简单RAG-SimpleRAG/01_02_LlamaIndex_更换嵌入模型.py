@@ -1,5 +1,7 @@
 # 导入相关的库
-from llama_index.core import VectorStoreIndex, SimpleDirectoryReader
+import sys
+sys.path.append("01-数据导入-DataLoading")  # 共用的file_hashing模块
+from persistent_index import load_or_build_index
 from llama_index.embeddings.huggingface import HuggingFaceEmbedding # 需要pip install llama-index-embeddings-huggingface
 
 # 加载本地嵌入模型
@@ -9,12 +11,10 @@ embed_model = HuggingFaceEmbedding(
     model_name="BAAI/bge-small-zh" # 模型路径和名称（首次执行时会从HuggingFace下载）
     )
 
-# 加载数据
-documents = SimpleDirectoryReader(input_files=["90-文档-Data/黑悟空/设定.txt"]).load_data() 
-
-# 构建索引
-index = VectorStoreIndex.from_documents(
-    documents,
+# 加载数据并构建索引（持久化到磁盘，重启时只重新嵌入新增或修改过的文件）
+index = load_or_build_index(
+    "storage/llamaindex_bge_small_zh",
+    input_files=["90-文档-Data/黑悟空/设定.txt"],
     embed_model=embed_model
 )
 
@@ -1,5 +1,7 @@
 # 导入相关的库
-from llama_index.core import VectorStoreIndex, SimpleDirectoryReader
+import sys
+sys.path.append("01-数据导入-DataLoading")  # 共用的file_hashing模块
+from persistent_index import load_or_build_index
 from llama_index.embeddings.huggingface import HuggingFaceEmbedding # 需要pip install llama-index-embeddings-huggingface
 from llama_index.llms.deepseek import DeepSeek  # 需要pip install llama-index-llms-deepseek
 
@@ -23,13 +25,11 @@ llm = DeepSeek(
     api_key=os.getenv("DEEPSEEK_API_KEY")  # 从环境变量获取API key
 )
 
-# 加载数据
-documents = SimpleDirectoryReader(input_files=["90-文档-Data/黑悟空/设定.txt"]).load_data() 
-
-# 构建索引
-index = VectorStoreIndex.from_documents(
-    documents,
-    # llm=llm  # 设置构建索引时的语言模型（一般不需要）
+# 加载数据并构建索引（持久化到磁盘，重启时只重新嵌入新增或修改过的文件）
+index = load_or_build_index(
+    "storage/llamaindex_bge_small_zh",
+    input_files=["90-文档-Data/黑悟空/设定.txt"],
+    embed_model=Settings.embed_model
 )
 
 # 创建问答引擎
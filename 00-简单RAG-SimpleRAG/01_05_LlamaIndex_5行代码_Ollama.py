@@ -19,7 +19,9 @@
 """
 
 # 第一行代码：导入相关的库
-from llama_index.core import VectorStoreIndex, SimpleDirectoryReader
+import sys
+sys.path.append("01-数据导入-DataLoading")  # 共用的file_hashing模块
+from persistent_index import load_or_build_index
 from llama_index.embeddings.huggingface import HuggingFaceEmbedding
 from llama_index.llms.ollama import Ollama # 需要pip install llama-index-llms-ollama
 from dotenv import load_dotenv
@@ -37,12 +39,11 @@ llm = Ollama(
     request_timeout=300.0
 )
 
-# 第二行代码：加载数据
-documents = SimpleDirectoryReader(input_files=["90-文档-Data/黑悟空/设定.txt"]).load_data() 
 
-# 第三行代码：构建索引
-index = VectorStoreIndex.from_documents(
-    documents,
+# 第二、三行代码：加载数据并构建索引（持久化到磁盘，重启时只重新嵌入新增或修改过的文件）
+index = load_or_build_index(
+    "storage/llamaindex_bge_small_zh",
+    input_files=["90-文档-Data/黑悟空/设定.txt"],
     embed_model=embed_model
 )
 
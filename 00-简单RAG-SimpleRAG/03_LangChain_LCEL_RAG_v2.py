@@ -18,9 +18,9 @@ from langchain_openai import OpenAIEmbeddings
 embeddings = OpenAIEmbeddings()
 
 # 4. 创建向量存储
-from langchain_core.vectorstores import InMemoryVectorStore
+from matrix_vector_store import MatrixVectorStore # 矩阵化的InMemoryVectorStore替代品
 
-vectorstore = InMemoryVectorStore(embeddings)
+vectorstore = MatrixVectorStore(embeddings)
 vectorstore.add_documents(all_splits)
 
 # 5. 创建检索器
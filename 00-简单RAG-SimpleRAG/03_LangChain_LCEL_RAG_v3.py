@@ -27,9 +27,9 @@ embeddings = HuggingFaceEmbeddings(
 )
 
 # 4. 创建向量存储
-from langchain_core.vectorstores import InMemoryVectorStore
+from matrix_vector_store import MatrixVectorStore # 矩阵化的InMemoryVectorStore替代品
 
-vectorstore = InMemoryVectorStore(embeddings)
+vectorstore = MatrixVectorStore(embeddings)
 vectorstore.add_documents(all_splits)
 
 # 5. 创建检索器
@@ -93,6 +93,32 @@ print("LLM输出:", llm_output)
 final_output = StrOutputParser().invoke(llm_output)
 print("最终输出:", final_output)
 
-# 9. 执行查询
+# 9. 流式执行查询：边生成边输出，并记录首字延迟、生成速度和总延迟（只检索和生成一次）
+from stream_generation import LangChainBackend, print_stream
 question = "黑悟空有哪些游戏场景？"
-response = chain.invoke(question) # 同步，可以换成异步执行
+answer, metrics = print_stream(LangChainBackend(chain, model=llm.model), question)
+
+# 10. 异步并发批量执行：限制并发数，单个请求超时后指数退避重试
+import asyncio
+import time
+from async_batch_runner import arun_rag_pipeline, print_batch_summary
+questions = [
+    "黑悟空有哪些游戏场景？",
+    "黑悟空的主角是谁？",
+    "黑悟空是哪家公司开发的？",
+    "黑悟空有哪些BOSS？",
+]
+start = time.perf_counter()
+# 流水线模式：一个问题检索完成后立即进入生成阶段，与其它问题的检索重叠执行
+results = asyncio.run(arun_rag_pipeline(
+    retriever,
+    prompt | llm | StrOutputParser(),
+    questions,
+    format_docs=lambda docs: "\n\n".join(doc.page_content for doc in docs),
+    retrieval_concurrency=4,
+    generation_concurrency=4,
+    timeout=300.0
+))
+print_batch_summary(results, time.perf_counter() - start)
+for r in results:
+    print(f"\n问题: {r.input}\n回答: {r.output}")
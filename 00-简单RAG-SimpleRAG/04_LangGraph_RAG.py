@@ -19,8 +19,8 @@ embeddings = HuggingFaceEmbeddings(
 )
 
 # 4. 创建向量存储aa
-from langchain_core.vectorstores import InMemoryVectorStore
-vector_store = InMemoryVectorStore(embeddings)
+from matrix_vector_store import MatrixVectorStore # 矩阵化的InMemoryVectorStore替代品
+vector_store = MatrixVectorStore(embeddings)
 vector_store.add_documents(all_splits)
 
 # 5. 定义RAG提示词
@@ -41,10 +41,10 @@ def retrieve(state: State):
     retrieved_docs = vector_store.similarity_search(state["question"])
     return {"context": retrieved_docs}
 
-# 8. 定义生成步骤
+# 8. 定义生成步骤（LLM客户端只构造一次，每次请求复用）
+from langchain_openai import ChatOpenAI
+llm = ChatOpenAI(model="gpt-4")
 def generate(state: State):
-    from langchain_openai import ChatOpenAI
-    llm = ChatOpenAI(model="gpt-4")
     docs_content = "\n\n".join(doc.page_content for doc in state["context"])
     messages = prompt.invoke({"question": state["question"], "context": docs_content})
     response = llm.invoke(messages)
@@ -59,8 +59,10 @@ graph = (
     .compile()
 )
 
-# 10. 运行查询
+# 10. 流式运行查询：messages模式逐个产出generate节点中LLM生成的文本片段，只检索和生成一次
+from stream_generation import LangChainBackend, print_stream
 question = "黑悟空有哪些游戏场景？"
-response = graph.invoke({"question": question})
 print(f"\n问题: {question}")
-print(f"答案: {response['answer']}")
+print("答案: ", end="")
+backend = LangChainBackend(graph, model=llm.model_name, stream_kwargs={"stream_mode": "messages"})
+answer, metrics = print_stream(backend, {"question": question})
@@ -24,8 +24,8 @@ embeddings = HuggingFaceEmbeddings(
 )
 
 # 4. 创建向量存储aa
-from langchain_core.vectorstores import InMemoryVectorStore
-vector_store = InMemoryVectorStore(embeddings)
+from matrix_vector_store import MatrixVectorStore # 矩阵化的InMemoryVectorStore替代品
+vector_store = MatrixVectorStore(embeddings)
 vector_store.add_documents(all_splits)
 
 # 5. 定义RAG提示词
@@ -47,9 +47,9 @@ def retrieve(state: State):
     return {"context": retrieved_docs}
 
 # 8. 定义生成步骤
+from langchain_ollama import ChatOllama
+llm = ChatOllama(model=os.getenv("OLLAMA_MODEL")) # LLM客户端只构造一次，每次请求复用
 def generate(state: State):
-    from langchain_ollama import ChatOllama
-    llm = ChatOllama(model=os.getenv("OLLAMA_MODEL"))
     docs_content = "\n\n".join(doc.page_content for doc in state["context"])
     messages = prompt.invoke({"question": state["question"], "context": docs_content})
     response = llm.invoke(messages)
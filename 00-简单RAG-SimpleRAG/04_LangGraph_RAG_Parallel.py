@@ -0,0 +1,156 @@
+# LangGraph并行检索版：稠密向量、BM25、元数据标签三路检索并行扇出，再用RRF融合
+# 每个节点把自己的耗时写入state["timings"]，多次运行后统计各节点的P50/P95
+import operator
+import time
+from dotenv import load_dotenv
+# 加载环境变量
+load_dotenv()
+
+# 1. 加载文档
+from langchain_community.document_loaders import WebBaseLoader
+loader = WebBaseLoader(
+    web_paths=("https://zh.wikipedia.org/wiki/黑神话：悟空",)
+)
+docs = loader.load()
+
+# 2. 文档分块
+from langchain_text_splitters import RecursiveCharacterTextSplitter
+text_splitter = RecursiveCharacterTextSplitter(chunk_size=1000, chunk_overlap=200)
+all_splits = text_splitter.split_documents(docs)
+for i, doc in enumerate(all_splits):
+    doc.metadata["chunk_id"] = i
+
+# 3. 设置嵌入模型
+from langchain_huggingface import HuggingFaceEmbeddings
+embeddings = HuggingFaceEmbeddings(
+    model_name="BAAI/bge-small-zh-v1.5",
+    model_kwargs={'device': 'cpu'},
+    encode_kwargs={'normalize_embeddings': True}
+)
+
+# 4. 创建三路检索源
+# 4.1 稠密向量存储
+from matrix_vector_store import MatrixVectorStore
+vector_store = MatrixVectorStore(embeddings)
+vector_store.add_documents(all_splits)
+
+# 4.2 BM25检索器：中文没有空格分词，用字符二元组作为词项
+from langchain_community.retrievers import BM25Retriever # pip install rank_bm25
+def char_bigrams(text):
+    return [text[i:i + 2] for i in range(len(text) - 1)]
+bm25_retriever = BM25Retriever.from_documents(all_splits, preprocess_func=char_bigrams, k=4)
+
+# 4.3 元数据标签存储：给每个文本块打上出现过的关键词标签，按问题命中的标签数排序
+keywords = ["场景", "章节", "BOSS", "妖王", "二郎神", "猪八戒", "黄风岭", "火焰山",
+            "小西天", "花果山", "黑风山", "盘丝岭", "金箍棒", "变身", "法术", "音乐"]
+tag_index = {kw: [] for kw in keywords}
+for i, doc in enumerate(all_splits):
+    doc.metadata["tags"] = [kw for kw in keywords if kw in doc.page_content]
+    for kw in doc.metadata["tags"]:
+        tag_index[kw].append(i)
+
+# 5. 定义RAG提示词和语言模型（只构造一次，所有请求复用同一个客户端）
+from langchain import hub
+prompt = hub.pull("rlm/rag-prompt")
+from langchain_openai import ChatOpenAI
+llm = ChatOpenAI(model="gpt-4")
+
+# 6. 定义应用状态
+from typing import Annotated, Dict, List
+from typing_extensions import TypedDict
+from langchain_core.documents import Document
+class State(TypedDict):
+    question: str
+    dense_docs: List[Document]
+    bm25_docs: List[Document]
+    metadata_docs: List[Document]
+    context: List[Document]
+    answer: str
+    # 并行分支会同时写入timings，用字典合并作为reducer
+    timings: Annotated[Dict[str, float], operator.or_]
+
+def timed(name):
+    """节点装饰器：记录节点的墙钟耗时并写入state["timings"]"""
+    def decorator(func):
+        def wrapper(state: State):
+            start = time.perf_counter()
+            update = func(state)
+            update["timings"] = {name: time.perf_counter() - start}
+            return update
+        wrapper.__name__ = name
+        return wrapper
+    return decorator
+
+# 7. 定义三路并行检索节点
+@timed("dense_retrieve")
+def dense_retrieve(state: State):
+    return {"dense_docs": vector_store.similarity_search(state["question"], k=4)}
+
+@timed("bm25_retrieve")
+def bm25_retrieve(state: State):
+    return {"bm25_docs": bm25_retriever.invoke(state["question"])}
+
+@timed("metadata_retrieve")
+def metadata_retrieve(state: State):
+    hits = {}
+    for kw in keywords:
+        if kw in state["question"]:
+            for row in tag_index[kw]:
+                hits[row] = hits.get(row, 0) + 1
+    rows = sorted(hits, key=hits.get, reverse=True)[:4]
+    return {"metadata_docs": [all_splits[row] for row in rows]}
+
+# 8. 定义融合节点：RRF（倒数排名融合），按chunk_id去重
+@timed("fuse")
+def fuse(state: State, k=60, top_n=4):
+    scores, by_id = {}, {}
+    for results in [state["dense_docs"], state["bm25_docs"], state["metadata_docs"]]:
+        for rank, doc in enumerate(results):
+            chunk_id = doc.metadata["chunk_id"]
+            by_id[chunk_id] = doc
+            scores[chunk_id] = scores.get(chunk_id, 0) + 1 / (rank + k)
+    ranked = sorted(scores, key=scores.get, reverse=True)[:top_n]
+    return {"context": [by_id[chunk_id] for chunk_id in ranked]}
+
+# 9. 定义生成节点
+@timed("generate")
+def generate(state: State):
+    docs_content = "\n\n".join(doc.page_content for doc in state["context"])
+    messages = prompt.invoke({"question": state["question"], "context": docs_content})
+    response = llm.invoke(messages)
+    return {"answer": response.content}
+
+# 10. 构建和编译应用：START扇出到三个检索节点，三者都完成后汇聚到fuse
+from langgraph.graph import START, END, StateGraph # pip install langgraph
+builder = StateGraph(State)
+for node in [dense_retrieve, bm25_retrieve, metadata_retrieve, fuse, generate]:
+    builder.add_node(node.__name__, node)
+for node in ["dense_retrieve", "bm25_retrieve", "metadata_retrieve"]:
+    builder.add_edge(START, node)
+builder.add_edge(["dense_retrieve", "bm25_retrieve", "metadata_retrieve"], "fuse")
+builder.add_edge("fuse", "generate")
+builder.add_edge("generate", END)
+graph = builder.compile()
+
+# 11. 运行查询并统计各节点耗时
+import numpy as np
+questions = [
+    "黑悟空有哪些游戏场景？",
+    "黑悟空中有哪些BOSS？",
+    "二郎神在游戏中是什么角色？",
+    "游戏的音乐有什么特点？",
+]
+all_timings = []
+for question in questions:
+    start = time.perf_counter()
+    response = graph.invoke({"question": question})
+    response["timings"]["total"] = time.perf_counter() - start
+    all_timings.append(response["timings"])
+    print(f"\n问题: {question}")
+    print(f"答案: {response['answer']}")
+    print("节点耗时: " + "，".join(f"{name} {seconds * 1000:.1f}ms" for name, seconds in response["timings"].items()))
+
+print("\n各节点耗时统计:")
+for name in all_timings[0]:
+    values = np.array([t[name] for t in all_timings]) * 1000
+    print(f"{name}: P50 {np.percentile(values, 50):.1f}ms，P95 {np.percentile(values, 95):.1f}ms")
@@ -17,28 +17,24 @@ docs = [
     "游戏的音乐如同一首跨越千年的史诗。古琴与管弦交织出战斗的激昂，笛萧与木鱼谱写禅意空灵。而当悟空踏入重要场景时，古风配乐更是让人仿佛穿越回那个神话的年代。"
     ] 
 
-# 2. 设置嵌入模型
-from sentence_transformers import SentenceTransformer
-model = SentenceTransformer('sentence-transformers/all-MiniLM-L6-v2')
-doc_embeddings = model.encode(docs)
-print(f"文档向量维度: {doc_embeddings.shape}")
+# 2. 设置嵌入模型（带磁盘嵌入缓存，只有新增或修改过的文档才会重新嵌入）
+import sys
+sys.path.append("03-向量嵌入-Embedding")
+from embedding_cache import CachedSentenceTransformer
+model_name = 'sentence-transformers/all-MiniLM-L6-v2'
+model = CachedSentenceTransformer(model_name)
 
-# 3. 创建向量存储
-import faiss # pip install faiss-cpu
-import numpy as np
-dimension = doc_embeddings.shape[1]
-index = faiss.IndexFlatL2(dimension)
-index.add(doc_embeddings.astype('float32'))
-print(f"向量数据库中的文档数量: {index.ntotal}")
+# 3. 创建向量存储（持久化到磁盘，语料未变化时直接内存映射加载，无需重新嵌入）
+from faiss_engine import FaissRetrievalEngine
+engine = FaissRetrievalEngine("vector_store/scratch_rag")
+engine.load_or_build(docs, model.encode, model_name)
+print(f"向量数据库中的文档数量: {engine.ntotal}")
 
 # 4. 执行相似度检索
 question = "黑神话悟空的战斗系统有什么特点?"
-query_embedding = model.encode([question])[0]
-distances, indices = index.search(
-    np.array([query_embedding]).astype('float32'), 
-    k=3
-)
-context = [docs[idx] for idx in indices[0]]
+query_embedding = model.model.encode([question])  # 查询不走嵌入缓存，避免挤占语料向量的缓存位置
+distances, doc_ids = engine.search(query_embedding, k=3)
+context = [docs[idx] for idx in doc_ids[0]]
 print("\n检索到的相关文档:")
 for i, doc in enumerate(context, 1):
     print(f"[{i}] {doc}")
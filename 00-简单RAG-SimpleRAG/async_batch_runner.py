@@ -0,0 +1,166 @@
+"""
+LCEL RAG链的异步并发批量执行器
+功能：
+1. 用信号量限制并发数，避免压垮本地Ollama或远程API
+2. 每个请求单独设置超时，超时、限流、连接错误和5xx等临时错误按指数退避重试，其它错误直接失败
+3. 流水线模式：检索和生成拆成两个阶段，第N+1个问题的检索与第N个问题的生成重叠执行
+
+注意：超时只能取消协程。没有异步实现的Runnable（如只传了func的RunnableLambda、同步的自定义检索器）
+由LangChain放到线程池中执行，超时后线程里的调用不会被中断，会一直运行到结束，
+这段时间它不再占用信号量，实际并发可能超过max_concurrency；
+这类Runnable应在底层客户端上设置超时（如ChatOllama的client_kwargs={"timeout": ...}），或提供异步实现。
+"""
+import asyncio
+import random
+import time
+from dataclasses import dataclass
+from typing import Any, Optional
+
+
+# 视为临时错误的异常类名（按MRO匹配，不必导入openai、httpx、anthropic等库）
+TRANSIENT_ERROR_NAMES = {
+    "RateLimitError", "APITimeoutError", "APIConnectionError", "InternalServerError", "ServiceUnavailableError",
+    "TimeoutException", "NetworkError", "RemoteProtocolError",
+}
+
+
+def is_transient_error(error):
+    """超时、连接错误、HTTP 408/429/5xx 值得重试；参数错误、鉴权失败、解析错误等重试也不会成功"""
+    if isinstance(error, (asyncio.TimeoutError, TimeoutError, ConnectionError)):
+        return True
+    status = getattr(error, "status_code", None) or getattr(getattr(error, "response", None), "status_code", None)
+    if isinstance(status, int):
+        return status in (408, 429) or status >= 500
+    return any(cls.__name__ in TRANSIENT_ERROR_NAMES for cls in type(error).__mro__)
+
+
+@dataclass
+class BatchResult:
+    """单个请求的执行结果"""
+    index: int
+    input: Any
+    output: Any = None
+    error: Optional[str] = None
+    attempts: int = 0
+    latency: float = 0.0
+
+    @property
+    def ok(self):
+        return self.error is None
+
+
+async def _call_with_retry(runnable, value, timeout, max_retries, backoff, result, retry_on=is_transient_error):
+    """带超时和指数退避重试地调用runnable.ainvoke，只重试retry_on判定为临时错误的异常，attempts记录到result上"""
+    for attempt in range(max_retries + 1):
+        result.attempts += 1
+        try:
+            return await asyncio.wait_for(runnable.ainvoke(value), timeout=timeout)
+        except Exception as e:  # 超时也会以asyncio.TimeoutError的形式进入这里
+            if attempt == max_retries or not retry_on(e):
+                raise
+            # 指数退避 + 随机抖动，避免所有失败请求同时重试
+            delay = backoff * (2 ** attempt) * (1 + random.random())
+            print(f"请求 {result.index} 第{attempt + 1}次失败（{type(e).__name__}），{delay:.2f}s后重试")
+            await asyncio.sleep(delay)
+
+
+async def arun_batch(chain, inputs, max_concurrency=8, timeout=120.0, max_retries=2, backoff=0.5,
+                     retry_on=is_transient_error):
+    """
+    并发执行整条链，结果顺序与inputs一致
+    单个请求最终失败不会中断整批，错误信息记录在BatchResult.error中
+    retry_on: 判断异常是否值得重试的函数
+    """
+    semaphore = asyncio.Semaphore(max_concurrency)
+
+    async def run_one(index, value):
+        result = BatchResult(index=index, input=value)
+        start = time.perf_counter()
+        async with semaphore:
+            try:
+                result.output = await _call_with_retry(chain, value, timeout, max_retries, backoff, result, retry_on)
+            except Exception as e:
+                result.error = f"{type(e).__name__}: {e}"
+        result.latency = time.perf_counter() - start
+        return result
+
+    return await asyncio.gather(*(run_one(i, value) for i, value in enumerate(inputs)))
+
+
+async def arun_rag_pipeline(retriever, generator, questions, format_docs,
+                            retrieval_concurrency=4, generation_concurrency=8,
+                            timeout=120.0, max_retries=2, backoff=0.5, retry_on=is_transient_error):
+    """
+    检索/生成两阶段流水线
+    retriever: 输入问题，输出Document列表
+    generator: 输入 {"context": 文本, "question": 问题}，输出答案（如 prompt | llm | StrOutputParser()）
+    两个阶段各自有并发上限，某个问题检索完成后立即进入生成阶段，不必等整批检索结束
+    """
+    retrieval_semaphore = asyncio.Semaphore(retrieval_concurrency)
+    generation_semaphore = asyncio.Semaphore(generation_concurrency)
+
+    async def run_one(index, question):
+        result = BatchResult(index=index, input=question)
+        start = time.perf_counter()
+        try:
+            async with retrieval_semaphore:
+                docs = await _call_with_retry(retriever, question, timeout, max_retries, backoff, result, retry_on)
+            # 释放检索信号量后再排队生成，下一个问题的检索可以立即开始
+            async with generation_semaphore:
+                result.output = await _call_with_retry(
+                    generator, {"context": format_docs(docs), "question": question},
+                    timeout, max_retries, backoff, result, retry_on
+                )
+        except Exception as e:
+            result.error = f"{type(e).__name__}: {e}"
+        result.latency = time.perf_counter() - start
+        return result
+
+    return await asyncio.gather(*(run_one(i, q) for i, q in enumerate(questions)))
+
+
+def run_batch(chain, inputs, **kwargs):
+    """同步入口：在普通脚本中直接调用"""
+    return asyncio.run(arun_batch(chain, inputs, **kwargs))
+
+
+def print_batch_summary(results, elapsed):
+    """打印整批的吞吐量和失败情况"""
+    succeeded = sum(r.ok for r in results)
+    print(f"完成 {len(results)} 个请求，成功 {succeeded} 个，总耗时 {elapsed:.2f}s，"
+          f"吞吐量 {len(results) / elapsed:.2f} 请求/秒")
+    for r in results:
+        if not r.ok:
+            print(f"  请求 {r.index} 失败（尝试{r.attempts}次）: {r.error}")
+
+
+if __name__ == "__main__":
+    from langchain_core.runnables import RunnableLambda
+
+    # 用桩检索器和桩LLM模拟：检索耗时0.1s，生成耗时0.5s
+    async def fake_retrieve(question):
+        await asyncio.sleep(0.1)
+        return [f"{question}的相关文档"]
+
+    async def fake_generate(inputs):
+        await asyncio.sleep(0.5)
+        return f"回答：{inputs['question']}"
+
+    retriever = RunnableLambda(lambda q: [q], afunc=fake_retrieve)
+    generator = RunnableLambda(lambda x: x, afunc=fake_generate)
+    chain = retriever | RunnableLambda(lambda docs: {"context": docs, "question": docs[0]}) | generator
+    questions = [f"问题{i}" for i in range(16)]
+
+    for concurrency in [1, 4, 16]:
+        start = time.perf_counter()
+        results = run_batch(chain, questions, max_concurrency=concurrency)
+        print(f"并发数 {concurrency}: ", end="")
+        print_batch_summary(results, time.perf_counter() - start)
+
+    start = time.perf_counter()
+    results = asyncio.run(arun_rag_pipeline(
+        retriever, generator, questions, format_docs=lambda docs: "\n\n".join(docs),
+        retrieval_concurrency=4, generation_concurrency=16
+    ))
+    print("流水线模式: ", end="")
+    print_batch_summary(results, time.perf_counter() - start)
@@ -0,0 +1,125 @@
+"""
+从零实现RAG的批量问答模式：用于离线评估和夜间预计算
+流程：
+1. 所有问题一次性批量编码（SentenceTransformer按长度排序后分批padding）
+2. 问题矩阵只调用一次 index.search(Q, k)
+3. 用文档ID矩阵一次性取出上下文，批量拼装提示词
+4. 统计每个阶段的吞吐量（问题数/秒）
+"""
+import json
+import os
+import time
+
+import numpy as np
+
+PROMPT_TEMPLATE = """根据以下参考信息回答问题，并给出信息源编号。
+如果无法从参考信息中找到答案，请说明无法回答。
+参考信息:
+{context}
+问题: {question}
+答案:"""
+
+
+def encode_questions(model, questions, batch_size=256):
+    """批量编码所有问题，返回 (nq, d) 的float32矩阵"""
+    embeddings = model.encode(questions, batch_size=batch_size, show_progress_bar=False)
+    return np.asarray(embeddings, dtype="float32")
+
+
+def build_prompts(questions, docs, doc_ids):
+    """
+    根据检索结果矩阵批量拼装提示词
+    doc_ids为 (nq, k) 的文档ID矩阵，-1表示该位置没有检索结果
+    """
+    k = doc_ids.shape[1]
+    # 文档数组末尾放一个空串，-1的ID正好取到它
+    doc_array = np.array(list(docs) + [""], dtype=object)
+    # 一次花式索引取出所有上下文，再按列加上 [1] [2] ... 编号
+    contexts = doc_array[doc_ids]
+    labels = np.array([f"[{i + 1}] " for i in range(k)], dtype=object)
+    labelled = np.where(doc_ids >= 0, labels + contexts, "")
+    return [
+        PROMPT_TEMPLATE.format(context="\n".join(filter(None, row)), question=question)
+        for row, question in zip(labelled, questions)
+    ]
+
+
+def batch_query(questions, model, engine, docs, k=3, batch_size=256):
+    """
+    批量检索并拼装提示词
+    返回 (prompts, doc_ids, stats)，stats记录各阶段耗时和吞吐量
+    """
+    questions = list(questions)
+    num_questions = len(questions)
+    stats = {"num_questions": num_questions}
+
+    start = time.perf_counter()
+    query_embeddings = encode_questions(model, questions, batch_size=batch_size)
+    stats["encode_seconds"] = time.perf_counter() - start
+
+    start = time.perf_counter()
+    _, doc_ids = engine.search_matrix(query_embeddings, k=k)
+    stats["search_seconds"] = time.perf_counter() - start
+
+    start = time.perf_counter()
+    prompts = build_prompts(questions, docs, doc_ids)
+    stats["prompt_seconds"] = time.perf_counter() - start
+
+    for stage in ["encode", "search", "prompt"]:
+        seconds = stats[f"{stage}_seconds"]
+        stats[f"{stage}_qps"] = num_questions / seconds if seconds > 0 else float("inf")
+    return prompts, doc_ids, stats
+
+
+def print_stats(stats):
+    """打印每个阶段的吞吐量"""
+    print(f"问题数量: {stats['num_questions']}")
+    for stage, name in [("encode", "问题编码"), ("search", "向量检索"), ("prompt", "提示词构建")]:
+        print(f"{name}: {stats[f'{stage}_seconds']:.3f}s，{stats[f'{stage}_qps']:.1f} 问题/秒")
+
+
+if __name__ == "__main__":
+    import sys
+    sys.path.append("03-向量嵌入-Embedding")
+    from embedding_cache import CachedSentenceTransformer
+    from faiss_engine import FaissRetrievalEngine
+
+    docs = [
+        "黑神话悟空的战斗如同武侠小说活过来一般，当金箍棒与妖魔碰撞时，火星四溅，招式行云流水。悟空可随心切换狂猛或灵动的战斗风格，一棒横扫千军，或是腾挪如蝴蝶戏花。",
+        "72变神通不只是变化形态，更是开启新世界的钥匙。化身飞鼠可以潜入妖魔巢穴打探军情，变作金鱼能够探索深海遗迹的秘密，每一种变化都是一段独特的冒险。",
+        "每场BOSS战都是一场惊心动魄的较量。或是与身躯庞大的九头蟒激战于瀑布之巅，或是在雷电交织的云海中与雷公电母比拼法术，招招险象环生。",
+        "驾着筋斗云翱翔在这片神话世界，瑰丽的场景令人屏息。云雾缭绕的仙山若隐若现，古老的妖兽巢穴中藏着千年宝物，月光下的古寺钟声回荡在山谷。",
+        "这不是你熟悉的西游记。当悟空踏上寻找身世之谜的旅程，他将遇见各路神仙妖魔。有的是旧识，如同样桀骜不驯的哪吒；有的是劲敌，如手持三尖两刃刀的二郎神。",
+        "作为齐天大圣，悟空的神通不止于金箍棒。火眼金睛可洞察妖魔真身，一个筋斗便是十万八千里。而这些能力还可以通过收集天外陨铁、悟道石等材料来强化升级。",
+        "世界的每个角落都藏着故事。你可能在山洞中发现上古大能的遗迹，云端天宫里寻得昔日天兵的宝库，或是在凡间集市偶遇卖人参果的狐妖。",
+        "故事发生在大唐之前的蛮荒世界，那时天庭还未定鼎三界，各路妖王割据称雄。这是一个神魔混战、群雄逐鹿的动荡年代，也是悟空寻找真相的起点。",
+        "游戏的音乐如同一首跨越千年的史诗。古琴与管弦交织出战斗的激昂，笛萧与木鱼谱写禅意空灵。而当悟空踏入重要场景时，古风配乐更是让人仿佛穿越回那个神话的年代。"
+    ]
+
+    model_name = 'sentence-transformers/all-MiniLM-L6-v2'
+    # 文档走嵌入缓存；评估问题每次都不同，直接用原模型编码，不写入缓存
+    cached_model = CachedSentenceTransformer(model_name)
+    model = cached_model.model
+    engine = FaissRetrievalEngine("vector_store/scratch_rag")
+    engine.load_or_build(docs, cached_model.encode, model_name)
+
+    # 模拟几千个问题的离线评估集
+    sample_questions = [
+        "黑神话悟空的战斗系统有什么特点?",
+        "悟空有哪些变化神通?",
+        "游戏里有哪些BOSS战?",
+        "游戏的音乐风格是怎样的?",
+        "故事发生在什么年代?",
+    ]
+    questions = [f"{q}（{i}）" for i in range(1000) for q in sample_questions]
+
+    prompts, doc_ids, stats = batch_query(questions, model, engine, docs, k=3)
+    print_stats(stats)
+
+    # 保存提示词，供后续批量生成或评估使用
+    output_path = "output/batch_prompts.jsonl"
+    os.makedirs(os.path.dirname(output_path), exist_ok=True)
+    with open(output_path, "w", encoding="utf-8") as f:
+        for question, ids, prompt in zip(questions, doc_ids.tolist(), prompts):
+            f.write(json.dumps({"question": question, "doc_ids": ids, "prompt": prompt}, ensure_ascii=False) + "\n")
+    print(f"提示词已保存到 {output_path}")
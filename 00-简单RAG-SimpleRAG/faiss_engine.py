@@ -0,0 +1,209 @@
+"""
+持久化的FAISS检索引擎：供05_RAG_from_Scratch_*系列脚本共用
+功能：
+1. 按语料规模自动选择索引类型（Flat / HNSW / IVF）
+2. 将索引和文档ID映射表（sidecar）写入磁盘
+3. 下次启动时以内存映射方式加载索引，语料未变化时无需重新嵌入
+"""
+import hashlib
+import json
+import os
+
+import faiss # pip install faiss-cpu
+import numpy as np
+
+# 语料规模阈值：小语料用暴力检索即可，中等规模用HNSW，超大规模用IVF
+FLAT_MAX_SIZE = 10_000
+HNSW_MAX_SIZE = 1_000_000
+
+# IVF训练时每个聚类中心使用的样本数，k-means用几百个点/中心就足够，再多只会拖慢训练
+IVF_TRAIN_POINTS_PER_CENTROID = 256
+
+INDEX_FILE = "index.faiss"
+SIDECAR_FILE = "doc_ids.json"
+
+
+def corpus_fingerprint(docs, model_name):
+    """根据文档内容和嵌入模型名称计算语料指纹，用于判断磁盘上的索引是否过期"""
+    sha = hashlib.sha256(model_name.encode("utf-8"))
+    for doc in docs:
+        sha.update(hashlib.sha256(doc.encode("utf-8")).digest())
+    return sha.hexdigest()
+
+
+def choose_index_type(num_vectors):
+    """根据向量数量选择索引类型"""
+    if num_vectors < FLAT_MAX_SIZE:
+        return "flat"
+    if num_vectors < HNSW_MAX_SIZE:
+        return "hnsw"
+    return "ivf"
+
+
+class FaissRetrievalEngine:
+    """FAISS检索引擎：负责索引的构建、持久化、内存映射加载和检索"""
+    def __init__(self, index_dir, metric="l2", hnsw_m=32, ef_search=64, nprobe=16):
+        self.index_dir = index_dir
+        self.metric = metric
+        self.hnsw_m = hnsw_m
+        self.ef_search = ef_search
+        self.nprobe = nprobe
+        self.index = None
+        self.index_type = None
+        self.doc_ids = []
+
+    @property
+    def index_path(self):
+        return os.path.join(self.index_dir, INDEX_FILE)
+
+    @property
+    def sidecar_path(self):
+        return os.path.join(self.index_dir, SIDECAR_FILE)
+
+    @property
+    def ntotal(self):
+        return 0 if self.index is None else self.index.ntotal
+
+    def _faiss_metric(self):
+        return faiss.METRIC_INNER_PRODUCT if self.metric == "ip" else faiss.METRIC_L2
+
+    def _create_index(self, index_type, dimension, num_vectors):
+        """创建一个空索引"""
+        metric = self._faiss_metric()
+        if index_type == "flat":
+            return faiss.IndexFlat(dimension, metric)
+        if index_type == "hnsw":
+            index = faiss.IndexHNSWFlat(dimension, self.hnsw_m, metric)
+            index.hnsw.efConstruction = max(40, 2 * self.hnsw_m)
+            return index
+        if index_type == "ivf":
+            # 经验值：聚类中心数取 4*sqrt(N)
+            nlist = max(1, int(4 * np.sqrt(num_vectors)))
+            quantizer = faiss.IndexFlat(dimension, metric)
+            return faiss.IndexIVFFlat(quantizer, dimension, nlist, metric)
+        raise ValueError(f"不支持的索引类型: {index_type}")
+
+    def _apply_search_params(self):
+        """设置检索时参数（HNSW的efSearch，IVF的nprobe）"""
+        if self.index_type == "hnsw":
+            self.index.hnsw.efSearch = self.ef_search
+        elif self.index_type == "ivf":
+            self.index.nprobe = self.nprobe
+
+    def build(self, embeddings, doc_ids=None, fingerprint=None, index_type=None):
+        """根据嵌入向量构建索引并写入磁盘"""
+        vectors = np.ascontiguousarray(embeddings, dtype="float32")
+        num_vectors, dimension = vectors.shape
+        if doc_ids is None:
+            doc_ids = list(range(num_vectors))
+        if len(doc_ids) != num_vectors:
+            raise ValueError(f"文档ID数量({len(doc_ids)})与向量数量({num_vectors})不一致")
+
+        self.index_type = index_type or choose_index_type(num_vectors)
+        self.index = self._create_index(self.index_type, dimension, num_vectors)
+        if not self.index.is_trained:
+            self.index.train(self._training_sample(vectors))
+        self.index.add(vectors)
+        self.doc_ids = list(doc_ids)
+        self._apply_search_params()
+        self.save(fingerprint)
+        return self
+
+    def _training_sample(self, vectors):
+        """IVF只用约 256*nlist 个随机样本训练聚类中心（固定随机种子，重建结果可复现）"""
+        max_points = IVF_TRAIN_POINTS_PER_CENTROID * getattr(self.index, "nlist", 0)
+        if not max_points or len(vectors) <= max_points:
+            return vectors
+        rows = np.random.default_rng(0).choice(len(vectors), max_points, replace=False)
+        return vectors[np.sort(rows)]
+
+    def save(self, fingerprint=None):
+        """保存索引文件和文档ID映射表"""
+        os.makedirs(self.index_dir, exist_ok=True)
+        faiss.write_index(self.index, self.index_path)
+        sidecar = {
+            "index_type": self.index_type,
+            "metric": self.metric,
+            "dimension": self.index.d,
+            "ntotal": self.index.ntotal,
+            "fingerprint": fingerprint,
+            "doc_ids": self.doc_ids,
+        }
+        with open(self.sidecar_path, "w", encoding="utf-8") as f:
+            json.dump(sidecar, f, ensure_ascii=False)
+
+    def load(self, fingerprint=None):
+        """
+        从磁盘加载索引（优先内存映射），成功返回True
+        如果文件不存在、文件损坏或语料指纹不一致，返回False，调用方应重新构建
+        """
+        if not (os.path.exists(self.index_path) and os.path.exists(self.sidecar_path)):
+            return False
+        with open(self.sidecar_path, "r", encoding="utf-8") as f:
+            sidecar = json.load(f)
+        if fingerprint is not None and sidecar.get("fingerprint") != fingerprint:
+            print("语料或模型已变化，需要重新构建索引")
+            return False
+        if sidecar.get("metric", "l2") != self.metric:
+            return False
+
+        try:
+            # 内存映射加载：只在检索时按需读取磁盘页，启动几乎零开销
+            index = faiss.read_index(self.index_path, faiss.IO_FLAG_MMAP | faiss.IO_FLAG_READ_ONLY)
+        except RuntimeError:
+            # 部分索引类型（如HNSW）不支持内存映射，退回普通加载
+            index = faiss.read_index(self.index_path)
+
+        if index.ntotal != len(sidecar["doc_ids"]):
+            print("索引与文档ID映射表不一致，需要重新构建索引")
+            return False
+        self.index = index
+        self.index_type = sidecar["index_type"]
+        self.doc_ids = sidecar["doc_ids"]
+        self._apply_search_params()
+        return True
+
+    def load_or_build(self, docs, embed_fn, model_name, doc_ids=None):
+        """语料未变化时直接加载磁盘索引，否则调用embed_fn嵌入文档并重建索引"""
+        fingerprint = corpus_fingerprint(docs, model_name)
+        if self.load(fingerprint):
+            print(f"从 {self.index_dir} 加载{self.index_type}索引，共 {self.ntotal} 条向量")
+            return self
+        embeddings = embed_fn(docs)
+        self.build(embeddings, doc_ids=doc_ids, fingerprint=fingerprint)
+        print(f"构建{self.index_type}索引并保存到 {self.index_dir}，共 {self.ntotal} 条向量")
+        return self
+
+    def search(self, query_embeddings, k=3):
+        """
+        批量检索，query_embeddings形状为 (nq, d)
+        返回 (distances, doc_ids)，都是二维列表，已过滤掉不足k个结果时的占位符，两者逐位置对应
+        """
+        queries = np.ascontiguousarray(np.atleast_2d(query_embeddings), dtype="float32")
+        distances, indices = self.index.search(queries, min(k, self.ntotal))
+        valid = indices != -1
+        doc_ids = [[self.doc_ids[idx] for idx in row[mask]] for row, mask in zip(indices, valid)]
+        distances = [row[mask].tolist() for row, mask in zip(distances, valid)]
+        return distances, doc_ids
+
+    def search_matrix(self, query_embeddings, k=3):
+        """
+        大批量检索：整个问题矩阵只调用一次index.search
+        返回 (distances, doc_ids) 两个 (nq, k) 数组，结果不足k个的位置doc_id为-1（要求文档ID为整数）
+        """
+        queries = np.ascontiguousarray(np.atleast_2d(query_embeddings), dtype="float32")
+        distances, indices = self.index.search(queries, min(k, self.ntotal))
+        id_array = np.asarray(self.doc_ids, dtype="int64")
+        doc_ids = np.where(indices >= 0, id_array[indices], -1)
+        return distances, doc_ids
+
+
+if __name__ == "__main__":
+    # 简单自测：随机向量构建索引、保存后重新加载并检索
+    vectors = np.random.rand(1000, 64).astype("float32")
+    engine = FaissRetrievalEngine("vector_store/faiss_engine_demo")
+    engine.build(vectors, fingerprint="demo")
+    reloaded = FaissRetrievalEngine("vector_store/faiss_engine_demo")
+    assert reloaded.load("demo")
+    distances, ids = reloaded.search(vectors[:2], k=3)
+    print(f"索引类型: {reloaded.index_type}，检索结果: {ids}")
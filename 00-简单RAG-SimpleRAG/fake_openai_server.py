@@ -0,0 +1,94 @@
+"""
+本地假OpenAI兼容服务器：只依赖标准库，用于在没有API密钥时测试流式生成
+支持 POST /v1/chat/completions，stream=true时按SSE格式逐个返回文本片段
+
+直接运行本文件会启动假服务器，并用stream_generation中的OpenAICompatibleBackend走一遍流式问答
+"""
+import json
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+DEFAULT_TOKENS = ["黑神话", "悟空", "的战斗", "行云流水", "，", "可切换", "狂猛或灵动", "的风格", "[1]", "。"]
+
+
+def _make_handler(tokens, first_token_delay, token_delay):
+    class FakeChatHandler(BaseHTTPRequestHandler):
+        def log_message(self, format, *args):
+            pass  # 测试时不打印访问日志
+
+        def _send_json(self, status, payload):
+            body = json.dumps(payload, ensure_ascii=False).encode("utf-8")
+            self.send_response(status)
+            self.send_header("Content-Type", "application/json")
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def _send_event(self, payload):
+            data = "[DONE]" if payload is None else json.dumps(payload, ensure_ascii=False)
+            self.wfile.write(f"data: {data}\n\n".encode("utf-8"))
+            self.wfile.flush()
+
+        def do_POST(self):
+            if not self.path.endswith("/chat/completions"):
+                self._send_json(404, {"error": {"message": f"未知路径: {self.path}"}})
+                return
+            length = int(self.headers.get("Content-Length", 0))
+            request = json.loads(self.rfile.read(length) or b"{}")
+            model = request.get("model", "fake-model")
+            created = int(time.time())
+            usage = {"prompt_tokens": 0, "completion_tokens": len(tokens), "total_tokens": len(tokens)}
+
+            if not request.get("stream"):
+                time.sleep(first_token_delay + token_delay * len(tokens))
+                self._send_json(200, {
+                    "id": "chatcmpl-fake", "object": "chat.completion", "created": created, "model": model,
+                    "choices": [{"index": 0, "finish_reason": "stop",
+                                 "message": {"role": "assistant", "content": "".join(tokens)}}],
+                    "usage": usage,
+                })
+                return
+
+            self.send_response(200)
+            self.send_header("Content-Type", "text/event-stream")
+            self.send_header("Cache-Control", "no-cache")
+            self.end_headers()
+            chunk = {"id": "chatcmpl-fake", "object": "chat.completion.chunk", "created": created, "model": model}
+            time.sleep(first_token_delay)
+            for i, token in enumerate(tokens):
+                if i > 0:
+                    time.sleep(token_delay)
+                self._send_event({**chunk, "choices": [
+                    {"index": 0, "delta": {"content": token}, "finish_reason": None}]})
+            self._send_event({**chunk, "choices": [{"index": 0, "delta": {}, "finish_reason": "stop"}]})
+            if request.get("stream_options", {}).get("include_usage"):
+                self._send_event({**chunk, "choices": [], "usage": usage})
+            self._send_event(None)
+
+    return FakeChatHandler
+
+
+def start_fake_server(tokens=None, first_token_delay=0.2, token_delay=0.02, host="127.0.0.1", port=0):
+    """在后台线程启动假服务器，返回 (server, base_url)，用完调用 server.shutdown()"""
+    handler = _make_handler(tokens or DEFAULT_TOKENS, first_token_delay, token_delay)
+    server = ThreadingHTTPServer((host, port), handler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server, f"http://{host}:{server.server_address[1]}/v1"
+
+
+if __name__ == "__main__":
+    from stream_generation import OpenAICompatibleBackend, print_stream, summarize_metrics
+
+    server, base_url = start_fake_server()
+    try:
+        backend = OpenAICompatibleBackend(model="fake-model", api_key="fake-key", base_url=base_url)
+        metrics_log = []
+        for _ in range(3):
+            answer, metrics = print_stream(backend, "黑神话悟空的战斗系统有什么特点?", metrics_log)
+            assert answer == "".join(DEFAULT_TOKENS)
+            assert metrics.ttft is not None and metrics.ttft < metrics.total_latency
+            assert metrics.num_tokens == len(DEFAULT_TOKENS)
+        print(f"汇总指标: {summarize_metrics(metrics_log)}")
+    finally:
+        server.shutdown()
@@ -0,0 +1,113 @@
+"""
+LlamaIndex索引的持久化与增量更新
+首次运行：正常构建索引，用StorageContext.persist保存到磁盘，同时记录每个源文件的大小、修改时间和内容哈希
+再次运行：直接从磁盘加载索引；只有新增或修改过的文件才重新解析和嵌入，已删除文件的节点从索引中移除
+"""
+import json
+import os
+
+from llama_index.core import SimpleDirectoryReader, StorageContext, VectorStoreIndex, load_index_from_storage
+
+from file_hashing import file_hash
+
+MANIFEST_FILE = "file_manifest.json"
+
+
+def list_source_files(input_dir=None, input_files=None, required_exts=None):
+    """列出需要索引的源文件"""
+    if input_files:
+        return sorted(input_files)
+    files = []
+    for root, _, filenames in os.walk(input_dir):
+        for filename in filenames:
+            if required_exts and os.path.splitext(filename)[1].lower() not in required_exts:
+                continue
+            files.append(os.path.join(root, filename))
+    return sorted(files)
+
+
+def scan_changes(files, manifest):
+    """
+    对比文件清单，返回 (新增或修改的文件, 已删除的文件, 新的文件状态)
+    大小和修改时间都没变的文件直接认为未变化；否则再比较内容哈希，
+    这样只touch过但内容没变的文件也不会被重新嵌入
+    """
+    old_files = manifest.get("files", {})
+    changed, states = [], {}
+    for path in files:
+        stat = os.stat(path)
+        old = old_files.get(path)
+        if old and old["size"] == stat.st_size and old["mtime"] == stat.st_mtime:
+            states[path] = old
+            continue
+        digest = file_hash(path)
+        if old and old["hash"] == digest:
+            states[path] = {**old, "mtime": stat.st_mtime}
+            continue
+        states[path] = {"size": stat.st_size, "mtime": stat.st_mtime, "hash": digest, "doc_ids": []}
+        changed.append(path)
+    deleted = [path for path in old_files if path not in states]
+    return changed, deleted, states
+
+
+def _load_documents(paths):
+    """用文件路径作为文档ID加载，便于之后按文件删除和替换"""
+    return SimpleDirectoryReader(input_files=paths, filename_as_id=True).load_data()
+
+
+def _write_manifest(manifest_path, model_name, states):
+    with open(manifest_path, "w", encoding="utf-8") as f:
+        json.dump({"embed_model": model_name, "files": states}, f, ensure_ascii=False, indent=2)
+
+
+def load_or_build_index(persist_dir, input_dir=None, input_files=None, required_exts=None, embed_model=None):
+    """加载持久化的索引并增量同步源文件的变化；没有可用的持久化索引时全量构建"""
+    manifest_path = os.path.join(persist_dir, MANIFEST_FILE)
+    manifest = {}
+    if os.path.exists(manifest_path):
+        with open(manifest_path, "r", encoding="utf-8") as f:
+            manifest = json.load(f)
+
+    model_name = getattr(embed_model, "model_name", None)
+    if manifest and manifest.get("embed_model") != model_name:
+        print("嵌入模型已变化，重新构建索引")
+        manifest = {}
+
+    files = list_source_files(input_dir, input_files, required_exts)
+    changed, deleted, states = scan_changes(files, manifest)
+
+    if manifest:
+        storage_context = StorageContext.from_defaults(persist_dir=persist_dir)
+        index = load_index_from_storage(storage_context, embed_model=embed_model)
+        if not changed and not deleted:
+            print(f"源文件未变化，从 {persist_dir} 加载索引")
+            # 只touch过的文件记下新的修改时间，下次运行不用再计算哈希
+            if any(state["mtime"] != manifest["files"][path]["mtime"] for path, state in states.items()):
+                _write_manifest(manifest_path, model_name, states)
+            return index
+        # 修改过的文件先删掉旧节点，再和新增文件一起重新插入
+        for path in deleted + [p for p in changed if p in manifest["files"]]:
+            for doc_id in manifest["files"][path]["doc_ids"]:
+                index.delete_ref_doc(doc_id, delete_from_docstore=True)
+        documents = _load_documents(changed) if changed else []
+        for doc in documents:
+            index.insert(doc)
+        print(f"增量更新索引：新增或修改 {len(changed)} 个文件，删除 {len(deleted)} 个文件")
+    else:
+        documents = _load_documents(files)
+        index = VectorStoreIndex.from_documents(documents, embed_model=embed_model)
+        print(f"全量构建索引：{len(files)} 个文件，{len(documents)} 个文档")
+
+    # 记录每个文件对应的文档ID（PDF等文件会按页拆成多个文档）
+    for path in changed if manifest else files:
+        states[path]["doc_ids"] = []
+    for doc in documents:
+        path = doc.metadata.get("file_path")
+        if path not in states:  # 读取器可能返回绝对路径
+            path = next((p for p in states if os.path.abspath(p) == os.path.abspath(path)), None)
+        if path is not None:
+            states[path]["doc_ids"].append(doc.doc_id)
+
+    index.storage_context.persist(persist_dir=persist_dir)
+    _write_manifest(manifest_path, model_name, states)
+    return index
@@ -0,0 +1,230 @@
+"""
+流式生成：边生成边输出答案，并记录每次请求的延迟指标
+功能：
+1. 可插拔的生成后端：OpenAI兼容接口（DeepSeek等）、Anthropic（Claude）、Ollama、LangChain链/LangGraph图
+2. 逐个产出模型返回的文本片段，而不是等整段答案生成完毕
+3. 记录首字延迟（TTFT）、生成速度（tokens/秒）和总延迟，并汇总P50/P95
+"""
+import math
+import os
+import time
+from dataclasses import dataclass, field
+from typing import List, Optional
+
+
+# ==================== 1. 延迟指标 ====================
+@dataclass
+class StreamMetrics:
+    """单次流式请求的延迟指标，时间单位为秒"""
+    backend: str
+    model: str
+    start_time: float = field(default_factory=time.perf_counter)
+    first_token_time: Optional[float] = None
+    end_time: Optional[float] = None
+    num_chunks: int = 0
+    completion_tokens: Optional[int] = None  # 后端返回了usage时使用真实token数
+
+    @property
+    def ttft(self):
+        """首字延迟：从发出请求到收到第一个文本片段"""
+        if self.first_token_time is None:
+            return None
+        return self.first_token_time - self.start_time
+
+    @property
+    def total_latency(self):
+        if self.end_time is None:
+            return None
+        return self.end_time - self.start_time
+
+    @property
+    def num_tokens(self):
+        return self.completion_tokens if self.completion_tokens is not None else self.num_chunks
+
+    @property
+    def tokens_per_second(self):
+        """生成阶段的速度：首字之后每秒产出的token数"""
+        if self.first_token_time is None or self.end_time is None:
+            return None
+        duration = self.end_time - self.first_token_time
+        return self.num_tokens / duration if duration > 0 else None
+
+    def as_dict(self):
+        return {
+            "backend": self.backend,
+            "model": self.model,
+            "ttft": self.ttft,
+            "tokens_per_second": self.tokens_per_second,
+            "total_latency": self.total_latency,
+            "num_tokens": self.num_tokens,
+        }
+
+
+def _percentile(values, q):
+    """最近秩法计算百分位数"""
+    ordered = sorted(values)
+    rank = max(1, math.ceil(q / 100 * len(ordered)))
+    return ordered[rank - 1]
+
+
+def summarize_metrics(metrics_list: List[StreamMetrics]):
+    """汇总多次请求的指标：TTFT和总延迟给出P50/P95，生成速度给出平均值"""
+    summary = {"num_requests": len(metrics_list)}
+    for name in ["ttft", "total_latency"]:
+        values = [getattr(m, name) for m in metrics_list if getattr(m, name) is not None]
+        if values:
+            summary[f"{name}_p50"] = _percentile(values, 50)
+            summary[f"{name}_p95"] = _percentile(values, 95)
+    speeds = [m.tokens_per_second for m in metrics_list if m.tokens_per_second is not None]
+    if speeds:
+        summary["tokens_per_second_mean"] = sum(speeds) / len(speeds)
+    return summary
+
+
+# ==================== 2. 生成后端 ====================
+class StreamingBackend:
+    """流式生成后端的基类：stream() 逐个产出文本片段，可把usage写入metrics"""
+    name = "base"
+
+    def __init__(self, model):
+        self.model = model
+
+    def stream(self, prompt, metrics, **kwargs):
+        raise NotImplementedError
+
+
+class OpenAICompatibleBackend(StreamingBackend):
+    """OpenAI兼容接口（DeepSeek、vLLM、本地假服务器等）"""
+    name = "openai"
+
+    def __init__(self, model="deepseek-chat", api_key=None, base_url="https://api.deepseek.com/v1",
+                 max_tokens=1024, include_usage=True):
+        super().__init__(model)
+        from openai import OpenAI
+        self.client = OpenAI(api_key=api_key or os.getenv("DEEPSEEK_API_KEY"), base_url=base_url)
+        self.max_tokens = max_tokens
+        self.include_usage = include_usage
+
+    def stream(self, prompt, metrics, **kwargs):
+        extra = {"stream_options": {"include_usage": True}} if self.include_usage else {}
+        response = self.client.chat.completions.create(
+            model=self.model,
+            messages=[{"role": "user", "content": prompt}],
+            max_tokens=kwargs.get("max_tokens", self.max_tokens),
+            stream=True,
+            **extra
+        )
+        for chunk in response:
+            if getattr(chunk, "usage", None) is not None:
+                metrics.completion_tokens = chunk.usage.completion_tokens
+            if chunk.choices and chunk.choices[0].delta.content:
+                yield chunk.choices[0].delta.content
+
+
+class AnthropicBackend(StreamingBackend):
+    """Anthropic Claude"""
+    name = "anthropic"
+
+    def __init__(self, model="claude-3-5-sonnet-20241022", api_key=None, max_tokens=1024):
+        super().__init__(model)
+        from anthropic import Anthropic # pip install anthropic
+        self.client = Anthropic(api_key=api_key or os.getenv("CLAUDE_API_KEY"))
+        self.max_tokens = max_tokens
+
+    def stream(self, prompt, metrics, **kwargs):
+        with self.client.messages.stream(
+            model=self.model,
+            messages=[{"role": "user", "content": prompt}],
+            max_tokens=kwargs.get("max_tokens", self.max_tokens)
+        ) as stream:
+            for text in stream.text_stream:
+                yield text
+            metrics.completion_tokens = stream.get_final_message().usage.output_tokens
+
+
+class OllamaBackend(StreamingBackend):
+    """本地Ollama，默认URL：http://localhost:11434"""
+    name = "ollama"
+
+    def __init__(self, model=None, host=None):
+        super().__init__(model or os.getenv("OLLAMA_MODEL"))
+        from ollama import Client
+        self.client = Client(host=host)
+
+    def stream(self, prompt, metrics, **kwargs):
+        for chunk in self.client.chat(
+            model=self.model,
+            messages=[{"role": "user", "content": prompt}],
+            stream=True
+        ):
+            if chunk.get("done"):
+                metrics.completion_tokens = chunk.get("eval_count")
+            content = chunk["message"]["content"]
+            if content:
+                yield content
+
+
+class LangChainBackend(StreamingBackend):
+    """
+    LangChain Runnable的流式包装，适用于LCEL链（chain.stream）
+    以及LangGraph图（graph.stream(..., stream_mode="messages")）
+    """
+    name = "langchain"
+
+    def __init__(self, runnable, model="", stream_kwargs=None):
+        super().__init__(model)
+        self.runnable = runnable
+        self.stream_kwargs = stream_kwargs or {}
+
+    def stream(self, prompt, metrics, **kwargs):
+        for chunk in self.runnable.stream(prompt, **self.stream_kwargs):
+            if isinstance(chunk, tuple):  # LangGraph messages模式：(消息片段, 元数据)
+                chunk = chunk[0]
+            text = chunk if isinstance(chunk, str) else getattr(chunk, "content", "")
+            if text:
+                yield text
+
+
+# ==================== 3. 流式问答 ====================
+def stream_answer(backend: StreamingBackend, prompt, metrics_log: Optional[list] = None, **kwargs):
+    """
+    流式生成答案，逐个产出文本片段
+    生成结束后把本次请求的StreamMetrics追加到metrics_log
+    """
+    metrics = StreamMetrics(backend=backend.name, model=backend.model)
+    try:
+        for text in backend.stream(prompt, metrics, **kwargs):
+            if metrics.first_token_time is None:
+                metrics.first_token_time = time.perf_counter()
+            metrics.num_chunks += 1
+            yield text
+    finally:
+        metrics.end_time = time.perf_counter()
+        if metrics_log is not None:
+            metrics_log.append(metrics)
+
+
+def print_stream(backend: StreamingBackend, prompt, metrics_log: Optional[list] = None, **kwargs):
+    """边生成边打印答案，返回完整答案和本次请求的指标"""
+    log = [] if metrics_log is None else metrics_log
+    pieces = []
+    for text in stream_answer(backend, prompt, log, **kwargs):
+        print(text, end="", flush=True)
+        pieces.append(text)
+    print()
+    metrics = log[-1]
+    print(f"[{metrics.backend}] 首字延迟: {metrics.ttft or 0:.3f}s，"
+          f"生成速度: {metrics.tokens_per_second or 0:.1f} tokens/s，"
+          f"总延迟: {metrics.total_latency:.3f}s")
+    return "".join(pieces), metrics
+
+
+def create_backend(name, **kwargs):
+    """按名称创建后端：deepseek / claude / ollama"""
+    if name == "deepseek":
+        return OpenAICompatibleBackend(**kwargs)
+    if name == "claude":
+        return AnthropicBackend(**kwargs)
+    if name == "ollama":
+        return OllamaBackend(**kwargs)
+    raise ValueError(f"不支持的生成后端: {name}")
@@ -0,0 +1,25 @@
+# 用进程池并行加载目录：每个文件单独超时，边解析边返回文档，失败文件汇总到报告中
+import os
+from parallel_directory_loader import ParallelDirectoryLoader
+
+# 获取当前脚本文件所在的目录
+script_dir = os.path.dirname(__file__)
+# 结合相对路径构建完整路径
+data_dir = os.path.join(script_dir, '../../90-文档-Data/黑悟空')
+
+# 多进程在macOS/Windows上以spawn方式启动，加载代码必须放在main保护之下
+if __name__ == "__main__":
+    loader = ParallelDirectoryLoader(data_dir,
+                                     max_workers=4, # 并行进程数，默认为CPU核数
+                                     timeout=60, # 单个文件的解析超时（秒）
+                                     )
+    docs = []
+    for doc in loader.lazy_load(): # 每解析完一个文件就立即返回它的文档
+        docs.append(doc)
+        print(f"已加载：{doc.metadata.get('source')}")
+    print(loader.report.summary()) # 输出加载报告（包括失败的文件和原因）
+
+    # 也可以用LlamaIndex的SimpleDirectoryReader作为单文件解析器
+    llama_loader = ParallelDirectoryLoader(data_dir, backend="llamaindex", max_workers=4)
+    documents = llama_loader.load()
+    print(llama_loader.report.summary())
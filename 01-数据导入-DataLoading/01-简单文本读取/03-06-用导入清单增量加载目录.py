@@ -0,0 +1,32 @@
+# 用导入清单增量加载目录：重新运行时只加载、切块、嵌入新增或修改过的文件，已删除文件的切块从向量库中移除
+import os
+import sys
+from langchain_community.document_loaders import TextLoader
+from langchain_text_splitters import RecursiveCharacterTextSplitter
+from langchain_huggingface import HuggingFaceEmbeddings
+from langchain_chroma import Chroma
+
+# 获取当前脚本文件所在的目录
+script_dir = os.path.dirname(__file__)
+sys.path.append(os.path.join(script_dir, '..'))
+from ingestion_manifest import IngestionManifest, incremental_ingest
+# 结合相对路径构建完整路径
+data_dir = os.path.join(script_dir, '../../90-文档-Data/黑悟空')
+
+def load_file(filepath):
+    """只加载文本类文件，返回 (文档列表, 加载器名称)"""
+    if filepath.endswith((".txt", ".md")):
+        return TextLoader(filepath, encoding='utf-8').load(), "TextLoader"
+    return [], None
+
+filepaths = sorted(os.path.join(data_dir, filename) for filename in os.listdir(data_dir))
+text_splitter = RecursiveCharacterTextSplitter(chunk_size=500, chunk_overlap=50)
+embed_model = HuggingFaceEmbeddings(model_name="BAAI/bge-small-zh")
+# 向量库和清单与数据目录一样按脚本所在目录定位，从任何工作目录运行都指向同一份
+persist_dir = os.path.join(script_dir, '../../vector_store/wukong_incremental')
+vectorstore = Chroma(persist_directory=persist_dir, embedding_function=embed_model)
+# 清单中保存相对data_dir的路径
+manifest = IngestionManifest(os.path.join(persist_dir, "manifest.sqlite"), root=data_dir)
+
+changes = incremental_ingest(manifest, filepaths, load_file, text_splitter, vectorstore)
+print(f"向量库中的切块数：{len(vectorstore.get()['ids'])}")
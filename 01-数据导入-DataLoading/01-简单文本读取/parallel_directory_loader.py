@@ -0,0 +1,229 @@
+"""
+进程池并行目录加载器：DirectoryLoader / SimpleDirectoryReader 的并行版
+功能：
+1. 按扩展名为每个文件选择加载器，在进程池中并行解析（PDF/DOCX解析是CPU密集型，可随核数扩展）
+2. 每个文件单独设置超时，一个慢文件或坏文件不会拖住整批：超时的工作进程会被直接终止并替换，
+   超时从工作进程真正开始处理该文件时算起
+3. 解析完一个文件就立即产出它的Document，不必等整个目录加载完
+4. 失败的文件收集到加载报告中，而不是中断整个加载过程
+
+注意：在macOS/Windows上进程以spawn方式启动，调用代码必须放在 if __name__ == "__main__": 之下
+"""
+import fnmatch
+import importlib
+import multiprocessing
+import multiprocessing.connection
+import os
+import signal
+import time
+import traceback
+from collections import deque
+from dataclasses import dataclass, field
+from typing import List
+
+# 扩展名 -> (模块, 加载器类, 参数)，用字符串描述以便传给子进程
+LANGCHAIN_LOADERS = {
+    ".txt": ("langchain_community.document_loaders", "TextLoader", {"encoding": "utf-8"}),
+    ".md": ("langchain_community.document_loaders", "TextLoader", {"encoding": "utf-8"}),
+    ".pdf": ("langchain_community.document_loaders", "PyPDFLoader", {}),
+    ".docx": ("langchain_community.document_loaders", "Docx2txtLoader", {}),
+    ".csv": ("langchain_community.document_loaders", "CSVLoader", {"encoding": "utf-8"}),
+}
+DEFAULT_LOADER = ("langchain_community.document_loaders", "UnstructuredFileLoader", {})
+
+
+@dataclass
+class LoadFailure:
+    """加载失败的文件"""
+    path: str
+    error: str
+    elapsed: float
+
+
+@dataclass
+class LoadReport:
+    """一次目录加载的统计报告"""
+    total_files: int = 0
+    succeeded_files: int = 0
+    num_documents: int = 0
+    elapsed: float = 0.0
+    failures: List[LoadFailure] = field(default_factory=list)
+
+    def summary(self):
+        lines = [f"共 {self.total_files} 个文件，成功 {self.succeeded_files} 个，失败 {len(self.failures)} 个，"
+                 f"得到 {self.num_documents} 个文档，耗时 {self.elapsed:.2f}s"]
+        for failure in self.failures:
+            lines.append(f"  [失败] {failure.path}（{failure.elapsed:.1f}s）: {failure.error}")
+        return "\n".join(lines)
+
+
+class _FileTimeout(Exception):
+    pass
+
+
+def _raise_timeout(signum, frame):
+    raise _FileTimeout()
+
+
+def _load_file(path, backend, loader_spec, timeout):
+    """在子进程中加载单个文件，返回 (状态, 文档列表或错误信息, 耗时)"""
+    start = time.perf_counter()
+    # POSIX系统用SIGALRM在子进程内部强制超时；Windows没有SIGALRM，由主进程负责判定超时
+    use_alarm = timeout and hasattr(signal, "SIGALRM")
+    if use_alarm:
+        signal.signal(signal.SIGALRM, _raise_timeout)
+        signal.alarm(int(max(1, timeout)))
+    try:
+        if backend == "llamaindex":
+            from llama_index.core import SimpleDirectoryReader
+            docs = SimpleDirectoryReader(input_files=[path]).load_data()
+        else:
+            module, class_name, kwargs = loader_spec
+            loader_cls = getattr(importlib.import_module(module), class_name)
+            docs = loader_cls(path, **kwargs).load()
+        return "ok", docs, time.perf_counter() - start
+    except _FileTimeout:
+        return "error", f"超时（>{timeout}s）", time.perf_counter() - start
+    except Exception as e:
+        # 异常对象不一定能序列化回主进程，只传回错误文本
+        detail = traceback.format_exception_only(type(e), e)[-1].strip()
+        return "error", detail, time.perf_counter() - start
+    finally:
+        if use_alarm:
+            signal.alarm(0)
+
+
+def _worker_main(conn):
+    """工作进程：逐个接收文件，开始处理时先回报，处理完回传结果；收到None时退出"""
+    while True:
+        task = conn.recv()
+        if task is None:
+            break
+        conn.send(("started", None))
+        conn.send(("done", _load_file(*task)))
+
+
+class _Worker:
+    """一个可以被强制终止的工作进程，同一时间只处理一个文件"""
+    def __init__(self, context):
+        self.conn, child_conn = context.Pipe()
+        self.process = context.Process(target=_worker_main, args=(child_conn,), daemon=True)
+        self.process.start()
+        child_conn.close()
+        self.path = None        # 正在处理的文件，空闲时为None
+        self.started_at = None  # 工作进程回报开始处理的时间
+
+    def submit(self, path, task):
+        self.path, self.started_at = path, None
+        self.conn.send(task)
+
+    def kill(self):
+        self.process.terminate()
+        self.process.join(1)
+        if self.process.is_alive():
+            self.process.kill()
+            self.process.join()
+        self.conn.close()
+
+    def close(self):
+        try:
+            self.conn.send(None)
+        except (BrokenPipeError, OSError):
+            pass
+        self.process.join(1)
+        if self.process.is_alive():
+            self.kill()
+        else:
+            self.conn.close()
+
+
+class ParallelDirectoryLoader:
+    """进程池并行加载目录下的文件"""
+    def __init__(self, path, glob="**/*", exclude=None, max_workers=None, timeout=120,
+                 backend="langchain", loader_mapping=None, default_loader=DEFAULT_LOADER):
+        self.path = path
+        self.glob = glob
+        self.exclude = exclude or []
+        self.max_workers = max_workers or os.cpu_count()
+        self.timeout = timeout
+        self.backend = backend
+        self.loader_mapping = {**LANGCHAIN_LOADERS, **(loader_mapping or {})}
+        self.default_loader = default_loader
+        self.report = LoadReport()
+
+    def _list_files(self):
+        """按glob模式列出文件，跳过隐藏文件"""
+        pattern = self.glob[3:] if self.glob.startswith("**/") else self.glob
+        files = []
+        for root, dirs, filenames in os.walk(self.path):
+            dirs[:] = [d for d in dirs if not d.startswith(".")]
+            for filename in filenames:
+                if filename.startswith(".") or not fnmatch.fnmatch(filename, pattern):
+                    continue
+                if any(fnmatch.fnmatch(filename, p) for p in self.exclude):
+                    continue
+                files.append(os.path.join(root, filename))
+        return sorted(files)
+
+    def lazy_load(self):
+        """边解析边产出Document；全部结束后self.report记录成功与失败情况"""
+        files = self._list_files()
+        self.report = LoadReport(total_files=len(files))
+        start = time.perf_counter()
+        context = multiprocessing.get_context()
+        queue = deque(files)
+        workers = [_Worker(context) for _ in range(min(self.max_workers, len(files)))]
+        try:
+            while queue or any(worker.path for worker in workers):
+                for worker in workers:
+                    if worker.path is None and queue:
+                        path = queue.popleft()
+                        spec = self.loader_mapping.get(os.path.splitext(path)[1].lower(), self.default_loader)
+                        worker.submit(path, (path, self.backend, spec, self.timeout))
+
+                busy = {worker.conn: worker for worker in workers if worker.path}
+                for conn in multiprocessing.connection.wait(list(busy), timeout=1.0):
+                    worker = busy[conn]
+                    try:
+                        kind, payload = conn.recv()
+                    except EOFError:
+                        # 工作进程崩溃（如C扩展段错误），换一个新的进程
+                        self.report.failures.append(LoadFailure(worker.path, "工作进程异常退出", 0.0))
+                        workers[workers.index(worker)] = self._replace(worker, context)
+                        continue
+                    if kind == "started":
+                        worker.started_at = time.perf_counter()
+                        continue
+                    path, (status, result, elapsed) = worker.path, payload
+                    worker.path = worker.started_at = None
+                    if status == "ok":
+                        self.report.succeeded_files += 1
+                        self.report.num_documents += len(result)
+                        yield from result
+                    else:
+                        self.report.failures.append(LoadFailure(path, result, elapsed))
+
+                # 主进程兜底：子进程内的超时机制不可用（Windows）或被C扩展卡住时，直接终止该工作进程
+                now = time.perf_counter()
+                for i, worker in enumerate(workers):
+                    if worker.path and worker.started_at and self.timeout \
+                            and now - worker.started_at > self.timeout + 5:
+                        self.report.failures.append(
+                            LoadFailure(worker.path, f"超时（>{self.timeout}s），已终止工作进程", now - worker.started_at))
+                        workers[i] = self._replace(worker, context)
+        finally:
+            # 调用方提前停止迭代时，正在处理的文件不再等待
+            for worker in workers:
+                if worker.path:
+                    worker.kill()
+                else:
+                    worker.close()
+            self.report.elapsed = time.perf_counter() - start
+
+    @staticmethod
+    def _replace(worker, context):
+        worker.kill()
+        return _Worker(context)
+
+    def load(self):
+        return list(self.lazy_load())
@@ -0,0 +1,55 @@
+# 流式读取大型JSON / JSONL：不把整个文件读入内存，逐条产出Document
+# pip install ijson
+import json
+import os
+from streaming_json_loader import StreamingJSONLoader
+
+# 正文由多个字段拼接而成，路径写法与jq类似
+content_fields = [
+    ".title",
+    ".description",
+    ".combat_details.combat_style[]",
+    ".combat_details.abilities_used[]",
+    ".scene_info.location",
+    ".scene_info.environment",
+    ".scene_info.time_of_day",
+]
+metadata_fields = {"id": ".id", "category": ".category", "location": ".scene_info.location"}
+
+if __name__ == "__main__":
+    print("=== 1. 流式读取JSON：逐条取出 .data[] 中的记录 ===")
+    loader = StreamingJSONLoader(
+        file_path="90-文档-Data/灭神纪/战斗场景.json",
+        item_path=".data[]",
+        content_fields=content_fields,
+        metadata_fields=metadata_fields,
+    )
+    for doc in loader.lazy_load():
+        print(doc.metadata["seq_num"], doc.metadata["id"], doc.page_content[:40])
+
+    print("\n=== 2. 与JSONLoader的jq_schema对应：主角信息 ===")
+    main_loader = StreamingJSONLoader(
+        file_path="90-文档-Data/灭神纪/人物角色.json",
+        item_path=".mainCharacter",
+        content_fields=[".name", ".backstory"],
+        joiner="，",
+    )
+    print(list(main_loader.lazy_load()))
+
+    print("\n=== 3. JSONL：多进程并行解析 ===")
+    # 先把JSON转成JSONL作为示例，大型导出文件通常直接就是JSONL
+    jsonl_path = "output/战斗场景.jsonl"
+    os.makedirs("output", exist_ok=True)
+    with open("90-文档-Data/灭神纪/战斗场景.json", "r", encoding="utf-8") as f, \
+            open(jsonl_path, "w", encoding="utf-8") as out:
+        for item in json.load(f)["data"]:
+            out.write(json.dumps(item, ensure_ascii=False) + "\n")
+    jsonl_loader = StreamingJSONLoader(
+        file_path=jsonl_path,
+        content_fields=content_fields,
+        metadata_fields=metadata_fields,
+        max_workers=4,
+        chunk_lines=10,  # 每个子进程一次解析10行，大文件可设为数千行
+    )
+    docs = list(jsonl_loader.lazy_load())
+    print(f"共 {len(docs)} 条，第一条: {docs[0]}")
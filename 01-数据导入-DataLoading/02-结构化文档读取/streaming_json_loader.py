@@ -0,0 +1,193 @@
+"""
+流式JSON / JSONL加载器：适合几个GB的大型导出文件
+与 JSONLoader、json.load 先把整个文件解析进内存不同：
+- JSON文件用ijson做事件流解析，按类似jq的路径（如 ".data[]"）逐条取出记录，内存占用只与单条记录大小有关
+- JSONL文件逐行读取，按块交给多个进程并行解析，结果保持原有顺序
+- 正文和元数据字段都用类似jq的路径指定，如 ".title"、".scene_info.location"、".combat_details.combat_style[]"
+- lazy_load逐条产出Document，可以边读边切块、嵌入
+
+依赖：pip install ijson
+
+支持的路径语法（jq的一个子集）：
+    .              整个记录
+    .a.b           嵌套字段
+    .a[]           展开数组
+    .a[0]          数组下标
+"""
+import json
+import os
+import re
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from itertools import islice
+from typing import Callable, Dict, Iterator, List, Optional
+
+from langchain_core.document_loaders import BaseLoader
+from langchain_core.documents import Document
+
+_TOKEN = re.compile(r"\.([^.\[\]]+)|\.?\[(\d*)\]")
+
+
+def parse_path(path):
+    """把 ".a.b[].c[0]" 解析为 ["a", "b", [], "c", 0]，[]表示展开数组"""
+    if path in (".", ""):
+        return []
+    tokens, position = [], 0
+    for match in _TOKEN.finditer(path):
+        if match.start() != position:
+            raise ValueError(f"无法解析的路径: {path}")
+        key, index = match.groups()
+        if key is not None:
+            tokens.append(key)
+        else:
+            tokens.append(int(index) if index else [])
+        position = match.end()
+    if position != len(path):
+        raise ValueError(f"无法解析的路径: {path}")
+    return tokens
+
+
+def get_path(obj, tokens):
+    """按解析后的路径取值；路径中有[]时返回列表，取不到时返回None"""
+    values, expanded = [obj], False
+    for token in tokens:
+        next_values = []
+        for value in values:
+            if token == []:
+                if isinstance(value, list):
+                    next_values.extend(value)
+                expanded = True
+            elif isinstance(token, int):
+                if isinstance(value, list) and -len(value) <= token < len(value):
+                    next_values.append(value[token])
+            elif isinstance(value, dict) and token in value:
+                next_values.append(value[token])
+        values = next_values
+    if expanded:
+        return values
+    return values[0] if values else None
+
+
+def to_ijson_prefix(item_path):
+    """把 ".data[]" 这样的记录路径转换为ijson的前缀 "data.item" """
+    parts = []
+    for token in parse_path(item_path):
+        if isinstance(token, int):
+            raise ValueError("记录路径不支持数组下标，请使用[]")
+        parts.append("item" if token == [] else token)
+    return ".".join(parts)
+
+
+def iter_json_items(file_path, item_path=".[]"):
+    """
+    流式逐条读取JSON文件中item_path处的记录，如 iter_json_items("战斗场景.json", ".data[]")
+    item_path不以[]结尾时只产出一个对象
+    """
+    import ijson
+    with open(file_path, "rb") as f:
+        # use_float=True：小数解析为float而不是Decimal，与json.load一致
+        yield from ijson.items(f, to_ijson_prefix(item_path), use_float=True)
+
+
+def _to_text(value, joiner):
+    if value is None:
+        return ""
+    if isinstance(value, list):
+        return joiner.join(_to_text(v, joiner) for v in value if v not in (None, ""))
+    if isinstance(value, dict):
+        return json.dumps(value, ensure_ascii=False)
+    return str(value).strip()
+
+
+def record_to_content(record, content_tokens, metadata_tokens, joiner=" ", content_fn=None):
+    """从一条记录中取出正文和元数据"""
+    if content_fn is not None:
+        content = content_fn(record)
+    elif content_tokens is None:
+        content = record if isinstance(record, str) else json.dumps(record, ensure_ascii=False)
+    else:
+        content = joiner.join(filter(None, (_to_text(get_path(record, tokens), joiner) for tokens in content_tokens)))
+    metadata = {name: get_path(record, tokens) for name, tokens in metadata_tokens.items()}
+    return content, metadata
+
+
+def _parse_jsonl_chunk(lines, content_tokens, metadata_tokens, joiner, content_fn):
+    """在子进程中解析一块JSONL，返回 [(正文, 元数据), ...]"""
+    results = []
+    for line in lines:
+        line = line.strip()
+        if line:
+            results.append(record_to_content(json.loads(line), content_tokens, metadata_tokens, joiner, content_fn))
+    return results
+
+
+class StreamingJSONLoader(BaseLoader):
+    """流式加载JSON或JSONL文件，逐条产出Document"""
+    def __init__(
+        self,
+        file_path: str,
+        item_path: str = ".[]",
+        content_fields: Optional[List[str]] = None,
+        metadata_fields: Optional[Dict[str, str]] = None,
+        joiner: str = " ",
+        content_fn: Optional[Callable] = None,
+        json_lines: Optional[bool] = None,
+        max_workers: Optional[int] = None,
+        chunk_lines: int = 2000,
+    ):
+        """
+        item_path: JSON文件中记录所在的路径，如 ".data[]"；JSONL文件每行就是一条记录，忽略此参数
+        content_fields: 组成正文的字段路径，按顺序用joiner连接；None表示整条记录的JSON文本
+        metadata_fields: 元数据名 -> 字段路径，如 {"category": ".category"}
+        content_fn: 自定义正文生成函数，优先于content_fields；并行解析JSONL时必须是模块级函数
+        json_lines: 是否按JSONL处理，默认根据扩展名 .jsonl 判断
+        max_workers: 解析JSONL的进程数，设为1时在当前进程中解析
+        chunk_lines: 每次交给子进程解析的行数
+        """
+        self.file_path = file_path
+        self.item_path = item_path
+        self.content_tokens = [parse_path(p) for p in content_fields] if content_fields is not None else None
+        self.metadata_tokens = {name: parse_path(p) for name, p in (metadata_fields or {}).items()}
+        self.joiner = joiner
+        self.content_fn = content_fn
+        self.json_lines = file_path.endswith(".jsonl") if json_lines is None else json_lines
+        self.max_workers = max_workers or os.cpu_count()
+        self.chunk_lines = chunk_lines
+
+    def _make_document(self, content, metadata, seq_num):
+        return Document(page_content=content, metadata={"source": self.file_path, "seq_num": seq_num, **metadata})
+
+    def _lazy_load_json(self):
+        for seq_num, record in enumerate(iter_json_items(self.file_path, self.item_path), 1):
+            content, metadata = record_to_content(
+                record, self.content_tokens, self.metadata_tokens, self.joiner, self.content_fn)
+            yield self._make_document(content, metadata, seq_num)
+
+    def _lazy_load_jsonl(self):
+        args = (self.content_tokens, self.metadata_tokens, self.joiner, self.content_fn)
+        seq_num = 0
+        with open(self.file_path, "r", encoding="utf-8") as f:
+            chunks = iter(lambda: list(islice(f, self.chunk_lines)), [])
+            if self.max_workers == 1:
+                for chunk in chunks:
+                    for content, metadata in _parse_jsonl_chunk(chunk, *args):
+                        seq_num += 1
+                        yield self._make_document(content, metadata, seq_num)
+                return
+            with ProcessPoolExecutor(max_workers=self.max_workers) as executor:
+                # 同时在途的块数有上限，读文件的速度不会远远超过解析的速度，内存占用有界
+                in_flight = deque()
+                for chunk in chunks:
+                    in_flight.append(executor.submit(_parse_jsonl_chunk, chunk, *args))
+                    if len(in_flight) < self.max_workers * 2:
+                        continue
+                    for content, metadata in in_flight.popleft().result():
+                        seq_num += 1
+                        yield self._make_document(content, metadata, seq_num)
+                while in_flight:
+                    for content, metadata in in_flight.popleft().result():
+                        seq_num += 1
+                        yield self._make_document(content, metadata, seq_num)
+
+    def lazy_load(self) -> Iterator[Document]:
+        return self._lazy_load_jsonl() if self.json_lines else self._lazy_load_json()
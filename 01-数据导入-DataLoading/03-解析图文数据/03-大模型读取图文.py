@@ -1,75 +1,52 @@
 from pdf2image import convert_from_path
-import base64
 import os
-from openai import OpenAI
+from openai import AsyncOpenAI
+import sys
+sys.path.append("01-数据导入-DataLoading")  # 共用的file_hashing模块
+from image_captioning import caption_images_sync, captions_to_documents
 
-# 初始化 OpenAI 客户端
-client = OpenAI(
+# 初始化 OpenAI 客户端（异步版本，可以同时发出多个请求）
+client = AsyncOpenAI(
         api_key=os.getenv("DASHSCOPE_API_KEY"),
         base_url="https://dashscope.aliyuncs.com/compatible-mode/v1",
 )
 output_dir = "temp_images"
 
-# 1. PDF 转图片
-if not os.path.exists(output_dir):
-    os.makedirs(output_dir)
+if __name__ == "__main__":
+    # 1. PDF 转图片：直接写入磁盘，不把所有页面图片同时留在内存中
+    if not os.path.exists(output_dir):
+        os.makedirs(output_dir)
 
-images = convert_from_path("90-文档-Data/黑悟空/黑神话悟空.pdf")
-image_paths = []
-for i, image in enumerate(images):
-    image_path = os.path.join(output_dir, f'page_{i+1}.jpg')
-    image.save(image_path, 'JPEG')
-    image_paths.append(image_path)
-print(f"成功转换 {len(image_paths)} 页")
+    image_paths = convert_from_path("90-文档-Data/黑悟空/黑神话悟空.pdf", output_folder=output_dir,
+                                    fmt="jpeg", paths_only=True)
+    print(f"成功转换 {len(image_paths)} 页")
 
-
-# 2. qwen-vl-max 分析图片
-print("\n开始分析图片...")
-results = []
-for image_path in image_paths:
-    with open(image_path, "rb") as image_file:
-        base64_image = base64.b64encode(image_file.read()).decode('utf-8')
-    
-    response = client.chat.completions.create(
+    # 2. qwen-vl-max 分析图片：进程池缩放编码，并发调用模型，结果按图片哈希缓存
+    print("\n开始分析图片...")
+    results = caption_images_sync(
+        image_paths,
+        client,
         model="qwen-vl-max",
-        messages=[
-            {
-                "role": "user",
-                "content": [
-                    {"type": "text", "text": "请详细描述这张PPT幻灯片的内容，包括标题、正文和图片内容。"},
-                    {
-                        "type": "image_url",
-                        "image_url": {
-                            "url": f"data:image/jpeg;base64,{base64_image}"
-                        }
-                    }
-                ]
-            }
-        ],
-        max_tokens=300
-    )
-results.append(response.choices[0].message.content)
-
-
-# 3. 转换为 LangChain 的 Document 数据结构
-from langchain_core.documents import Document
-
-documents = [
-    Document(
-        page_content=result,
-        metadata={"source": "data/黑悟空/黑神话悟空.pdf", "page_number": i + 1}
+        prompt="请详细描述这张PPT幻灯片的内容，包括标题、正文和图片内容。",
+        max_concurrency=8,        # 同时在途的请求数
+        requests_per_minute=60,   # 按账号的限流额度设置
     )
-    for i, result in enumerate(results)
-]
-
-# 输出所有生成的 Document 对象
-print("\n分析结果：")
-for doc in documents:
-    print(f"内容: {doc.page_content}\n元数据: {doc.metadata}\n")
-    print("-" * 80)
-
-# 清理临时文件
-for image_path in image_paths:
-    os.remove(image_path)
-os.rmdir(output_dir)
-
+    for result in results:
+        if result.error:
+            print(f"{result.path} 分析失败: {result.error}")
+
+    # 3. 转换为 LangChain 的 Document 数据结构
+    documents = captions_to_documents(results, source="90-文档-Data/黑悟空/黑神话悟空.pdf")
+    for doc in documents:
+        doc.metadata["page_number"] = doc.metadata["image_index"] + 1
+
+    # 输出所有生成的 Document 对象
+    print("\n分析结果：")
+    for doc in documents:
+        print(f"内容: {doc.page_content}\n元数据: {doc.metadata}\n")
+        print("-" * 80)
+
+    # 清理临时文件（描述已经缓存，再次运行不会重复调用模型）
+    for image_path in image_paths:
+        os.remove(image_path)
+    os.rmdir(output_dir)
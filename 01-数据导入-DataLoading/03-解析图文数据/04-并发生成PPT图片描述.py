@@ -0,0 +1,37 @@
+# 为PPT中的所有图片生成描述：图片从pptx中直接解压，缩放编码并行进行，模型调用并发且限速
+# 描述按图片内容哈希缓存，修改幻灯片后重新导入，只有新增的图片会调用模型
+import os
+import time
+from openai import AsyncOpenAI
+import sys
+sys.path.append("01-数据导入-DataLoading")  # 共用的file_hashing模块
+from image_captioning import caption_images_sync, captions_to_documents, extract_pptx_media
+
+pptx_path = "90-文档-Data/黑悟空/黑神话悟空.pptx"
+
+client = AsyncOpenAI(
+        api_key=os.getenv("DASHSCOPE_API_KEY"),
+        base_url="https://dashscope.aliyuncs.com/compatible-mode/v1",
+)
+
+if __name__ == "__main__":
+    image_paths = extract_pptx_media(pptx_path, "output/pptx_media")
+    print(f"PPT中共有 {len(image_paths)} 张图片")
+
+    start = time.perf_counter()
+    results = caption_images_sync(
+        image_paths,
+        client,
+        model="qwen-vl-max",
+        prompt="请用一段话描述这张图片的内容，便于检索。",
+        max_concurrency=8,
+        requests_per_minute=120,
+        max_side=768,  # 描述用不到原图分辨率，缩小后请求更快、更省token
+    )
+    print(f"耗时 {time.perf_counter() - start:.2f}s，"
+          f"新生成 {sum(not r.cached and r.caption is not None for r in results)} 条，"
+          f"缓存命中 {sum(r.cached for r in results)} 条，失败 {sum(r.error is not None for r in results)} 条")
+
+    documents = captions_to_documents(results, source=pptx_path)
+    for doc in documents[:3]:
+        print(f"{doc.metadata['image_path']}: {doc.page_content}")
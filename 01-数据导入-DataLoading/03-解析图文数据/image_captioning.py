@@ -0,0 +1,225 @@
+"""
+多模态大模型图片描述（Captioning）流水线
+- 图片的缩放和base64编码在进程池中并行完成（CPU密集）
+- 调用视觉大模型时用信号量限制并发数，用限速器控制每分钟请求数；限流、超时、连接失败和5xx错误指数退避重试
+- 描述结果缓存在SQLite中，缓存键为 (图片内容哈希, 提示词版本, 模型, 缩放尺寸)；
+  重新导入同一份幻灯片时只有新图片会调用模型，提示词、模型或缩放尺寸变化时自动重新生成；
+  内容相同的图片（如每页重复的logo）只编码和请求一次
+- 结果按输入顺序返回，可以直接转换为LangChain Document
+
+用法：
+    from openai import AsyncOpenAI
+    client = AsyncOpenAI(api_key=..., base_url=...)
+    results = caption_images_sync(image_paths, client, model="qwen-vl-max", prompt="请描述这张图片")
+"""
+import asyncio
+import base64
+import hashlib
+import io
+import os
+import sqlite3
+import time
+import zipfile
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass
+from typing import List, Optional
+
+from langchain_core.documents import Document
+
+from file_hashing import file_hash as image_hash
+
+IMAGE_EXTS = (".png", ".jpg", ".jpeg", ".gif", ".bmp", ".tiff", ".webp")
+
+
+def prompt_version(prompt):
+    """提示词的短哈希，提示词一改缓存就自动失效"""
+    return hashlib.sha1(prompt.encode("utf-8")).hexdigest()[:12]
+
+
+def encode_image(path, max_side=1024, quality=85):
+    """缩放到最长边不超过max_side，转成JPEG并base64编码（在子进程中执行）"""
+    from PIL import Image
+    with Image.open(path) as image:
+        image = image.convert("RGB")
+        image.thumbnail((max_side, max_side))  # 等比缩放，只缩小不放大
+        buffer = io.BytesIO()
+        image.save(buffer, format="JPEG", quality=quality)
+    return base64.b64encode(buffer.getvalue()).decode("utf-8")
+
+
+def extract_pptx_media(pptx_path, output_dir):
+    """PPTX本质上是zip包，图片都在 ppt/media/ 下，直接解压出来"""
+    os.makedirs(output_dir, exist_ok=True)
+    paths = []
+    with zipfile.ZipFile(pptx_path) as pptx:
+        for name in sorted(pptx.namelist()):
+            if name.startswith("ppt/media/") and name.lower().endswith(IMAGE_EXTS):
+                path = os.path.join(output_dir, os.path.basename(name))
+                with pptx.open(name) as src, open(path, "wb") as dst:
+                    dst.write(src.read())
+                paths.append(path)
+    return paths
+
+
+class CaptionCache:
+    """
+    基于SQLite的图片描述缓存
+    送给模型的图片按max_side缩放，缩放尺寸不同描述也可能不同，所以max_side也是缓存键的一部分
+    （旧版本的captions表没有记录缩放尺寸，不再读取）
+    """
+    def __init__(self, db_path="output/caption_cache.sqlite"):
+        os.makedirs(os.path.dirname(db_path) or ".", exist_ok=True)
+        self.db = sqlite3.connect(db_path)
+        self.db.execute(
+            "CREATE TABLE IF NOT EXISTS image_captions ("
+            "image_hash TEXT, prompt_version TEXT, model TEXT, max_side INTEGER, caption TEXT, created_at REAL, "
+            "PRIMARY KEY (image_hash, prompt_version, model, max_side))"
+        )
+        self.db.commit()
+
+    def get(self, image_hash, version, model, max_side):
+        row = self.db.execute(
+            "SELECT caption FROM image_captions "
+            "WHERE image_hash = ? AND prompt_version = ? AND model = ? AND max_side = ?",
+            (image_hash, version, model, max_side)
+        ).fetchone()
+        return row[0] if row else None
+
+    def put(self, image_hash, version, model, max_side, caption):
+        self.db.execute(
+            "INSERT OR REPLACE INTO image_captions VALUES (?, ?, ?, ?, ?, ?)",
+            (image_hash, version, model, max_side, caption, time.time())
+        )
+        self.db.commit()
+
+
+class RateLimiter:
+    """限制每分钟的请求数：相邻两次请求至少间隔 60 / requests_per_minute 秒"""
+    def __init__(self, requests_per_minute):
+        self.interval = 60.0 / requests_per_minute if requests_per_minute else 0.0
+        self._next_time = 0.0
+        self._lock = asyncio.Lock()
+
+    async def wait(self):
+        if not self.interval:
+            return
+        async with self._lock:
+            now = time.monotonic()
+            delay = self._next_time - now
+            self._next_time = max(now, self._next_time) + self.interval
+        if delay > 0:
+            await asyncio.sleep(delay)
+
+
+@dataclass
+class CaptionResult:
+    """一张图片的描述结果"""
+    path: str
+    image_hash: str
+    caption: Optional[str] = None
+    cached: bool = False
+    error: Optional[str] = None
+    latency: float = 0.0
+
+
+def _is_retryable(error):
+    """限流(429)、超时、连接失败和服务端5xx错误值得重试；400（图片格式不对、内容审核）、401等错误重试也不会成功"""
+    if isinstance(error, (asyncio.TimeoutError, TimeoutError, ConnectionError)):
+        return True
+    import openai
+    if isinstance(error, (openai.RateLimitError, openai.APITimeoutError, openai.APIConnectionError)):
+        return True
+    return isinstance(error, openai.APIStatusError) and (error.status_code in (408, 429) or error.status_code >= 500)
+
+
+async def _request_caption(client, model, prompt, base64_image, max_tokens, max_retries, backoff):
+    for attempt in range(max_retries + 1):
+        try:
+            response = await client.chat.completions.create(
+                model=model,
+                messages=[{
+                    "role": "user",
+                    "content": [
+                        {"type": "text", "text": prompt},
+                        {"type": "image_url", "image_url": {"url": f"data:image/jpeg;base64,{base64_image}"}},
+                    ],
+                }],
+                max_tokens=max_tokens,
+            )
+            return response.choices[0].message.content
+        except Exception as e:
+            if attempt == max_retries or not _is_retryable(e):
+                raise
+            await asyncio.sleep(backoff * (2 ** attempt))
+
+
+async def caption_images(image_paths, client, model="qwen-vl-max",
+                         prompt="请详细描述这张图片的内容，包括标题、正文和图片内容。",
+                         version=None, max_concurrency=8, requests_per_minute=60, max_side=1024,
+                         max_tokens=300, max_retries=3, backoff=1.0, max_workers=None,
+                         cache: Optional[CaptionCache] = None) -> List[CaptionResult]:
+    """
+    并发生成图片描述，返回与image_paths顺序一致的结果列表
+    client: openai.AsyncOpenAI（或兼容接口，如DashScope、vLLM）
+    version: 提示词版本，默认取提示词的哈希
+    """
+    cache = cache or CaptionCache()
+    version = version or prompt_version(prompt)
+    results = [CaptionResult(path, image_hash(path)) for path in image_paths]
+
+    # 先查缓存，只有未命中的图片才需要编码和调用模型；内容相同的图片按哈希合并，只处理第一张
+    misses = {}  # 图片哈希 -> 该哈希对应的所有结果
+    for result in results:
+        if result.image_hash in misses:
+            misses[result.image_hash].append(result)
+            continue
+        caption = cache.get(result.image_hash, version, model, max_side)
+        if caption is not None:
+            result.caption, result.cached = caption, True
+        else:
+            misses[result.image_hash] = [result]
+    num_misses = sum(len(group) for group in misses.values())
+    print(f"共 {len(results)} 张图片，命中缓存 {len(results) - num_misses} 张，"
+          f"需要调用模型 {len(misses)} 张（去除内容重复的 {num_misses - len(misses)} 张）")
+    if not misses:
+        return results
+
+    semaphore = asyncio.Semaphore(max_concurrency)
+    limiter = RateLimiter(requests_per_minute)
+    loop = asyncio.get_running_loop()
+
+    with ProcessPoolExecutor(max_workers=max_workers) as executor:
+        async def process(group):
+            result = group[0]
+            try:
+                # 编码在进程池中进行，不阻塞事件循环；编码完成的图片立即进入请求队列
+                base64_image = await loop.run_in_executor(executor, encode_image, result.path, max_side)
+                async with semaphore:
+                    await limiter.wait()
+                    start = time.perf_counter()
+                    result.caption = await _request_caption(
+                        client, model, prompt, base64_image, max_tokens, max_retries, backoff)
+                    result.latency = time.perf_counter() - start
+                cache.put(result.image_hash, version, model, max_side, result.caption)
+            except Exception as e:
+                result.error = f"{type(e).__name__}: {e}"
+            for duplicate in group[1:]:
+                duplicate.caption, duplicate.error, duplicate.latency = result.caption, result.error, result.latency
+
+        await asyncio.gather(*(process(group) for group in misses.values()))
+    return results
+
+
+def caption_images_sync(image_paths, client, **kwargs) -> List[CaptionResult]:
+    """caption_images的同步版本"""
+    return asyncio.run(caption_images(image_paths, client, **kwargs))
+
+
+def captions_to_documents(results, source, **extra_metadata):
+    """把描述结果转换为Document，失败的图片跳过"""
+    return [
+        Document(page_content=result.caption,
+                 metadata={"source": source, "image_path": result.path, "image_hash": result.image_hash,
+                           "image_index": i, **extra_metadata})
+        for i, result in enumerate(results) if result.caption
+    ]
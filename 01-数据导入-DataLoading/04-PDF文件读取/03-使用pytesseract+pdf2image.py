@@ -2,17 +2,17 @@
 # sudo apt-get install tesseract-ocr
 # sudo apt-get install tesseract-ocr-chi-sim
 
-import pdf2image
-import pytesseract
+# 逐页渲染和OCR，在进程池中并行执行，并按页码顺序流式输出
+# 渲染的图片和OCR文本缓存在 output/ocr_cache/ 下，再次运行直接读取缓存；有文本层的页面跳过OCR
+import time
+import sys
+sys.path.append("01-数据导入-DataLoading")  # 共用的file_hashing模块
+from ocr_pipeline import iter_ocr_pages
 
-# 将 PDF 转换为图片并保存
-images = pdf2image.convert_from_path('90-文档-Data/黑悟空/黑神话悟空.pdf')
-for i, image in enumerate(images):
-    image.save(f'output/page_{i+1}.png')
-
-# 使用 pytesseract 提取文本
-for i, image in enumerate(images):
-    text = pytesseract.image_to_string(image, lang='chi_sim')
-    print(f"第 {i+1} 页文本:")
-    print(text)
-    print("\n") 
\ No newline at end of file
+if __name__ == "__main__":
+    start = time.perf_counter()
+    for doc in iter_ocr_pages('90-文档-Data/黑悟空/黑神话悟空.pdf', dpi=200, lang='chi_sim'):
+        print(f"第 {doc.metadata['page'] + 1} 页文本（来源: {doc.metadata['text_source']}，缓存: {doc.metadata['from_cache']}）:")
+        print(doc.page_content)
+        print("\n")
+    print(f"总耗时: {time.perf_counter() - start:.2f}s")
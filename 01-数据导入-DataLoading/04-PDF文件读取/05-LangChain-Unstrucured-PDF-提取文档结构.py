@@ -1,14 +1,9 @@
 file_path = ("90-文档-Data/山西文旅/云冈石窟-en.pdf")
-from langchain_unstructured import UnstructuredLoader
-loader = UnstructuredLoader(
-    file_path=file_path,
-    strategy="hi_res",
-    # partition_via_api=True,
-    # coordinates=True,
-)
-docs = []
-for doc in loader.lazy_load():
-    docs.append(doc)
+# 等价于 UnstructuredLoader(file_path=file_path, strategy="hi_res").load()，解析结果缓存在output/partition_cache下
+import sys
+sys.path.append("01-数据导入-DataLoading")  # 共用的file_hashing模块
+from partition_cache import cached_unstructured_documents
+docs = cached_unstructured_documents(file_path, strategy="hi_res")
 
 def extract_basic_structure(docs):
     """基础结构化提取:按文档类型组织内容"""
@@ -1,9 +1,11 @@
-from unstructured.partition.auto import partition
+import sys
+sys.path.append("01-数据导入-DataLoading")  # 共用的file_hashing模块
+from partition_cache import cached_partition # 带缓存的partition，再次运行直接读取缓存
 # filename = "90-文档-Data/黑悟空/黑神话悟空.pdf"
 filename = "90-文档-Data/山西文旅/云冈石窟-ch.pdf"
 
-elements = partition(filename=filename, 
-                     content_type="application/pdf"
-                    )
+elements = cached_partition(filename, 
+                           content_type="application/pdf"
+                          )
 print("\n\n".join([str(el) for el in elements][:10]))
 
@@ -1,15 +1,18 @@
-# 导入unstructured的partition函数用于PDF解析
-from unstructured.partition.auto import partition
+# 导入带缓存的partition函数用于PDF解析
+# 解析结果按文件哈希、解析参数和unstructured版本缓存在output/partition_cache下
+import sys
+sys.path.append("01-数据导入-DataLoading")  # 共用的file_hashing模块
+from partition_cache import cached_partition
 
 # 设置PDF文件路径
 # filename = "90-文档-Data/黑悟空/黑神话悟空.pdf"
 filename = "90-文档-Data/山西文旅/云冈石窟-ch.pdf"
 
-# 使用partition函数解析PDF文件
+# 使用partition函数解析PDF文件（再次运行时直接从缓存还原）
 # content_type指定文件类型为PDF
-elements = partition(filename=filename, 
-                   content_type="application/pdf"
-                  )
+elements = cached_partition(filename, 
+                            content_type="application/pdf"
+                           )
 
 # 展示解析出的elements的类型和内容
 print("PDF解析后的Elements类型:")
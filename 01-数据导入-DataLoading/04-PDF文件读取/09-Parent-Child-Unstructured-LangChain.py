@@ -1,14 +1,10 @@
 file_path = '90-文档-Data/山西文旅/云冈石窟-en.pdf'
-from langchain_unstructured import UnstructuredLoader
-loader = UnstructuredLoader(
-    file_path=file_path,
-    strategy="hi_res",
-    # partition_via_api=True, # 通过API调用Unstructured
-    # coordinates=True, # 返回元素位置坐标
-)
-docs = []
-for doc in loader.lazy_load():
-    docs.append(doc)
+# 等价于 UnstructuredLoader(file_path=file_path, strategy="hi_res").load()
+# hi_res版面检测很慢，解析结果缓存在output/partition_cache下，再次运行不会重新解析
+import sys
+sys.path.append("01-数据导入-DataLoading")  # 共用的file_hashing模块
+from partition_cache import cached_unstructured_documents
+docs = cached_unstructured_documents(file_path, strategy="hi_res")
 
 
 # 仅筛选第一页的 Doc
@@ -26,32 +22,19 @@ for i, doc in enumerate(page_docs, 1):
     # print(f"  坐标: {doc.metadata.get('coordinates')}")
     print("="*50)
 
-# 仅筛选第一页的 Title
-page_number = 1
-title_dict = {}
-
-# 收集 Title，并建立 parent_id -> Title 的映射
-for doc in docs:
-    if doc.metadata.get("category") == "Title" and doc.metadata.get("page_number") == page_number:
-        title_id = doc.metadata.get("element_id")  # Title 的唯一 ID
-        title_text = doc.page_content.strip()  # 添加 strip() 去除空白字符
-        # 避免重复添加相同的标题
-        if title_text not in [data["title"] for data in title_dict.values()]:
-            title_dict[title_id] = {"title": title_text, "content": []}
-
-# 关联 Title 和其对应的 Text
-for doc in docs:
-    if doc.metadata.get("category") in ["NarrativeText", "Text"] and doc.metadata.get("page_number") == page_number:  # 修改这里以包含 NarrativeText
-        parent_id = doc.metadata.get("parent_id")
-        if parent_id in title_dict:
-            content = doc.page_content.strip()  # 添加 strip() 去除空白字符
-            if content:  # 只添加非空内容
-                title_dict[parent_id]["content"].append(content)
+# 一次遍历所有页面的元素，按 element_id / parent_id 构建章节树
+from section_tree import build_section_tree
+tree = build_section_tree(docs, body_categories=("NarrativeText", "Text"))
 
 # 命令行输出
-for title_data in title_dict.values():
-    if title_data["content"]:  # 只输出有内容的标题
-        print("\n=== " + title_data["title"] + " ===")
-        for content in title_data["content"]:
+for section in tree.iter_sections():
+    if section.content:  # 只输出有内容的标题
+        print(f"\n=== {section.title} （第{section.page_start}-{section.page_end}页） ===")
+        for content in section.content:
             print(content)
-        print()
\ No newline at end of file
+        print()
+
+# 父子文档：章节作为父文档，正文元素作为子文档，可用于父子文档检索
+parent_docs = tree.parent_documents(source=file_path)
+child_docs = tree.child_documents(source=file_path)
+print(f"共 {len(tree.sections)} 个章节，{len(parent_docs)} 个父文档，{len(child_docs)} 个子文档")
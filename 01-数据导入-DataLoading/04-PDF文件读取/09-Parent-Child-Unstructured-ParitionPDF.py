@@ -1,11 +1,14 @@
-from unstructured.documents.elements import Title, NarrativeText, Text
 from unstructured.partition.pdf import partition_pdf
 
 file_path = '90-文档-Data/山西文旅/云冈石窟-en.pdf'
 
-# 使用 unstructured 直接读取 PDF
-elements = partition_pdf(
-    filename=file_path,
+# 使用 unstructured 直接读取 PDF，解析结果缓存在output/partition_cache下，再次运行不会重新解析
+import sys
+sys.path.append("01-数据导入-DataLoading")  # 共用的file_hashing模块
+from partition_cache import cached_partition
+elements = cached_partition(
+    file_path,
+    partition_fn=partition_pdf,
     strategy="hi_res",
     # include_metadata=True,  # 如果需要位置信息
 )
@@ -36,32 +39,19 @@ for i, elem in enumerate(page_elements, 1):
     print(f"  ID: {getattr(elem, '_element_id', None)}")
     print("="*50)
 
-# 仅筛选第一页的 Title
-title_dict = {}
-
-# 收集 Title，并建立 parent_id -> Title 的映射
-for elem in elements:
-    if (isinstance(elem, Title) and 
-        getattr(elem.metadata, "page_number", None) == page_number):
-        title_id = getattr(elem, '_element_id', None) # 获取元素的 ID 单独id亦可
-        title_text = elem.text.strip()
-        if title_text not in [data["title"] for data in title_dict.values()]:
-            title_dict[title_id] = {"title": title_text, "content": []}
-
-# 关联 Title 和其对应的 Text
-for elem in elements:
-    if (isinstance(elem, (NarrativeText, Text)) and 
-        getattr(elem.metadata, "page_number", None) == page_number):
-        parent_id = getattr(elem.metadata, "parent_id", None)
-        if parent_id in title_dict:
-            content = elem.text.strip()
-            if content:  # 只添加非空内容
-                title_dict[parent_id]["content"].append(content)
+# 一次遍历所有页面的元素，按 element_id / parent_id 构建章节树
+from section_tree import build_section_tree
+tree = build_section_tree(elements, body_categories=("NarrativeText", "Text"))
 
 # 命令行输出
-for title_data in title_dict.values():
-    if title_data["content"]:  # 只输出有内容的标题
-        print("\n=== " + title_data["title"] + " ===")
-        for content in title_data["content"]:
+for section in tree.iter_sections():
+    if section.content:  # 只输出有内容的标题
+        print(f"\n=== {section.title} （第{section.page_start}-{section.page_end}页） ===")
+        for content in section.content:
             print(content)
-        print() 
\ No newline at end of file
+        print()
+
+# 父子文档：章节作为父文档，正文元素作为子文档，可用于父子文档检索
+parent_docs = tree.parent_documents(source=file_path)
+child_docs = tree.child_documents(source=file_path)
+print(f"共 {len(tree.sections)} 个章节，{len(parent_docs)} 个父文档，{len(child_docs)} 个子文档")
@@ -0,0 +1,25 @@
+# 流式逐页读取PDF：不像 [page.get_text() for page in doc] 或 loader.load() 那样一次性读入整本，
+# 内存占用与页数无关，读出一页就可以立即切块、嵌入
+from contextlib import closing
+from langchain_text_splitters import RecursiveCharacterTextSplitter
+from pdf_page_iterator import count_pages, iter_pdf_pages, shard_page_ranges
+
+file_path = "90-文档-Data/复杂PDF/uber_10q_march_2022.pdf"
+print(f"文档页数: {count_pages(file_path)}")
+
+# 逐页读取，并直接串联文本切块
+text_splitter = RecursiveCharacterTextSplitter(chunk_size=1000, chunk_overlap=100)
+num_chunks = 0
+with closing(iter_pdf_pages(file_path)) as pages: # closing保证提前退出时也会关闭文件
+    for doc in pages:
+        chunks = text_splitter.split_documents([doc])
+        num_chunks += len(chunks)
+        meta = doc.metadata
+        print(f"第{meta['page'] + 1}页: 尺寸 {meta['width']} x {meta['height']}，"
+              f"图片 {meta['image_count']} 张，链接 {meta['link_count']} 个，切块 {len(chunks)} 个")
+print(f"共生成 {num_chunks} 个切块")
+
+# 按页码区间分片读取：每个分片可以交给不同的进程处理
+for start, stop in shard_page_ranges(count_pages(file_path), 4):
+    shard_pages = sum(1 for _ in iter_pdf_pages(file_path, page_range=(start, stop), engine="pypdf"))
+    print(f"分片 [{start}, {stop}) 读取了 {shard_pages} 页")
@@ -0,0 +1,134 @@
+"""
+扫描型PDF的并行OCR流水线
+- 每页单独渲染、单独OCR，在进程池中并行执行，不会把整本PDF的图片同时放在内存里
+- 结果按页码顺序流式产出，前面的页处理完就可以先交给下游；同时提交的页数有上限，
+  下游提前停止读取时取消还没开始的页
+- 渲染出的PNG和页面文本缓存在 output/ocr_cache/<PDF哈希>/ 下，文件名包含页码和DPI，重复运行直接命中缓存
+- 已经有文本层的页面直接提取文本，不再OCR；每个进程只打开一次PDF
+
+依赖：
+    sudo apt-get install poppler-utils tesseract-ocr tesseract-ocr-chi-sim
+    pip install pdf2image pytesseract pypdf
+
+注意：在macOS/Windows上进程以spawn方式启动，调用代码必须放在 if __name__ == "__main__": 之下
+"""
+import json
+import os
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+
+from langchain_core.documents import Document
+
+from file_hashing import file_hash
+
+
+def _write_atomic(path, data: bytes):
+    """先写临时文件再改名，多个进程同时写缓存也不会读到半截文件"""
+    tmp_path = f"{path}.{os.getpid()}.tmp"
+    with open(tmp_path, "wb") as f:
+        f.write(data)
+    os.replace(tmp_path, path)
+
+
+_reader = None  # 每个子进程打开一次的PdfReader
+
+
+def _init_worker(pdf_path):
+    """进程池初始化：每个子进程只解析一次PDF结构，之后各页共用"""
+    global _reader
+    from pypdf import PdfReader
+    try:
+        _reader = PdfReader(pdf_path)
+    except Exception as e:
+        # pypdf解析不了的PDF（如结构损坏）仍然可以用poppler渲染后OCR，这里提示原因后继续
+        print(f"进程 {os.getpid()} 无法读取 {pdf_path} 的文本层，所有页面改为OCR：{e!r}")
+        _reader = None
+
+
+def _text_layer(page_num):
+    """读取页面自带的文本层，没有文本层（扫描页）时返回空字符串"""
+    if _reader is None:
+        return ""
+    try:
+        return _reader.pages[page_num].extract_text() or ""
+    except Exception:
+        return ""
+
+
+def _process_page(pdf_path, page_num, cache_dir, dpi, lang, min_text_chars):
+    """
+    在子进程中处理一页，返回 (页码, 文本, 文本来源, 是否命中缓存)
+    缓存中记录了文本来源和文本层的字符数，min_text_chars改变后判断结果不同的页面会重新处理
+    """
+    stem = os.path.join(cache_dir, f"page_{page_num + 1}_{dpi}dpi")
+    text_path = f"{stem}.{lang}.json"
+    if os.path.exists(text_path):
+        with open(text_path, "r", encoding="utf-8") as f:
+            cached = json.load(f)
+        if (cached["text_layer_chars"] >= min_text_chars) == (cached["source"] == "text_layer"):
+            return page_num, cached["text"], cached["source"], True
+
+    text = _text_layer(page_num)
+    text_layer_chars = len(text.strip())
+    if text_layer_chars >= min_text_chars:
+        source = "text_layer"
+    else:
+        import pdf2image
+        import pytesseract
+        from PIL import Image
+        image_path = f"{stem}.png"
+        if os.path.exists(image_path):
+            image = Image.open(image_path)
+        else:
+            # 只渲染当前这一页（pdf2image的页码从1开始）
+            image = pdf2image.convert_from_path(pdf_path, dpi=dpi, first_page=page_num + 1, last_page=page_num + 1)[0]
+            image.save(f"{image_path}.{os.getpid()}.tmp", format="PNG")
+            os.replace(f"{image_path}.{os.getpid()}.tmp", image_path)
+        text = pytesseract.image_to_string(image, lang=lang)
+        image.close()
+        source = "ocr"
+    cached = {"text": text, "source": source, "text_layer_chars": text_layer_chars}
+    _write_atomic(text_path, json.dumps(cached, ensure_ascii=False).encode("utf-8"))
+    return page_num, text, source, False
+
+
+def count_pages(pdf_path):
+    """用poppler读取页数，不渲染页面"""
+    import pdf2image
+    return pdf2image.pdfinfo_from_path(pdf_path)["Pages"]
+
+
+def iter_ocr_pages(pdf_path, dpi=200, lang="chi_sim", max_workers=None,
+                   cache_dir="output/ocr_cache", min_text_chars=20):
+    """
+    按页码顺序逐页产出OCR结果的Document
+    dpi: 渲染分辨率，越高越准也越慢；缓存按DPI区分
+    lang: tesseract语言包，如 "chi_sim"、"chi_sim+eng"
+    min_text_chars: 文本层字符数达到该值的页面视为文字型页面，跳过OCR
+    """
+    page_cache_dir = os.path.join(cache_dir, file_hash(pdf_path)[:16])
+    os.makedirs(page_cache_dir, exist_ok=True)
+    num_pages = count_pages(pdf_path)
+    max_workers = max_workers or os.cpu_count()
+    executor = ProcessPoolExecutor(max_workers=max_workers, initializer=_init_worker, initargs=(pdf_path,))
+    try:
+        # 最多提前提交2倍进程数的页，按提交顺序等待结果，保证页码有序；后面的页在此期间继续并行处理
+        futures = deque()
+        next_page = 0
+        while futures or next_page < num_pages:
+            while next_page < num_pages and len(futures) < max_workers * 2:
+                futures.append(executor.submit(_process_page, pdf_path, next_page, page_cache_dir, dpi, lang,
+                                               min_text_chars))
+                next_page += 1
+            page_num, text, source, cached = futures.popleft().result()
+            yield Document(page_content=text, metadata={
+                "source": pdf_path,
+                "page": page_num,
+                "total_pages": num_pages,
+                "dpi": dpi,
+                "text_source": source,  # ocr / text_layer
+                "from_cache": cached,
+            })
+    finally:
+        # 下游提前停止（break、异常）时取消排队中的页，只等待正在处理的页结束
+        executor.shutdown(cancel_futures=True)
@@ -0,0 +1,78 @@
+"""
+Unstructured解析结果缓存
+hi_res策略要跑版面检测模型，一份PDF往往要几分钟；而调整切块、按标题分组等下游实验时，解析结果其实不会变。
+这里把partition得到的Element列表序列化为JSON（与elements_to_json格式相同），缓存键由以下几项组成：
+- 文件内容的SHA-256（文件改名或移动不影响命中，内容变化则自动失效）
+- 解析函数和解析参数（strategy等）
+- unstructured库的版本（升级后解析结果可能不同，自动失效）
+再次运行时直接从JSON还原Element，毫秒级完成，不会重新做版面推理。
+
+用法：
+    from partition_cache import cached_partition, cached_unstructured_documents
+    elements = cached_partition(file_path, strategy="hi_res")                   # Element列表
+    elements = cached_partition(file_path, partition_fn=partition_pdf, strategy="hi_res")
+    docs = cached_unstructured_documents(file_path, strategy="hi_res")          # LangChain Document列表
+"""
+import hashlib
+import json
+import os
+from importlib.metadata import version
+
+from langchain_core.documents import Document
+
+from file_hashing import file_hash
+
+
+def partition_cache_key(filename, partition_fn, **kwargs):
+    """缓存键：文件哈希 + 解析函数 + 解析参数 + unstructured版本"""
+    params = json.dumps(kwargs, sort_keys=True, ensure_ascii=False, default=str)
+    fn_name = f"{partition_fn.__module__}.{partition_fn.__qualname__}"
+    raw = "|".join([file_hash(filename), fn_name, params, version("unstructured")])
+    return hashlib.sha256(raw.encode("utf-8")).hexdigest()
+
+
+def cached_partition(filename, partition_fn=None, cache_dir="output/partition_cache", **kwargs):
+    """
+    带磁盘缓存的partition
+    partition_fn: 解析函数，默认unstructured.partition.auto.partition，也可以传入partition_pdf等
+    kwargs: 原样传给解析函数的参数，如strategy="hi_res"、content_type="application/pdf"
+    """
+    from unstructured.staging.base import elements_from_json, elements_to_json
+    if partition_fn is None:
+        from unstructured.partition.auto import partition as partition_fn
+
+    key = partition_cache_key(filename, partition_fn, **kwargs)
+    cache_path = os.path.join(cache_dir, f"{os.path.basename(filename)}.{key[:16]}.json")
+    if os.path.exists(cache_path):
+        print(f"命中解析缓存: {cache_path}")
+        return elements_from_json(filename=cache_path)
+
+    elements = partition_fn(filename=filename, **kwargs)
+    os.makedirs(cache_dir, exist_ok=True)
+    # 先写临时文件再改名，中途中断也不会留下半截缓存
+    tmp_path = f"{cache_path}.{os.getpid()}.tmp"
+    elements_to_json(elements, filename=tmp_path)
+    os.replace(tmp_path, cache_path)
+    print(f"解析结果已缓存: {cache_path}")
+    return elements
+
+
+def elements_to_documents(elements, source=None):
+    """把Element转换为LangChain Document，元数据格式与langchain_unstructured.UnstructuredLoader一致"""
+    docs = []
+    for element in elements:
+        element_dict = element.to_dict()
+        metadata = {
+            "source": source,
+            **element_dict["metadata"],
+            "category": element_dict["type"],
+            "element_id": element_dict["element_id"],
+        }
+        docs.append(Document(page_content=element_dict["text"], metadata=metadata))
+    return docs
+
+
+def cached_unstructured_documents(file_path, strategy="hi_res", cache_dir="output/partition_cache", **kwargs):
+    """带缓存的UnstructuredLoader(file_path, strategy=...).load()"""
+    elements = cached_partition(file_path, cache_dir=cache_dir, strategy=strategy, **kwargs)
+    return elements_to_documents(elements, source=file_path)
@@ -0,0 +1,127 @@
+"""
+流式逐页读取PDF：内存占用与PDF页数无关
+- 生成器逐页产出LangChain Document，读完一页就释放一页，可以直接串联切块和嵌入
+- 元数据包含页码、页面尺寸、图片和链接信息
+- 文件句柄在生成器结束、提前break或被关闭时都会确定性地释放
+- 可以只读取某个页码区间（分片），便于多进程并行处理大文件
+
+用法：
+    from contextlib import closing
+    with closing(iter_pdf_pages("xxx.pdf", page_range=(0, 100))) as pages:
+        for doc in pages:
+            ...
+"""
+from typing import Iterator, Optional, Tuple
+
+from langchain_core.documents import Document
+
+
+def count_pages(file_path, engine="pymupdf"):
+    """只读取PDF的页数，不解析页面内容"""
+    if engine == "pymupdf":
+        import pymupdf
+        with pymupdf.open(file_path) as doc:
+            return doc.page_count
+    from pypdf import PdfReader
+    with open(file_path, "rb") as f:
+        return len(PdfReader(f).pages)
+
+
+def shard_page_ranges(num_pages, num_shards):
+    """把页码 [0, num_pages) 均匀切成num_shards个连续区间"""
+    num_shards = max(1, min(num_shards, num_pages))
+    size, rest = divmod(num_pages, num_shards)
+    ranges, start = [], 0
+    for i in range(num_shards):
+        stop = start + size + (1 if i < rest else 0)
+        ranges.append((start, stop))
+        start = stop
+    return ranges
+
+
+def _resolve_range(page_range, num_pages):
+    start, stop = page_range if page_range is not None else (0, num_pages)
+    return max(0, start), min(num_pages, stop)
+
+
+def _iter_pymupdf(file_path, page_range, extract_images, extract_links):
+    import pymupdf
+    with pymupdf.open(file_path) as doc:
+        start, stop = _resolve_range(page_range, doc.page_count)
+        for page_num in range(start, stop):
+            page = doc.load_page(page_num)
+            metadata = {
+                "source": file_path,
+                "page": page_num,  # 与PyPDFLoader一致，从0开始
+                "total_pages": doc.page_count,
+                "width": page.rect.width,
+                "height": page.rect.height,
+            }
+            if extract_images:
+                # get_images只读取图片的引用信息，不解码图片数据
+                images = page.get_images(full=True)
+                metadata["image_count"] = len(images)
+                metadata["images"] = [{"xref": img[0], "width": img[2], "height": img[3]} for img in images]
+            if extract_links:
+                links = [link["uri"] for link in page.get_links() if link.get("uri")]
+                metadata["link_count"] = len(links)
+                metadata["links"] = links
+            text = page.get_text()
+            del page  # 尽早释放页面对象
+            yield Document(page_content=text, metadata=metadata)
+
+
+def _iter_pypdf(file_path, page_range, extract_images, extract_links):
+    from pypdf import PdfReader
+    with open(file_path, "rb") as f:
+        reader = PdfReader(f)  # PdfReader按需解析页面对象，但会把解析过的对象都缓存起来
+        num_pages = len(reader.pages)
+        start, stop = _resolve_range(page_range, num_pages)
+        for page_num in range(start, stop):
+            page = reader.pages[page_num]
+            metadata = {
+                "source": file_path,
+                "page": page_num,
+                "total_pages": num_pages,
+                "width": float(page.mediabox.width),
+                "height": float(page.mediabox.height),
+            }
+            if extract_images:
+                try:
+                    # 只列出图片名称，不解码图片数据
+                    names = list(page.images.keys())
+                except Exception:
+                    names = []
+                metadata["image_count"] = len(names)
+                metadata["images"] = [str(name) for name in names]
+            if extract_links:
+                links = []
+                for annot in page.get("/Annots") or []:
+                    annot = annot.get_object()
+                    if annot.get("/Subtype") == "/Link":
+                        uri = (annot.get("/A") or {}).get("/URI")
+                        if uri:
+                            links.append(str(uri))
+                metadata["link_count"] = len(links)
+                metadata["links"] = links
+            text = page.extract_text()
+            # 释放这一页：从页面列表和已解析对象缓存中去掉，否则内存随读过的页数增长；
+            # 多页共用的字体等资源之后会按需重新解析，换来与页数无关的内存占用
+            reader.flattened_pages[page_num] = None
+            reader.resolved_objects.clear()
+            del page
+            yield Document(page_content=text, metadata=metadata)
+
+
+def iter_pdf_pages(file_path, page_range: Optional[Tuple[int, int]] = None, engine="pymupdf",
+                   extract_images=True, extract_links=True) -> Iterator[Document]:
+    """
+    逐页产出PDF的Document
+    page_range: 页码区间 (start, stop)，从0开始、左闭右开；None表示整本
+    engine: "pymupdf"（速度快，默认）或 "pypdf"（纯Python，无需编译依赖）
+    """
+    if engine == "pymupdf":
+        return _iter_pymupdf(file_path, page_range, extract_images, extract_links)
+    if engine == "pypdf":
+        return _iter_pypdf(file_path, page_range, extract_images, extract_links)
+    raise ValueError(f"不支持的PDF解析引擎: {engine}")
@@ -0,0 +1,174 @@
+"""
+根据Unstructured元素的element_id / parent_id构建文档的章节树
+- 只遍历一次元素列表，覆盖所有页面，按element_id建立字典索引，时间复杂度与元素数量成线性关系
+- 每个章节包含：标题、正文元素、页码范围、子章节（标题的parent_id指向另一个标题时）
+- 重复的标题（如每页重复的页眉标题）合并到第一次出现的章节中
+- 可以直接输出父文档（整个章节）和子文档（正文元素），用于父子文档检索
+
+输入既可以是Unstructured的Element列表，也可以是UnstructuredLoader返回的LangChain Document列表：
+    from section_tree import build_section_tree
+    tree = build_section_tree(elements)
+    for section in tree.iter_sections():
+        print(section.title, section.page_span, len(section.elements))
+"""
+from dataclasses import dataclass, field
+from typing import Dict, List, Optional
+
+from langchain_core.documents import Document
+
+BODY_CATEGORIES = ("NarrativeText", "Text", "ListItem", "Table")
+
+
+@dataclass
+class SectionElement:
+    """章节中的一个正文元素"""
+    element_id: str
+    category: str
+    text: str
+    page_number: Optional[int]
+
+
+@dataclass
+class Section:
+    """以一个Title元素开头的章节"""
+    section_id: str
+    title: str
+    page_start: Optional[int] = None
+    page_end: Optional[int] = None
+    elements: List[SectionElement] = field(default_factory=list)
+    children: List["Section"] = field(default_factory=list)
+    parent_id: Optional[str] = None
+
+    @property
+    def page_span(self):
+        return self.page_start, self.page_end
+
+    @property
+    def content(self):
+        return [element.text for element in self.elements]
+
+    def _extend_pages(self, page_number):
+        if page_number is None:
+            return
+        if self.page_start is None or page_number < self.page_start:
+            self.page_start = page_number
+        if self.page_end is None or page_number > self.page_end:
+            self.page_end = page_number
+
+
+@dataclass
+class SectionTree:
+    """章节树：根章节列表 + 按ID索引的全部章节"""
+    roots: List[Section] = field(default_factory=list)
+    sections: Dict[str, Section] = field(default_factory=dict)
+    orphans: List[SectionElement] = field(default_factory=list)  # 找不到所属标题的正文元素
+
+    def iter_sections(self):
+        """按文档顺序深度优先遍历所有章节"""
+        stack = list(reversed(self.roots))
+        while stack:
+            section = stack.pop()
+            yield section
+            stack.extend(reversed(section.children))
+
+    def parent_documents(self, source=None, skip_empty=True):
+        """每个章节生成一个父文档：标题 + 全部正文"""
+        docs = []
+        for section in self.iter_sections():
+            if skip_empty and not section.elements:
+                continue
+            docs.append(Document(
+                page_content="\n".join([section.title] + section.content),
+                metadata={"source": source, "section_id": section.section_id, "title": section.title,
+                          "page_start": section.page_start, "page_end": section.page_end,
+                          "parent_section_id": section.parent_id},
+            ))
+        return docs
+
+    def child_documents(self, source=None):
+        """每个正文元素生成一个子文档，通过section_id关联到父文档"""
+        return [
+            Document(
+                page_content=element.text,
+                metadata={"source": source, "section_id": section.section_id, "title": section.title,
+                          "element_id": element.element_id, "category": element.category,
+                          "page_number": element.page_number},
+            )
+            for section in self.iter_sections()
+            for element in section.elements
+        ]
+
+
+def _element_fields(element):
+    """统一读取Element或LangChain Document的 (ID, 父ID, 类别, 文本, 页码)"""
+    if isinstance(element, Document):
+        meta = element.metadata
+        return (meta.get("element_id"), meta.get("parent_id"), meta.get("category"),
+                element.page_content, meta.get("page_number"))
+    meta = element.metadata
+    return (element.id, getattr(meta, "parent_id", None), element.category,
+            element.text, getattr(meta, "page_number", None))
+
+
+def build_section_tree(elements, body_categories=BODY_CATEGORIES, merge_duplicate_titles=True):
+    """
+    一次遍历构建章节树
+    body_categories: 作为正文收集的元素类别
+    merge_duplicate_titles: 文本相同的标题合并为一个章节
+    """
+    tree = SectionTree()
+    section_of = {}       # 元素ID -> 所属章节（标题元素指向自己的章节）
+    title_index = {}      # 标题文本 -> 章节，用于O(1)去重
+    pending = {}          # 父元素尚未出现的元素：父ID -> [(是否标题, 章节或正文元素)]
+
+    def attach(section, parent_id):
+        parent = section_of.get(parent_id)
+        if parent is not None and parent is not section:
+            section.parent_id = parent.section_id
+            parent.children.append(section)
+            return True
+        return False
+
+    def add_body(section, item):
+        section.elements.append(item)
+        section._extend_pages(item.page_number)
+
+    for element in elements:
+        element_id, parent_id, category, text, page_number = _element_fields(element)
+        text = (text or "").strip()
+        if not text:
+            continue
+        if category in body_categories:
+            item = SectionElement(element_id, category, text, page_number)
+            parent = section_of.get(parent_id)
+            if parent is not None:
+                add_body(parent, item)
+            else:
+                pending.setdefault(parent_id, []).append((False, item))
+            continue
+        if category != "Title":
+            continue
+
+        section = title_index.get(text) if merge_duplicate_titles else None
+        if section is None:
+            section = Section(section_id=element_id, title=text)
+            title_index[text] = section
+            tree.sections[element_id] = section
+            if parent_id is not None and not attach(section, parent_id):
+                pending.setdefault(parent_id, []).append((True, section))
+        section._extend_pages(page_number)
+        section_of[element_id] = section
+
+        # 新出现的标题：把之前等待它的元素挂上来
+        for is_title, waiting in pending.pop(element_id, []):
+            if is_title:
+                attach(waiting, element_id)
+            else:
+                add_body(section, waiting)
+
+    # 没有父章节的章节作为根（字典保持插入顺序，即文档顺序）
+    tree.roots = [section for section in tree.sections.values() if section.parent_id is None]
+    # 直到最后都没有找到父标题的正文元素
+    for waiting_items in pending.values():
+        tree.orphans.extend(item for is_title, item in waiting_items if not is_title)
+    return tree
@@ -0,0 +1,32 @@
+# 流式分批导入大CSV：每读满一批就立即嵌入并写入向量库，内存占用与文件大小无关
+# 中断后重新运行，会从检查点记录的字节偏移处继续
+# 检查点记录的是"哪些行已经写进向量库"，所以向量库也必须持久化：这里用Chroma存到output目录，
+# 重新运行时从检查点继续写入同一个库；要从头开始时，检查点和向量库目录要一起删除
+from langchain_chroma import Chroma
+from langchain_huggingface import HuggingFaceEmbeddings
+from streaming_csv_loader import StreamingCSVLoader
+
+file_path = "90-文档-Data/黑悟空/黑神话悟空.csv"
+
+loader = StreamingCSVLoader(
+    file_path=file_path,
+    batch_size=2,  # 百万行的商品目录可以设为1000~5000
+    template="{Name}（{Category}）：{Description}",  # 列模板，直接生成page_content
+    metadata_columns={"Category": str, "PowerLevel": int},  # 带类型的元数据列
+    checkpoint_path="output/csv_checkpoints/黑神话悟空.json",
+)
+
+embeddings = HuggingFaceEmbeddings(model_name="BAAI/bge-small-zh")
+vectorstore = Chroma(
+    collection_name="black_myth_wukong_csv",
+    embedding_function=embeddings,
+    persist_directory="output/csv_chroma/黑神话悟空",
+)
+
+for i, batch in enumerate(loader.iter_batches(), 1):
+    # 第一批读完就开始嵌入，不必等整个文件；以行号作为ID，中断后重做的那一批会覆盖而不是重复写入
+    vectorstore.add_documents(batch, ids=[f"{file_path}:{doc.metadata['row']}" for doc in batch])
+    print(f"第 {i} 批: {len(batch)} 行，示例: {batch[0].page_content} {batch[0].metadata}")
+
+for doc in vectorstore.similarity_search("威力最强的武器", k=2):
+    print(doc.page_content, doc.metadata)
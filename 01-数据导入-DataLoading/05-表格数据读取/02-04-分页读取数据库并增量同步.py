@@ -0,0 +1,59 @@
+# 分页读取数据库表，并按 updated_at 水位线增量同步
+# 与02-01中 DatabaseReader.load_data 一次取回整个结果集不同，这里按主键分页、每页产出一批Document，
+# 再次运行时只读取上次同步之后新增或修改过的行
+from sqlalchemy import text
+from paginated_db_reader import PaginatedDatabaseReader, get_engine
+
+db_uri = "sqlite:///90-文档-Data/example.db"
+engine = get_engine(db_uri)  # 带连接池的引擎，同一URI只创建一次
+
+create_table_sql = """
+CREATE TABLE IF NOT EXISTS game_scenes_sync (
+  id INTEGER PRIMARY KEY,
+  scene_name VARCHAR(100) NOT NULL,
+  description TEXT,
+  difficulty_level INT,
+  boss_name VARCHAR(100),
+  updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+);
+"""
+insert_data_sql = """
+INSERT INTO game_scenes_sync (scene_name, description, difficulty_level, boss_name)
+VALUES 
+  ('花果山', '悟空的出生地，山清水秀，仙气缭绕', 2, '六耳猕猴'),
+  ('水帘洞', '花果山中的洞穴，悟空的老家', 1, NULL),
+  ('火焰山', '炙热难耐的火山地带，充满岩浆与烈焰', 4, '牛魔王'),
+  ('龙宫', '东海龙王的宫殿，水下奇景', 3, '敖广'),
+  ('灵山', '如来佛祖居住的圣地，佛光普照', 5, '如来佛祖');
+"""
+
+with engine.begin() as connection:
+    connection.execute(text(create_table_sql))
+    if connection.execute(text("SELECT COUNT(*) FROM game_scenes_sync")).scalar() == 0:
+        connection.execute(text(insert_data_sql))
+
+reader = PaginatedDatabaseReader(
+    table_name="game_scenes_sync",
+    engine=engine,
+    key_column="id",
+    text_columns=["scene_name", "description", "boss_name"],
+    metadata_columns=["difficulty_level", "updated_at"],
+    watermark_column="updated_at",
+    state_path="output/db_sync/game_scenes_sync.json",
+    batch_size=2,  # 千万行的大表可以设为1000~5000
+)
+
+# 第一次运行：全量读取；之后运行：只读取新增或修改过的行
+for i, batch in enumerate(reader.iter_batches(), 1):
+    print(f"第 {i} 页: {[doc.id_ for doc in batch]}")
+print(f"同步进度: {reader.load_state()}")
+
+# 修改一行后再次同步，只会读到这一行
+with engine.begin() as connection:
+    connection.execute(text(
+        "UPDATE game_scenes_sync SET difficulty_level = 5, updated_at = datetime('now', '+1 second') WHERE scene_name = '火焰山'"
+    ))
+documents = reader.load_data()
+print(f"增量同步读取的文档数量: {len(documents)}")
+for doc in documents:
+    print(doc.id_, doc.text, doc.metadata)
@@ -0,0 +1,20 @@
+# 比较camelot、pdfplumber、unstructured三种表格提取引擎的耗时、峰值内存和单元格准确率
+# 并为每类文档选出满足准确率要求的最快引擎，结果写入 output/table_engine_profile.json
+import glob
+from table_extraction import benchmark_engines, print_benchmark, save_engine_choice, select_engine
+
+# 测试文档：(文档类型, PDF路径, 标准表格CSV列表)；没有标准表格的文档只比较速度和内存
+fixtures = [
+    ("wiki_table", "90-文档-Data/复杂PDF/billionaires_page-1-5.pdf",
+     sorted(glob.glob("90-文档-Data/复杂PDF/十大富豪/billionaires_table_*.csv"))),
+    ("financial_report", "90-文档-Data/复杂PDF/uber_10q_march_2022_page26.pdf", []),
+]
+
+if __name__ == "__main__":
+    for doc_type, pdf_path, golden_csvs in fixtures:
+        results = benchmark_engines(pdf_path, golden_csvs)
+        print_benchmark(pdf_path, results)
+        engine = select_engine(results, min_accuracy=0.9)
+        if engine:
+            save_engine_choice(doc_type, engine, results)
+            print(f"文档类型 {doc_type} 选择引擎: {engine}")
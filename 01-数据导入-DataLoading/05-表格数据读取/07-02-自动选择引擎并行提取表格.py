@@ -0,0 +1,16 @@
+# 按文档类型自动选择表格提取引擎（先运行07-01生成引擎配置），各页在进程池中并行提取
+import time
+from table_extraction import extract_tables, load_profile
+
+pdf_path = "90-文档-Data/复杂PDF/billionaires_page-1-5.pdf"
+doc_type = "wiki_table"
+
+if __name__ == "__main__":
+    print(f"文档类型 {doc_type} 使用引擎: {load_profile().get(doc_type, {}).get('engine', 'pdfplumber（默认）')}")
+    start = time.perf_counter()
+    tables = extract_tables(pdf_path, doc_type=doc_type)
+    print(f"共提取 {len(tables)} 个表格，耗时 {time.perf_counter() - start:.2f}秒")
+    for page, table in tables:
+        print(f"\n第 {page} 页表格（{len(table)} 行）:")
+        for row in table[:3]:
+            print(" | ".join(row))
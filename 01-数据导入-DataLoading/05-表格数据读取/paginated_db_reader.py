@@ -0,0 +1,220 @@
+"""
+分页读取数据库表的LlamaIndex读取器：DatabaseReader 的大表版本
+与 DatabaseReader(uri=...).load_data(query=...) 一次性取回整个结果集不同：
+- 同一个数据库URI共用一个带连接池的SQLAlchemy引擎，不会每次都新建连接
+- 按主键做键集分页（WHERE id > 上一页最后的id ORDER BY id LIMIT n），每页都走索引，
+  不会像OFFSET分页那样越往后越慢；也可以对任意SQL使用服务端游标流式读取
+- 每读一页就产出一批Document，内存占用与表的大小无关
+- 指定水位线列（如updated_at）时支持增量同步：只读取上次同步之后新增或修改过的行，
+  同步进度保存在状态文件中，中断后重新运行会从最后处理完的一页之后继续
+- 水位线为NULL的行单独按主键分页读取（先读这些行，再按水位线读其余的行），同样可以增量读取新插入的行；
+  但已有的行被改成NULL时无法察觉
+"""
+import json
+import os
+from datetime import date, datetime
+from decimal import Decimal
+from typing import Dict, Iterator, List, Optional
+
+from llama_index.core import Document
+from llama_index.core.readers.base import BaseReader
+from sqlalchemy import MetaData, String, Table, and_, create_engine, or_, select, text, type_coerce
+
+_ENGINES = {}
+
+
+def get_engine(uri, pool_size=5, max_overflow=10, pool_recycle=3600):
+    """同一URI复用同一个带连接池的引擎；pool_pre_ping在取出连接前检查连接是否已被服务端断开"""
+    if uri not in _ENGINES:
+        if uri.startswith("sqlite"):
+            # SQLite由SQLAlchemy自动选择合适的连接池，不支持设置连接池大小
+            _ENGINES[uri] = create_engine(uri)
+        else:
+            _ENGINES[uri] = create_engine(uri, pool_size=pool_size, max_overflow=max_overflow,
+                                          pool_recycle=pool_recycle, pool_pre_ping=True)
+    return _ENGINES[uri]
+
+
+def _to_json_value(value):
+    """数据库返回的日期、Decimal等类型转换为可以写入元数据和状态文件的值"""
+    if isinstance(value, (datetime, date)):
+        return value.isoformat(sep=" ") if isinstance(value, datetime) else value.isoformat()
+    if isinstance(value, Decimal):
+        return float(value)
+    return value
+
+
+def _from_json_value(column, value):
+    """把状态文件中保存的值还原为列对应的Python类型，作为查询参数"""
+    if value is None:
+        return None
+    try:
+        python_type = column.type.python_type
+    except NotImplementedError:
+        return value
+    if python_type is datetime and isinstance(value, str):
+        return datetime.fromisoformat(value)
+    if python_type is date and isinstance(value, str):
+        return date.fromisoformat(value)
+    if python_type is Decimal:
+        return Decimal(str(value))
+    return value
+
+
+class PaginatedDatabaseReader(BaseReader):
+    """按主键分页、支持水位线增量同步的数据库读取器"""
+    def __init__(
+        self,
+        table_name: str,
+        uri: Optional[str] = None,
+        engine=None,
+        key_column: str = "id",
+        text_columns: Optional[List[str]] = None,
+        metadata_columns: Optional[List[str]] = None,
+        watermark_column: Optional[str] = None,
+        state_path: Optional[str] = None,
+        batch_size: int = 1000,
+    ):
+        """
+        key_column: 唯一且有索引的列（通常是主键），用于键集分页和生成文档ID
+        text_columns: 写入文本的列，默认全部列
+        metadata_columns: 写入元数据的列
+        watermark_column: 水位线列（如updated_at），为None时每次都全量读取
+        state_path: 保存同步进度的JSON文件，为None时不保存
+        """
+        if engine is None and uri is None:
+            raise ValueError("必须提供uri或engine")
+        self.engine = engine if engine is not None else get_engine(uri)
+        self.table_name = table_name
+        self.key_column = key_column
+        self.text_columns = text_columns
+        self.metadata_columns = metadata_columns or []
+        self.watermark_column = watermark_column
+        self.state_path = state_path
+        self.batch_size = batch_size
+        self._table = None
+
+    @property
+    def table(self):
+        """反射表结构，只做一次"""
+        if self._table is None:
+            self._table = Table(self.table_name, MetaData(), autoload_with=self.engine)
+        return self._table
+
+    # ---------- 同步状态 ----------
+
+    def load_state(self) -> Dict:
+        if not self.state_path or not os.path.exists(self.state_path):
+            return {}
+        with open(self.state_path, "r", encoding="utf-8") as f:
+            return json.load(f)
+
+    def _save_state(self, state):
+        if not self.state_path:
+            return
+        os.makedirs(os.path.dirname(self.state_path) or ".", exist_ok=True)
+        tmp_path = f"{self.state_path}.tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump(state, f, ensure_ascii=False, indent=2)
+        os.replace(tmp_path, self.state_path)
+
+    def reset_state(self):
+        if self.state_path and os.path.exists(self.state_path):
+            os.remove(self.state_path)
+
+    # ---------- 读取 ----------
+
+    def _page_query(self, state, null_phase):
+        """
+        构造下一页的查询
+        null_phase为True时读取水位线为NULL的行，只按主键分页；
+        否则读取水位线不为NULL的行，按 (水位线, 主键) 分页；没有水位线列时只按主键分页
+        """
+        key = self.table.c[self.key_column]
+        query = select(self.table)
+        if not self.watermark_column:
+            last_key = _from_json_value(key, state.get("last_key"))
+            if last_key is not None:
+                query = query.where(key > last_key)
+            return query.order_by(key).limit(self.batch_size)
+
+        mark = self.table.c[self.watermark_column]
+        if null_phase:
+            null_key = _from_json_value(key, state.get("null_key"))
+            query = query.where(mark.is_(None))
+            if null_key is not None:
+                query = query.where(key > null_key)
+            return query.order_by(key).limit(self.batch_size)
+
+        last_key = _from_json_value(key, state.get("last_key"))
+        if self.engine.dialect.name == "sqlite":
+            # SQLite把时间存成 "YYYY-MM-DD HH:MM:SS" 文本，直接按文本比较，避免绑定参数多出微秒部分
+            compare_mark, watermark = type_coerce(mark, String), state.get("watermark")
+        else:
+            compare_mark, watermark = mark, _from_json_value(mark, state.get("watermark"))
+        query = query.where(mark.is_not(None))
+        if watermark is not None:
+            condition = or_(compare_mark > watermark, and_(compare_mark == watermark, key > last_key)) \
+                if last_key is not None else compare_mark > watermark
+            query = query.where(condition)
+        return query.order_by(mark, key).limit(self.batch_size)
+
+    def _row_to_document(self, row):
+        values = {name: _to_json_value(value) for name, value in row.items()}
+        columns = self.text_columns or list(values)
+        text_content = ", ".join(f"{name}: {values[name]}" for name in columns)
+        metadata = {"table": self.table_name, self.key_column: values[self.key_column]}
+        metadata.update({name: values[name] for name in self.metadata_columns})
+        # 文档ID由表名和主键决定，行被修改后重新读取时ID不变，可以直接覆盖旧文档
+        return Document(id_=f"{self.table_name}:{values[self.key_column]}", text=text_content, metadata=metadata)
+
+    def iter_batches(self) -> Iterator[List[Document]]:
+        """逐页产出Document列表；一页被下游处理完后才记录同步进度"""
+        state = self.load_state() if self.watermark_column else {}
+        if state:
+            print(f"从上次同步的位置继续：{self.watermark_column} = {state.get('watermark')}，"
+                  f"{self.key_column} = {state.get('last_key')}，NULL水位线的行读到 {state.get('null_key')}")
+        # 有水位线列时分两个阶段：先读水位线为NULL的行，再按水位线读其余的行
+        phases = (True, False) if self.watermark_column else (False,)
+        for null_phase in phases:
+            while True:
+                # 每页单独从连接池取一次连接，下游处理这一页时连接已经归还
+                with self.engine.connect() as connection:
+                    rows = connection.execute(self._page_query(state, null_phase)).mappings().all()
+                if not rows:
+                    break
+                last = rows[-1]
+                new_state = dict(state)
+                if null_phase:
+                    new_state["null_key"] = _to_json_value(last[self.key_column])
+                else:
+                    new_state["last_key"] = _to_json_value(last[self.key_column])
+                    if self.watermark_column:
+                        new_state["watermark"] = _to_json_value(last[self.watermark_column])
+                if new_state == state:
+                    # 分页位置没有前进（如主键不唯一），继续查询只会重复读取同一页
+                    raise RuntimeError(f"{self.table_name} 分页没有前进，请检查 {self.key_column} 是否唯一：{state}")
+                state = new_state
+                yield [self._row_to_document(row) for row in rows]
+                if self.watermark_column:
+                    self._save_state(state)
+                if len(rows) < self.batch_size:
+                    break
+
+    def iter_query_batches(self, query: str) -> Iterator[List[Document]]:
+        """对任意SQL使用服务端游标流式读取，每次只在内存中保留batch_size行"""
+        with self.engine.connect() as connection:
+            result = connection.execution_options(stream_results=True, yield_per=self.batch_size).execute(text(query))
+            for partition in result.mappings().partitions(self.batch_size):
+                yield [
+                    Document(text=", ".join(f"{name}: {_to_json_value(value)}" for name, value in row.items()))
+                    for row in partition
+                ]
+
+    def lazy_load_data(self, query: Optional[str] = None) -> Iterator[Document]:
+        batches = self.iter_query_batches(query) if query else self.iter_batches()
+        for batch in batches:
+            yield from batch
+
+    def load_data(self, query: Optional[str] = None) -> List[Document]:
+        return list(self.lazy_load_data(query=query))
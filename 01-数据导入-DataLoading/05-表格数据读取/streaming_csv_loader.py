@@ -0,0 +1,165 @@
+"""
+流式分批CSV加载器：适合百万行级别的大表格
+与 CSVLoader(...).load() 一次性为每一行构建Document不同：
+- 按批读取，每读满batch_size行就产出一批Document，可以立即送去嵌入，内存占用与文件大小无关
+- page_content用列模板生成，如 "{名称}：{说明}"；不指定模板时与CSVLoader格式相同（每列一行 "列名: 值"）
+- 元数据列按指定类型转换（int/float/bool/str或任意函数），而不是全部作为字符串
+- 记录已处理到的字节偏移量（检查点），中断后重新运行会从上次处理完的批次之后继续
+
+检查点在一批Document被下游处理完（即生成器被要求产出下一批）之后才写入，
+因此中断时最多重复处理一批，不会漏掉数据。
+文件按字节逐行读取，支持utf-8、gbk等以换行符分行的编码。
+"""
+import csv
+import json
+import os
+from typing import Callable, Dict, Iterator, List, Optional, Union
+
+from langchain_core.document_loaders import BaseLoader
+from langchain_core.documents import Document
+
+
+def _to_bool(value):
+    return value.strip().lower() in ("1", "true", "yes", "y", "是")
+
+
+_TYPE_CASTERS = {int: int, float: float, str: str, bool: _to_bool}
+
+
+class StreamingCSVLoader(BaseLoader):
+    """按批流式读取CSV，支持列模板、类型化元数据和断点续读"""
+    def __init__(
+        self,
+        file_path: str,
+        batch_size: int = 1000,
+        template: Optional[str] = None,
+        content_columns: Optional[List[str]] = None,
+        metadata_columns: Optional[Dict[str, Union[type, Callable]]] = None,
+        fieldnames: Optional[List[str]] = None,
+        skip_header: bool = True,
+        source_column: Optional[str] = None,
+        checkpoint_path: Optional[str] = None,
+        encoding: str = "utf-8-sig",
+        csv_args: Optional[dict] = None,
+    ):
+        """
+        template: page_content模板，用列名作占位符，如 "{Name}（{Category}）：{Description}"
+        content_columns: 不指定模板时写入page_content的列，默认全部列
+        metadata_columns: 写入元数据的列及其类型，如 {"PowerLevel": int}
+        fieldnames: 自定义列名；skip_header为True时跳过文件中原有的标题行
+        checkpoint_path: 检查点文件路径，不指定则不支持断点续读
+        """
+        self.file_path = file_path
+        self.batch_size = batch_size
+        self.template = template
+        self.content_columns = content_columns
+        self.metadata_columns = {
+            name: _TYPE_CASTERS.get(caster, caster) for name, caster in (metadata_columns or {}).items()
+        }
+        self.fieldnames = fieldnames
+        self.skip_header = skip_header
+        self.source_column = source_column
+        self.checkpoint_path = checkpoint_path
+        self.encoding = encoding
+        self.csv_args = csv_args or {}
+
+    # ---------- 检查点 ----------
+
+    def _file_signature(self):
+        stat = os.stat(self.file_path)
+        return {"file": os.path.abspath(self.file_path), "size": stat.st_size, "mtime": stat.st_mtime}
+
+    def load_checkpoint(self):
+        """读取检查点；文件已变化或没有检查点时返回None"""
+        if not self.checkpoint_path or not os.path.exists(self.checkpoint_path):
+            return None
+        with open(self.checkpoint_path, "r", encoding="utf-8") as f:
+            checkpoint = json.load(f)
+        signature = self._file_signature()
+        if any(checkpoint.get(key) != value for key, value in signature.items()):
+            print("CSV文件已变化，忽略旧的检查点")
+            return None
+        return checkpoint
+
+    def _save_checkpoint(self, offset, rows, fieldnames, done=False):
+        if not self.checkpoint_path:
+            return
+        os.makedirs(os.path.dirname(self.checkpoint_path) or ".", exist_ok=True)
+        tmp_path = f"{self.checkpoint_path}.tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump({**self._file_signature(), "offset": offset, "rows": rows,
+                       "fieldnames": fieldnames, "done": done}, f, ensure_ascii=False)
+        os.replace(tmp_path, self.checkpoint_path)
+
+    def reset_checkpoint(self):
+        if self.checkpoint_path and os.path.exists(self.checkpoint_path):
+            os.remove(self.checkpoint_path)
+
+    # ---------- 读取 ----------
+
+    def _build_document(self, values, fieldnames, row_index):
+        row = dict(zip(fieldnames, values))
+        if self.template is not None:
+            content = self.template.format_map(row)
+        else:
+            columns = self.content_columns or fieldnames
+            content = "\n".join(f"{name}: {row.get(name, '')}" for name in columns)
+        source = row[self.source_column] if self.source_column else self.file_path
+        metadata = {"source": source, "row": row_index}
+        for name, caster in self.metadata_columns.items():
+            value = row.get(name)
+            try:
+                metadata[name] = caster(value) if value not in (None, "") else None
+            except ValueError:
+                metadata[name] = None  # 脏数据不中断整批
+        return Document(page_content=content, metadata=metadata)
+
+    def iter_batches(self) -> Iterator[List[Document]]:
+        """按批产出Document列表"""
+        checkpoint = self.load_checkpoint()
+        if checkpoint and checkpoint.get("done"):
+            print(f"检查点显示 {self.file_path} 已全部处理完（{checkpoint['rows']} 行），跳过")
+            return
+        offset = checkpoint["offset"] if checkpoint else 0
+        row_index = checkpoint["rows"] if checkpoint else 0
+        fieldnames = checkpoint["fieldnames"] if checkpoint else self.fieldnames
+        if checkpoint:
+            print(f"从检查点继续：已处理 {row_index} 行，字节偏移 {offset}")
+
+        with open(self.file_path, "rb") as f:
+            f.seek(offset)
+            position = [offset]
+
+            def lines():
+                # 逐行读取字节并累计偏移量；csv.reader读完一条记录时，position正好指向下一条记录的开头
+                for raw in f:
+                    position[0] += len(raw)
+                    yield raw.decode(self.encoding)
+
+            reader = csv.reader(lines(), **self.csv_args)
+            if fieldnames is None:
+                fieldnames = next(reader, None)
+                if fieldnames is None:
+                    return
+            elif offset == 0 and self.skip_header:
+                next(reader, None)
+
+            batch = []
+            for values in reader:
+                if not values:
+                    continue
+                batch.append(self._build_document(values, fieldnames, row_index))
+                row_index += 1
+                if len(batch) >= self.batch_size:
+                    batch_end = position[0]
+                    yield batch
+                    # 走到这里说明下游已经处理完这一批
+                    self._save_checkpoint(batch_end, row_index, fieldnames)
+                    batch = []
+            if batch:
+                yield batch
+            self._save_checkpoint(position[0], row_index, fieldnames, done=True)
+
+    def lazy_load(self) -> Iterator[Document]:
+        for batch in self.iter_batches():
+            yield from batch
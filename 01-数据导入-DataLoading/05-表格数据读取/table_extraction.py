@@ -0,0 +1,248 @@
+"""
+PDF表格提取：多引擎基准测试 + 自动选择引擎的并行提取
+支持的引擎：camelot、pdfplumber、unstructured（hi_res + infer_table_structure）
+
+1. 基准测试 benchmark_engines：每个引擎在独立的子进程中运行，记录
+   - 耗时（只计提取，不含导入库的时间）
+   - 峰值内存（子进程的最大常驻内存，能覆盖C扩展和外部依赖分配的内存）
+   - 单元格准确率：与人工核对过的标准CSV（如 billionaires_table_*.csv）逐单元格对比
+2. 引擎选择 select_engine：在满足准确率要求的引擎中选最快的，按文档类型记录到配置文件
+3. 并行提取 extract_tables：按文档类型读取选好的引擎，各页在进程池中并行提取，按页码顺序返回
+
+注意：在macOS/Windows上进程以spawn方式启动，调用代码必须放在 if __name__ == "__main__": 之下
+"""
+import csv
+import json
+import importlib
+import os
+import tempfile
+import time
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import asdict, dataclass, field
+from html.parser import HTMLParser
+from multiprocessing import get_context
+from typing import List, Optional
+
+ENGINES = ("pdfplumber", "camelot", "unstructured")
+# 基准测试时先导入的模块，避免把导入时间算进提取耗时
+_ENGINE_MODULES = {"camelot": "camelot", "pdfplumber": "pdfplumber", "unstructured": "unstructured.partition.pdf"}
+PROFILE_PATH = "output/table_engine_profile.json"
+
+
+def normalize_cell(value):
+    """统一单元格文本：None视为空，合并换行和多余空白"""
+    if value is None:
+        return ""
+    return " ".join(str(value).split())
+
+
+def normalize_table(rows):
+    return [[normalize_cell(cell) for cell in row] for row in rows]
+
+
+# ---------- 各引擎：输入PDF路径和页码（从1开始），返回该页的表格列表，每个表格是二维字符串列表 ----------
+
+def _extract_camelot(pdf_path, page):
+    import camelot
+    tables = camelot.read_pdf(pdf_path, pages=str(page))
+    return [normalize_table(table.df.values.tolist()) for table in tables]
+
+
+def _extract_pdfplumber(pdf_path, page):
+    import pdfplumber
+    with pdfplumber.open(pdf_path, pages=[page]) as pdf:
+        return [normalize_table(table) for table in pdf.pages[0].extract_tables()]
+
+
+class _HTMLTableParser(HTMLParser):
+    """把unstructured输出的text_as_html解析为二维列表"""
+    def __init__(self):
+        super().__init__()
+        self.rows, self._row, self._cell = [], None, None
+
+    def handle_starttag(self, tag, attrs):
+        if tag == "tr":
+            self._row = []
+        elif tag in ("td", "th"):
+            self._cell = []
+
+    def handle_endtag(self, tag):
+        if tag in ("td", "th") and self._row is not None and self._cell is not None:
+            self._row.append("".join(self._cell))
+            self._cell = None
+        elif tag == "tr" and self._row is not None:
+            self.rows.append(self._row)
+            self._row = None
+
+    def handle_data(self, data):
+        if self._cell is not None:
+            self._cell.append(data)
+
+
+def _extract_unstructured(pdf_path, page):
+    from pypdf import PdfReader, PdfWriter
+    from unstructured.partition.pdf import partition_pdf
+    # partition_pdf不支持指定页码，先把这一页单独写成一个PDF
+    writer = PdfWriter()
+    writer.add_page(PdfReader(pdf_path).pages[page - 1])
+    with tempfile.NamedTemporaryFile(suffix=".pdf") as tmp:
+        writer.write(tmp)
+        tmp.flush()
+        elements = partition_pdf(tmp.name, strategy="hi_res", infer_table_structure=True)
+    tables = []
+    for element in elements:
+        html = getattr(element.metadata, "text_as_html", None)
+        if element.category == "Table" and html:
+            parser = _HTMLTableParser()
+            parser.feed(html)
+            tables.append(normalize_table(parser.rows))
+    return tables
+
+
+_EXTRACTORS = {
+    "camelot": _extract_camelot,
+    "pdfplumber": _extract_pdfplumber,
+    "unstructured": _extract_unstructured,
+}
+
+
+def count_pages(pdf_path):
+    from pypdf import PdfReader
+    return len(PdfReader(pdf_path).pages)
+
+
+def extract_page(engine, pdf_path, page):
+    """用指定引擎提取一页的表格"""
+    return _EXTRACTORS[engine](pdf_path, page)
+
+
+# ---------- 准确率 ----------
+
+def load_golden_csv(csv_path):
+    """
+    读取标准表格CSV
+    仓库中的 billionaires_table_*.csv 由camelot的DataFrame直接保存，第一行是列序号（0,1,2...），需要跳过
+    """
+    with open(csv_path, "r", encoding="utf-8", newline="") as f:
+        rows = list(csv.reader(f))
+    if rows and rows[0] == [str(i) for i in range(len(rows[0]))]:
+        rows = rows[1:]
+    return normalize_table(rows)
+
+
+def cell_accuracy(predicted, golden):
+    """按位置逐单元格比较，返回标准表格中被正确提取的单元格比例"""
+    total = sum(len(row) for row in golden)
+    if total == 0:
+        return 1.0
+    correct = 0
+    for r, golden_row in enumerate(golden):
+        if r >= len(predicted):
+            break
+        predicted_row = predicted[r]
+        correct += sum(1 for c, cell in enumerate(golden_row) if c < len(predicted_row) and predicted_row[c] == cell)
+    return correct / total
+
+
+def score_tables(extracted, golden_tables):
+    """每个标准表格与提取结果中最匹配的表格比较，返回各表准确率"""
+    return [max((cell_accuracy(table, golden) for table in extracted), default=0.0) for golden in golden_tables]
+
+
+# ---------- 基准测试 ----------
+
+@dataclass
+class EngineResult:
+    """一个引擎在一份文档上的测试结果"""
+    engine: str
+    seconds: float = 0.0
+    peak_memory_mb: float = 0.0
+    num_tables: int = 0
+    accuracy: Optional[float] = None      # 没有标准表格时为None
+    table_accuracy: List[float] = field(default_factory=list)
+    error: Optional[str] = None
+
+
+def _benchmark_worker(engine, pdf_path, pages):
+    """在全新的子进程中运行，保证峰值内存只反映这一个引擎"""
+    import resource  # 仅POSIX系统可用
+    importlib.import_module(_ENGINE_MODULES[engine])
+    start = time.perf_counter()
+    tables = [table for page in pages for table in extract_page(engine, pdf_path, page)]
+    seconds = time.perf_counter() - start
+    peak_kb = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss  # Linux上单位为KB
+    return tables, seconds, peak_kb / 1024
+
+
+def benchmark_engines(pdf_path, golden_csvs=(), engines=ENGINES, pages=None):
+    """在一份文档上依次测试各个引擎"""
+    pages = pages or list(range(1, count_pages(pdf_path) + 1))
+    golden_tables = [load_golden_csv(path) for path in golden_csvs]
+    results = []
+    for engine in engines:
+        result = EngineResult(engine)
+        try:
+            with ProcessPoolExecutor(max_workers=1, mp_context=get_context("spawn")) as executor:
+                tables, result.seconds, result.peak_memory_mb = executor.submit(
+                    _benchmark_worker, engine, pdf_path, pages).result()
+            result.num_tables = len(tables)
+            if golden_tables:
+                result.table_accuracy = score_tables(tables, golden_tables)
+                result.accuracy = sum(result.table_accuracy) / len(result.table_accuracy)
+        except Exception as e:
+            result.error = f"{type(e).__name__}: {e}"
+        results.append(result)
+    return results
+
+
+def print_benchmark(pdf_path, results):
+    print(f"\n文档: {pdf_path}")
+    print(f"{'引擎':<14}{'耗时(s)':>10}{'峰值内存(MB)':>14}{'表格数':>8}{'准确率':>10}")
+    for r in results:
+        if r.error:
+            print(f"{r.engine:<14}失败: {r.error}")
+            continue
+        accuracy = "-" if r.accuracy is None else f"{r.accuracy:.1%}"
+        print(f"{r.engine:<14}{r.seconds:>10.2f}{r.peak_memory_mb:>14.0f}{r.num_tables:>8}{accuracy:>10}")
+
+
+# ---------- 引擎选择与并行提取 ----------
+
+def select_engine(results, min_accuracy=0.9):
+    """在准确率达标的引擎中选择最快的；都不达标时选准确率最高的"""
+    ok = [r for r in results if r.error is None]
+    if not ok:
+        return None
+    qualified = [r for r in ok if r.accuracy is None or r.accuracy >= min_accuracy]
+    if qualified:
+        return min(qualified, key=lambda r: r.seconds).engine
+    return max(ok, key=lambda r: r.accuracy).engine
+
+
+def save_engine_choice(doc_type, engine, results, profile_path=PROFILE_PATH):
+    """把文档类型对应的引擎和测试结果写入配置文件"""
+    profile = load_profile(profile_path)
+    profile[doc_type] = {"engine": engine, "results": [asdict(r) for r in results]}
+    os.makedirs(os.path.dirname(profile_path) or ".", exist_ok=True)
+    with open(profile_path, "w", encoding="utf-8") as f:
+        json.dump(profile, f, ensure_ascii=False, indent=2)
+
+
+def load_profile(profile_path=PROFILE_PATH):
+    if not os.path.exists(profile_path):
+        return {}
+    with open(profile_path, "r", encoding="utf-8") as f:
+        return json.load(f)
+
+
+def extract_tables(pdf_path, doc_type=None, engine=None, max_workers=None, profile_path=PROFILE_PATH):
+    """
+    并行提取PDF中的表格，返回 [(页码, 表格), ...]，按页码排序
+    engine: 指定引擎；不指定时按doc_type从基准测试的配置文件中读取，仍没有时默认pdfplumber
+    """
+    if engine is None:
+        engine = load_profile(profile_path).get(doc_type, {}).get("engine", "pdfplumber")
+    pages = list(range(1, count_pages(pdf_path) + 1))
+    with ProcessPoolExecutor(max_workers=max_workers) as executor:
+        page_tables = executor.map(extract_page, [engine] * len(pages), [pdf_path] * len(pages), pages)
+        return [(page, table) for page, tables in zip(pages, page_tables) for table in tables]
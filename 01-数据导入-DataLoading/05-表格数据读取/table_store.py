@@ -0,0 +1,160 @@
+"""
+列式表格存储：把提取出的表格逐个保存为Parquet文件，并维护一个索引文件
+与每次运行都用openpyxl解析Excel相比：
+- Parquet按列存储并带有类型信息（整数、浮点、字符串），读回来不会丢失类型
+- 读取时用内存映射（memory_map=True），并且可以只读需要的列，几百张表也只要几毫秒
+- 每张表的Parquet文件中写入来源信息（源文件、sheet或页码、提取工具、生成时间）
+- 索引文件 index.json 列出所有表的名称、文件、行数、列名和类型、来源，不打开Parquet也能浏览
+
+依赖：pip install pyarrow pandas（从Excel导入时还需要openpyxl）
+
+其它目录下的程序默认在仓库根目录运行，使用前先把本目录加入搜索路径：
+    import sys
+    sys.path.append("01-数据导入-DataLoading/05-表格数据读取")
+    sys.path.append("01-数据导入-DataLoading")  # 共用的file_hashing模块
+    from table_store import TableStore
+"""
+import csv
+import hashlib
+import json
+import os
+import re
+import time
+
+import pandas as pd
+import pyarrow as pa
+import pyarrow.parquet as pq
+
+from file_hashing import file_hash
+
+INDEX_FILE = "index.json"
+
+
+def normalize_columns(df):
+    """列名去掉换行和多余空白，如 "Net worth\\n(USD)" -> "Net worth (USD)" """
+    df = df.copy()
+    df.columns = [" ".join(str(col).split()) for col in df.columns]
+    return df
+
+
+def _coerce_mixed_columns(df):
+    """Parquet的一列只能有一种类型：混有数字和字符串的object列统一转成字符串"""
+    for col in df.columns:
+        if df[col].dtype == object:
+            values = df[col].dropna()
+            if not values.map(lambda v: isinstance(v, str)).all():
+                df[col] = df[col].map(lambda v: v if pd.isna(v) else str(v))
+    return df
+
+
+def read_extracted_csv(csv_path):
+    """
+    读取表格提取工具导出的CSV
+    camelot的DataFrame直接保存时第一行是列序号（0,1,2...），真正的表头在第二行
+    """
+    with open(csv_path, "r", encoding="utf-8", newline="") as f:
+        first_row = next(csv.reader(f), [])
+    header = 1 if first_row == [str(i) for i in range(len(first_row))] else 0
+    return pd.read_csv(csv_path, header=header)
+
+
+class TableStore:
+    """Parquet表格库：一张表一个Parquet文件 + 一个JSON索引文件"""
+    def __init__(self, root):
+        self.root = root
+        self.index_path = os.path.join(root, INDEX_FILE)
+        self.index = {"tables": {}, "sources": {}}
+        if os.path.exists(self.index_path):
+            with open(self.index_path, "r", encoding="utf-8") as f:
+                self.index = json.load(f)
+
+    def _save_index(self):
+        os.makedirs(self.root, exist_ok=True)
+        tmp_path = f"{self.index_path}.tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump(self.index, f, ensure_ascii=False, indent=2)
+        os.replace(tmp_path, self.index_path)
+
+    @staticmethod
+    def _file_name(name):
+        safe = re.sub(r"[^\w\-]+", "_", name, flags=re.UNICODE).strip("_") or "table"
+        return f"{safe}-{hashlib.sha1(name.encode('utf-8')).hexdigest()[:8]}.parquet"
+
+    def write_table(self, name, df, provenance=None, save_index=True):
+        """写入一张表；provenance为来源信息，如 {"source": "xx.pdf", "page": 3, "extractor": "camelot"}"""
+        df = _coerce_mixed_columns(normalize_columns(df))
+        provenance = {**(provenance or {}), "created_at": time.strftime("%Y-%m-%d %H:%M:%S")}
+        table = pa.Table.from_pandas(df, preserve_index=False)
+        # 来源信息写进Parquet的schema元数据，单独拷走文件也不会丢
+        metadata = {**(table.schema.metadata or {}),
+                    b"table_name": name.encode("utf-8"),
+                    b"provenance": json.dumps(provenance, ensure_ascii=False).encode("utf-8")}
+        table = table.replace_schema_metadata(metadata)
+        file_name = self._file_name(name)
+        os.makedirs(self.root, exist_ok=True)
+        pq.write_table(table, os.path.join(self.root, file_name))
+        self.index["tables"][name] = {
+            "file": file_name,
+            "num_rows": table.num_rows,
+            "columns": [{"name": field.name, "type": str(field.type)} for field in table.schema],
+            "provenance": provenance,
+        }
+        if save_index:
+            self._save_index()
+
+    def table_names(self):
+        """按写入顺序返回所有表名"""
+        return list(self.index["tables"])
+
+    def table_info(self, name):
+        return self.index["tables"][name]
+
+    def read_arrow(self, name, columns=None):
+        """以内存映射方式读取Arrow表，只读取columns指定的列"""
+        path = os.path.join(self.root, self.index["tables"][name]["file"])
+        return pq.read_table(path, columns=columns, memory_map=True)
+
+    def read_table(self, name, columns=None):
+        """读取为pandas DataFrame"""
+        return self.read_arrow(name, columns).to_pandas()
+
+    def read_provenance(self, name):
+        metadata = pq.read_schema(os.path.join(self.root, self.index["tables"][name]["file"])).metadata
+        return json.loads(metadata[b"provenance"])
+
+    def _drop_source(self, source_path):
+        """删除某个源文件之前导入的所有表"""
+        for name, info in list(self.index["tables"].items()):
+            if info["provenance"].get("source") == source_path:
+                path = os.path.join(self.root, info["file"])
+                if os.path.exists(path):
+                    os.remove(path)
+                del self.index["tables"][name]
+
+    def import_excel(self, excel_path):
+        """把Excel的每个sheet导入为一张表（需要openpyxl），源文件哈希记入索引"""
+        self._drop_source(excel_path)  # 源文件中删掉的sheet不应留在表格库里
+        with pd.ExcelFile(excel_path) as xls:
+            for sheet_name in xls.sheet_names:
+                df = pd.read_excel(xls, sheet_name=sheet_name)
+                self.write_table(sheet_name, df, {"source": excel_path, "sheet": sheet_name}, save_index=False)
+        self.index["sources"][excel_path] = file_hash(excel_path)
+        self._save_index()
+
+    def import_csv(self, csv_path, name=None, provenance=None):
+        """导入一个表格提取工具导出的CSV，表名默认为文件名"""
+        name = name or os.path.splitext(os.path.basename(csv_path))[0]
+        self.write_table(name, read_extracted_csv(csv_path), {"source": csv_path, **(provenance or {})})
+
+    def is_synced(self, source_path):
+        """源文件自上次导入后是否没有变化"""
+        return self.index["sources"].get(source_path) == file_hash(source_path)
+
+    @classmethod
+    def from_excel(cls, excel_path, root):
+        """打开表格库；源Excel首次使用或内容变化时才重新导入，之后的运行不再解析Excel"""
+        store = cls(root)
+        if not store.is_synced(excel_path):
+            print(f"导入 {excel_path} 到Parquet表格库 {root}")
+            store.import_excel(excel_path)
+        return store
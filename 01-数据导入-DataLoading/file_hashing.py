@@ -0,0 +1,19 @@
+"""
+文件内容哈希：各个缓存、清单和表格库用它判断源文件是否变化
+
+persistent_index、partition_cache、table_store等模块都从这里导入file_hash，模块本身不修改搜索路径；
+使用这些模块的程序默认在仓库根目录运行，由入口脚本把本目录加入搜索路径：
+    import sys
+    sys.path.append("01-数据导入-DataLoading")
+    from file_hashing import file_hash
+"""
+import hashlib
+
+
+def file_hash(path, block_size=1 << 20):
+    """分块计算文件内容的SHA-256"""
+    sha = hashlib.sha256()
+    with open(path, "rb") as f:
+        for block in iter(lambda: f.read(block_size), b""):
+            sha.update(block)
+    return sha.hexdigest()
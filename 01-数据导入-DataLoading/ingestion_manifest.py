@@ -0,0 +1,173 @@
+"""
+增量导入清单：记录每个源文件的导入状态，重新运行时只处理新增或修改过的文件
+清单存放在SQLite中，每个文件一行：路径、大小、修改时间、内容哈希、加载器、切块ID列表
+- 新增文件：加载、切块、嵌入，写入向量库
+- 修改文件：先删除向量库中的旧切块，再按新增处理
+- 删除文件：删除向量库中的旧切块，清单中标记为已删除（墓碑）
+- 未变化文件：完全跳过
+- 加载或切块失败的文件：记录错误后继续处理其它文件，下次运行时重试
+清单中的文件路径统一规范化（指定root时为相对root的路径，否则为绝对路径），
+同一个文件不论用什么相对路径、从哪个工作目录传进来，都对应清单中的同一行
+
+其它目录下的程序默认在仓库根目录运行，使用前先把本目录加入搜索路径：
+    import sys
+    sys.path.append("01-数据导入-DataLoading")
+    from ingestion_manifest import IngestionManifest, incremental_ingest
+"""
+import hashlib
+import json
+import os
+import sqlite3
+import time
+from dataclasses import dataclass, field
+from typing import List
+
+from file_hashing import file_hash
+
+
+@dataclass
+class ChangeSet:
+    """一次扫描得到的文件变化"""
+    added: List[str] = field(default_factory=list)
+    modified: List[str] = field(default_factory=list)
+    deleted: List[str] = field(default_factory=list)
+    unchanged: List[str] = field(default_factory=list)
+    failed: dict = field(default_factory=dict)  # 路径 -> 错误信息
+    states: dict = field(default_factory=dict)  # 路径 -> (大小, 修改时间, 内容哈希)
+
+    def __str__(self):
+        return (f"新增 {len(self.added)} 个，修改 {len(self.modified)} 个，"
+                f"删除 {len(self.deleted)} 个，未变化 {len(self.unchanged)} 个"
+                + (f"，失败 {len(self.failed)} 个" if self.failed else ""))
+
+
+class IngestionManifest:
+    """基于SQLite的导入清单"""
+    def __init__(self, db_path, root=None):
+        """
+        db_path: 清单数据库路径
+        root: 源文件的根目录；指定后清单中保存相对root的路径，整个目录搬走后清单仍然有效
+        """
+        self.root = os.path.realpath(root) if root else None
+        os.makedirs(os.path.dirname(db_path) or ".", exist_ok=True)
+        self.db = sqlite3.connect(db_path)
+        self.db.execute(
+            "CREATE TABLE IF NOT EXISTS files ("
+            "path TEXT PRIMARY KEY, size INTEGER, mtime REAL, content_hash TEXT, loader TEXT, "
+            "chunk_ids TEXT, deleted INTEGER DEFAULT 0, updated_at REAL)"
+        )
+        self.db.commit()
+
+    def key(self, path):
+        """文件在清单中的规范化路径"""
+        path = os.path.realpath(path)
+        return os.path.relpath(path, self.root) if self.root else path
+
+    def path_of(self, key):
+        """清单中的路径换算回可以打开的文件路径"""
+        return os.path.join(self.root, key) if self.root else key
+
+    def _active_files(self):
+        rows = self.db.execute("SELECT path, size, mtime, content_hash FROM files WHERE deleted = 0")
+        return {path: (size, mtime, content_hash) for path, size, mtime, content_hash in rows}
+
+    def scan(self, paths):
+        """
+        对比清单找出变化的文件，ChangeSet中的路径都是清单中的规范化路径
+        大小和修改时间都没变时直接认为未变化，否则再比较内容哈希；子目录等非普通文件直接跳过
+        """
+        known = self._active_files()
+        changes = ChangeSet()
+        paths = list(dict.fromkeys(self.key(path) for path in paths if os.path.isfile(path)))
+        for path in paths:
+            stat = os.stat(self.path_of(path))
+            old = known.get(path)
+            if old and old[0] == stat.st_size and old[1] == stat.st_mtime:
+                changes.unchanged.append(path)
+                changes.states[path] = old
+                continue
+            digest = file_hash(self.path_of(path))
+            changes.states[path] = (stat.st_size, stat.st_mtime, digest)
+            if old is None:
+                changes.added.append(path)
+            elif old[2] != digest:
+                changes.modified.append(path)
+            else:
+                # 只是touch过，内容没变：更新修改时间，下次走快速路径
+                changes.unchanged.append(path)
+                self.db.execute("UPDATE files SET mtime = ? WHERE path = ?", (stat.st_mtime, path))
+        seen = set(paths)
+        changes.deleted = [path for path in known if path not in seen]
+        self.db.commit()
+        return changes
+
+    def chunk_ids(self, path):
+        row = self.db.execute("SELECT chunk_ids FROM files WHERE path = ?", (path,)).fetchone()
+        return json.loads(row[0]) if row and row[0] else []
+
+    def record(self, path, state, loader, chunk_ids):
+        """记录一个文件导入成功"""
+        size, mtime, content_hash = state
+        self.db.execute(
+            "INSERT OR REPLACE INTO files (path, size, mtime, content_hash, loader, chunk_ids, deleted, updated_at) "
+            "VALUES (?, ?, ?, ?, ?, ?, 0, ?)",
+            (path, size, mtime, content_hash, loader, json.dumps(chunk_ids), time.time())
+        )
+        self.db.commit()
+
+    def tombstone(self, path):
+        """把文件标记为已删除，清空它的切块ID（调用前应先从向量库中删除这些切块）"""
+        self.db.execute(
+            "UPDATE files SET deleted = 1, chunk_ids = '[]', updated_at = ? WHERE path = ?", (time.time(), path)
+        )
+        self.db.commit()
+
+
+def chunk_ids_for(path, content_hash, num_chunks):
+    """切块ID由文件路径、内容哈希和序号决定，同一文件同一内容重复导入时ID不变"""
+    prefix = f"{hashlib.sha1(path.encode('utf-8')).hexdigest()[:12]}-{content_hash[:12]}"
+    return [f"{prefix}-{i}" for i in range(num_chunks)]
+
+
+def incremental_ingest(manifest, paths, load_file, splitter, vectorstore):
+    """
+    增量导入
+    load_file: 输入文件路径，返回 (Document列表, 加载器名称)，不支持的文件返回 ([], None)
+    splitter: 带split_documents方法的文本切块器
+    vectorstore: 支持add_documents(ids=...)和delete(ids=...)的向量库（如持久化的Chroma）
+    单个文件加载或切块出错时记入changes.failed并继续；它不会写入清单，下次运行时重试
+    """
+    changes = manifest.scan(paths)
+    print(f"扫描完成：{changes}")
+
+    # 修改和删除的文件：先把旧切块从向量库中删掉，删除成功后再更新清单，
+    # 删除失败时清单中仍保留旧切块ID，下次运行可以再删
+    for path in changes.modified + changes.deleted:
+        old_ids = manifest.chunk_ids(path)
+        if old_ids:
+            vectorstore.delete(ids=old_ids)
+        manifest.tombstone(path)
+
+    # 新增和修改的文件：加载、切块、嵌入
+    num_chunks = 0
+    for path in changes.added + changes.modified:
+        try:
+            docs, loader = load_file(manifest.path_of(path))
+            if loader is None:
+                # 不支持的文件也记入清单，下次直接跳过
+                manifest.record(path, changes.states[path], "unsupported", [])
+                continue
+            splits = splitter.split_documents(docs)
+        except Exception as e:
+            changes.failed[path] = f"{type(e).__name__}: {e}"
+            print(f"加载失败，已跳过 {path}: {changes.failed[path]}")
+            continue
+        ids = chunk_ids_for(path, changes.states[path][2], len(splits))
+        if splits:
+            vectorstore.add_documents(splits, ids=ids)
+        manifest.record(path, changes.states[path], loader, ids)
+        num_chunks += len(splits)
+    print(f"本次写入 {num_chunks} 个切块，删除了 {len(changes.modified) + len(changes.deleted)} 个文件的旧切块")
+    if changes.failed:
+        print(f"{len(changes.failed)} 个文件加载失败，下次运行时重试")
+    return changes
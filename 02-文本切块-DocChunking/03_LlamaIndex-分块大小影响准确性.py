@@ -9,6 +9,10 @@ from dotenv import load_dotenv
 load_dotenv()   
 
 import os
+import sys
+sys.path.append("02-文本切块-DocChunking")
+sys.path.append("03-向量嵌入-Embedding")  # 共用的嵌入缓存
+from chunking_benchmark import best_config, print_results, run_benchmark
 
 embed_model = OpenAIEmbedding(model="text-embedding-3-small")
 llm = OpenAI(model="gpt-3.5-turbo-0125")
@@ -17,7 +21,7 @@ Settings.embed_model = embed_model
 Settings.llm = llm
 Settings.node_parser = SentenceSplitter(chunk_size=250, chunk_overlap=20) # 50, 100, 250将得到不同的结果，为什么？
 
-# Load PDF using standard PDFReader
+# Load PDF using standard PDFReader（只解析一次，下面的基准测试共用）
 loader = PDFReader()
 documents = loader.load_data(
     file="90-文档-Data/复杂PDF/uber_10q_march_2022_page26.pdf"
@@ -44,4 +48,36 @@ for i, source_node in enumerate(response.source_nodes):
     print(f"\nChunk {i+1}:")
     print("Text content:")
     print(source_node.text)
-    print("-" * 50)
\ No newline at end of file
+    print("-" * 50)
+
+# ************分块大小基准测试************
+# 不再手动改chunk_size重跑：同一份解析结果按参数网格切块，相同的文本块只嵌入一次（缓存在 vector_store/embedding_cache，与其它脚本共用）
+questions = [
+    {"question": "What was the basic net loss per share attributable to common stockholders in 2022?",
+     "answer": "(3.03)"},
+    {"question": "What was the diluted net loss per share for the three months ended March 31, 2022?",
+     "answer": "(3.04)"},
+    {"question": "What was the net loss attributable to common stockholders for 2022?",
+     "answer": "(5,930)"},
+    {"question": "What was the diluted weighted-average common stock outstanding in 2022?",
+     "answer": "1,957,731"},
+    {"question": "How many RSUs were excluded from the computation of diluted net loss per share as of March 31, 2022?",
+     "answer": "116,955"},
+    {"question": "How many convertible notes were excluded as anti-dilutive in 2021?",
+     "answer": "22,013"},
+    {"question": "What was the total number of potentially dilutive securities excluded in 2022?",
+     "answer": "178,623"},
+]
+results = run_benchmark(
+    documents,
+    questions,
+    embed_model,
+    chunk_sizes=[50, 100, 250, 512],
+    chunk_overlaps=[0, 20],
+    splitters=["sentence", "token"],
+    top_k=3,
+)
+print_results(results)
+best = best_config(results)
+print(f"\n推荐参数：{best.splitter} chunk_size={best.chunk_size} chunk_overlap={best.chunk_overlap}"
+      f"（命中率 {best.hit_rate:.1%}，MRR {best.mrr:.3f}）")
@@ -1,19 +1,15 @@
+import sys
+sys.path.append("02-文本切块-DocChunking")
 from llama_index.core import SimpleDirectoryReader
-from llama_index.core.node_parser import (
-    SentenceSplitter,
-    SemanticSplitterNodeParser,
-)
-from llama_index.embeddings.openai import OpenAIEmbedding 
+from llama_index.core.node_parser import SentenceSplitter
+from semantic_chunker import SemanticChunker
 # from llama_index.embeddings.huggingface import HuggingFaceEmbedding 
 # embed_model = HuggingFaceEmbedding(model_name="BAAI/bge-small-zh")
 documents = SimpleDirectoryReader(input_files=["90-文档-Data/黑悟空/黑悟空wiki.txt"]).load_data()
 
-# 创建语义分块器
-splitter = SemanticSplitterNodeParser(
-    buffer_size=3,  # 缓冲区大小
-    breakpoint_percentile_threshold=90, # 断点百分位阈值
-    embed_model=OpenAIEmbedding()     # 使用的嵌入模型
-)
+# 创建语义分块器：使用本地模型，每个句子只嵌入一次，句子向量缓存在 output/semantic_cache
+splitter = SemanticChunker.from_sentence_transformer("BAAI/bge-small-zh")
+
 # 创建基础句子分块器（作为对照）
 base_splitter = SentenceSplitter(
     # chunk_size=512
@@ -42,7 +38,11 @@ breakpoint_percentile_threshold 决定了分割的严格程度
 
 
 # 使用语义分块器对文档进行分块
-semantic_nodes = splitter.get_nodes_from_documents(documents)
+semantic_nodes = splitter.get_nodes_from_documents(
+    documents,
+    buffer_size=3,  # 缓冲区大小
+    breakpoint_percentile_threshold=90,  # 断点百分位阈值
+)
 print("\n=== 语义分块结果 ===")
 print(f"语义分块器生成的块数：{len(semantic_nodes)}")
 for i, node in enumerate(semantic_nodes, 1):
@@ -58,3 +58,9 @@ for i, node in enumerate(base_nodes, 1):
     print(f"\n--- 第 {i} 个句子块 ---")
     print(f"内容:\n{node.text}")
     print("-" * 50)
+
+# 参数扫描：所有组合共用上面已经缓存的句子向量，不再调用嵌入模型
+print("\n=== 语义分块参数扫描 ===")
+for row in splitter.sweep(documents, buffer_sizes=[1, 2, 3, 5], thresholds=[80, 85, 90, 95]):
+    print(f"buffer_size={row['buffer_size']}，阈值={row['threshold']}：{row['num_chunks']} 块，"
+          f"平均 {row['avg_chars']:.0f} 字符，最长 {row['max_chars']} 字符")
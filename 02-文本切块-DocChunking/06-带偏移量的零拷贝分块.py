@@ -0,0 +1,48 @@
+import sys
+import time
+import tracemalloc
+sys.path.append("02-文本切块-DocChunking")
+from langchain_community.document_loaders import TextLoader
+from langchain_text_splitters import RecursiveCharacterTextSplitter
+from span_splitter import CHINESE_SEPARATORS, SpanTextSplitter, neighbor_span
+
+loader = TextLoader("90-文档-Data/山西文旅/云冈石窟.txt")
+documents = loader.load()
+text = documents[0].page_content
+
+# 与RecursiveCharacterTextSplitter相同的分隔符和参数，但只产出原文中的区间
+splitter = SpanTextSplitter(chunk_size=100, chunk_overlap=10, separators=CHINESE_SEPARATORS)
+chunks = list(splitter.iter_chunks(text, documents[0].metadata))
+print("\n=== 文档分块结果 ===")
+for i, chunk in enumerate(chunks, 1):
+    print(f"\n--- 第 {i} 个文档块 [{chunk.start}, {chunk.end}) ---")
+    print(f"内容: {chunk.text}")  # 访问时才从原文切出文本
+    print("-" * 50)
+
+# 偏移量的用途：高亮关键词、向前后扩展上下文
+keyword = "昙曜五窟"
+position = text.find(keyword)
+for index, chunk in enumerate(chunks):
+    if chunk.start <= position < chunk.end:
+        print(f"\n命中块: {chunk.highlight(position, position + len(keyword))}")
+        start, end = neighbor_span(chunks, index, window=1)
+        print(f"扩展到前后各一个块 [{start}, {end}): {text[start:end]}")
+        break
+
+# 放大语料，对比两种分块器的耗时和内存峰值（不含原文本身）
+big_text = text * 2000
+print(f"\n语料长度: {len(big_text) / 1e6:.1f}M 字符")
+for name, split in [
+    ("RecursiveCharacterTextSplitter",
+     lambda: RecursiveCharacterTextSplitter(chunk_size=100, chunk_overlap=10,
+                                            separators=CHINESE_SEPARATORS).split_text(big_text)),
+    ("SpanTextSplitter", lambda: list(splitter.split_spans(big_text))),
+]:
+    tracemalloc.start()
+    start_time = time.perf_counter()
+    result = split()
+    elapsed = time.perf_counter() - start_time
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    print(f"{name}: {len(result)} 块，用时 {elapsed:.2f} 秒，内存峰值 {peak / 1e6:.1f} MB")
+    del result
@@ -0,0 +1,37 @@
+import sys
+import time
+sys.path.append("02-文本切块-DocChunking")
+from langchain_community.document_loaders import TextLoader
+from langchain_text_splitters import RecursiveCharacterTextSplitter
+from token_splitter import TokenBudgetSplitter
+
+loader = TextLoader("90-文档-Data/山西文旅/云冈石窟.txt")
+documents = loader.load() * 200  # 放大语料，便于比较速度
+
+# 方式一：合并片段时反复调用tiktoken计算长度
+start_time = time.perf_counter()
+baseline_splitter = RecursiveCharacterTextSplitter.from_tiktoken_encoder(
+    encoding_name="cl100k_base", chunk_size=250, chunk_overlap=0
+)
+baseline_chunks = baseline_splitter.split_documents(documents)
+baseline_time = time.perf_counter() - start_time
+print(f"from_tiktoken_encoder: {len(baseline_chunks)} 块，用时 {baseline_time:.2f} 秒")
+
+# 方式二：批量分词一次，按Token偏移量切块
+start_time = time.perf_counter()
+token_splitter = TokenBudgetSplitter.from_tiktoken("cl100k_base", chunk_size=250, chunk_overlap=0)
+token_chunks = token_splitter.split_documents(documents)
+token_time = time.perf_counter() - start_time
+print(f"TokenBudgetSplitter: {len(token_chunks)} 块，用时 {token_time:.2f} 秒，加速 {baseline_time / token_time:.1f} 倍")
+print(f"最大块Token数: {max(chunk.metadata['token_count'] for chunk in token_chunks)}")
+
+print("\n=== 文档分块结果 ===")
+for i, chunk in enumerate(token_chunks[:3], 1):
+    print(f"\n--- 第 {i} 个文档块（{chunk.metadata['token_count']} tokens） ---")
+    print(f"内容: {chunk.page_content}")
+    print("-" * 50)
+
+# 使用嵌入模型自己的分词器：chunk_size默认等于模型最大长度（已扣除[CLS]、[SEP]），块不会被截断
+bge_splitter = TokenBudgetSplitter.from_huggingface("BAAI/bge-small-zh-v1.5")
+bge_chunks = bge_splitter.split_documents(documents[:1])
+print(f"\nbge-small-zh-v1.5: chunk_size={bge_splitter.chunk_size}，共 {len(bge_chunks)} 块")
@@ -37,4 +37,15 @@ if __name__ == "__main__":
     output_path = "90-文档-Data/复杂PDF/uber_10q_march_2022_page1-3.pdf"
     page_numbers = [26, 27, 28]  # 指定要提取的页码
     extract_pages(pdf_path, output_path, page_numbers)
+
+    # 大PDF：切成多个分片，用多个进程并行解析，再按页码合并（全局页码保持不变）
+    import sys
+    sys.path.append("02-文本切块-DocChunking")
+    sys.path.append("01-数据导入-DataLoading")  # 共用的file_hashing模块
+    sys.path.append("01-数据导入-DataLoading/04-PDF文件读取")  # 共用的页码区间切分
+    from pdf_sharding import parse_pdf_parallel
+    big_pdf_path = "90-文档-Data/复杂PDF/uber_10q_march_2022.pdf"  # 仓库中页数较多的PDF，换成自己的大文件效果更明显
+    docs = parse_pdf_parallel(big_pdf_path, parser="pymupdf")  # 可选 pypdf / pymupdf / unstructured / llamaparse
+    for doc in docs[:3]:
+        print(f"第 {doc.metadata['page'] + 1} 页（{doc.metadata['shard']}）：{doc.page_content[:100]}")
         
\ No newline at end of file
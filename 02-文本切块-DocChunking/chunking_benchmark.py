@@ -0,0 +1,187 @@
+"""
+分块参数基准测试：用数据决定chunk_size，而不是靠猜
+- 文档只解析一次，对 (分块器, chunk_size, chunk_overlap) 网格中的每一组参数分别切块
+- 嵌入结果用 embedding_cache 按 (模型, 影响输出的参数, 文本内容哈希) 缓存：不同参数切出的相同文本块只嵌入一次，
+  问题的向量也只算一次，重新运行时全部命中缓存
+- 节点带着已有的向量构建VectorStoreIndex，不会再调用嵌入模型；记录每组参数的切块耗时、建索引耗时和内存
+- 按问题集计算检索的命中率（Hit Rate@k）和MRR：检索结果中第一个包含参考答案文本的块的排名
+
+问题集格式：[{"question": "...", "answer": "参考答案在原文中的一段文字"}, ...]
+
+程序默认在仓库根目录运行，入口脚本先把本目录和嵌入缓存所在目录加入搜索路径：
+    import sys
+    sys.path.append("02-文本切块-DocChunking")
+    sys.path.append("03-向量嵌入-Embedding")
+    from chunking_benchmark import run_benchmark, print_results, best_config
+"""
+import json
+import time
+import tracemalloc
+from dataclasses import dataclass
+from itertools import product
+from typing import Dict, List
+
+import numpy as np
+
+from embedding_cache import DEFAULT_CACHE_DIR, EmbeddingCache
+
+
+def _make_sentence_splitter(chunk_size, chunk_overlap):
+    from llama_index.core.node_parser import SentenceSplitter
+    return SentenceSplitter(chunk_size=chunk_size, chunk_overlap=chunk_overlap)
+
+
+def _make_token_splitter(chunk_size, chunk_overlap):
+    from llama_index.core.node_parser import TokenTextSplitter
+    return TokenTextSplitter(chunk_size=chunk_size, chunk_overlap=chunk_overlap)
+
+
+# 分块器名称 -> 工厂函数(chunk_size, chunk_overlap)，返回LlamaIndex的NodeParser
+SPLITTERS = {
+    "sentence": _make_sentence_splitter,
+    "token": _make_token_splitter,
+}
+
+
+# LlamaIndex嵌入模型上影响输出向量的参数，如OpenAIEmbedding(dimensions=256)与默认维度的向量不能混用
+EMBEDDING_PARAMS = ("dimensions", "mode", "normalize", "pooling", "max_length", "query_instruction",
+                    "text_instruction", "truncate_dim")
+
+
+def embedding_variant(embed_model, kind):
+    """缓存命名空间中的附加部分：文本类型加上模型上影响输出的参数"""
+    params = {name: getattr(embed_model, name) for name in EMBEDDING_PARAMS
+              if getattr(embed_model, name, None) is not None}
+    return json.dumps({"kind": kind, **params}, sort_keys=True, ensure_ascii=False, default=str)
+
+
+class CachedEmbedder:
+    """
+    包装LlamaIndex嵌入模型：去重、查缓存，只为没见过的文本调用模型
+    缓存使用03-向量嵌入-Embedding/embedding_cache.py，与其它脚本共用同一个缓存目录；
+    文档块和问题分开缓存（部分模型对问题加指令前缀）
+    """
+    def __init__(self, embed_model, cache_dir=DEFAULT_CACHE_DIR):
+        self.embed_model = embed_model
+        self.cache_dir = cache_dir
+        self._caches = {}
+        self.num_requested = 0  # 请求嵌入的文本数（含重复）
+        self.num_computed = 0   # 实际调用模型嵌入的文本数
+
+    def _cache(self, kind):
+        if kind not in self._caches:
+            self._caches[kind] = EmbeddingCache(self.embed_model.model_name, cache_dir=self.cache_dir,
+                                                variant=embedding_variant(self.embed_model, kind))
+        return self._caches[kind]
+
+    def _compute(self, texts, kind):
+        self.num_computed += len(texts)
+        if kind == "query":
+            return [self.embed_model.get_query_embedding(text) for text in texts]
+        return self.embed_model.get_text_embedding_batch(texts)
+
+    def embed(self, texts, kind="text") -> np.ndarray:
+        self.num_requested += len(texts)
+        return self._cache(kind).embed(texts, lambda missing: self._compute(missing, kind))
+
+
+@dataclass
+class ChunkingResult:
+    """一组分块参数的测试结果"""
+    splitter: str
+    chunk_size: int
+    chunk_overlap: int
+    num_chunks: int = 0
+    new_embeddings: int = 0     # 这一组参数新调用模型嵌入的块数（其余命中缓存）
+    chunk_seconds: float = 0.0
+    embed_seconds: float = 0.0
+    index_seconds: float = 0.0
+    index_memory_mb: float = 0.0   # 节点向量加上索引结构的峰值内存
+    hit_rate: float = 0.0
+    mrr: float = 0.0
+
+
+def _normalize_text(text):
+    return " ".join(text.split()).lower()
+
+
+def first_hit_rank(retrieved_texts, answer):
+    """检索结果中第一个包含参考答案的块的排名（从1开始），没有命中返回None"""
+    answer = _normalize_text(answer)
+    for rank, text in enumerate(retrieved_texts, 1):
+        if answer in _normalize_text(text):
+            return rank
+    return None
+
+
+def run_benchmark(documents, questions: List[Dict], embed_model, chunk_sizes=(50, 100, 250, 512),
+                  chunk_overlaps=(0, 20), splitters=("sentence",), top_k=3,
+                  cache_dir=DEFAULT_CACHE_DIR) -> List[ChunkingResult]:
+    """
+    documents: 已经解析好的LlamaIndex Document列表，所有参数组合共用
+    questions: 问题集，每个问题带有参考答案文本
+    cache_dir: 嵌入缓存目录
+    """
+    from llama_index.core import QueryBundle, VectorStoreIndex
+
+    embedder = CachedEmbedder(embed_model, cache_dir)
+    query_texts = [item["question"] for item in questions]
+    query_vectors = embedder.embed(query_texts, kind="query")
+
+    results = []
+    for splitter_name, chunk_size, chunk_overlap in product(splitters, chunk_sizes, chunk_overlaps):
+        if chunk_overlap >= chunk_size:
+            continue
+        result = ChunkingResult(splitter_name, chunk_size, chunk_overlap)
+
+        start_time = time.perf_counter()
+        nodes = SPLITTERS[splitter_name](chunk_size, chunk_overlap).get_nodes_from_documents(documents)
+        result.chunk_seconds = time.perf_counter() - start_time
+        result.num_chunks = len(nodes)
+
+        start_time = time.perf_counter()
+        computed_before = embedder.num_computed
+        vectors = embedder.embed([node.get_content() for node in nodes])
+        result.new_embeddings = embedder.num_computed - computed_before
+        result.embed_seconds = time.perf_counter() - start_time
+        # 内存统计从转换向量开始：SimpleVectorStore直接引用这些列表，向量本身是索引的主要内存开销
+        tracemalloc.start()
+        for node, vector in zip(nodes, vectors):
+            node.embedding = vector.tolist()
+
+        # 节点已经有向量，VectorStoreIndex不会再调用嵌入模型
+        start_time = time.perf_counter()
+        index = VectorStoreIndex(nodes, embed_model=embed_model)
+        result.index_seconds = time.perf_counter() - start_time
+        result.index_memory_mb = tracemalloc.get_traced_memory()[1] / 1024 / 1024
+        tracemalloc.stop()
+
+        retriever = index.as_retriever(similarity_top_k=top_k)
+        reciprocal_ranks = []
+        for item, query_text, query_vector in zip(questions, query_texts, query_vectors):
+            retrieved = retriever.retrieve(QueryBundle(query_str=query_text, embedding=query_vector.tolist()))
+            rank = first_hit_rank([node.get_content() for node in retrieved], item["answer"])
+            reciprocal_ranks.append(1.0 / rank if rank else 0.0)
+        if reciprocal_ranks:
+            result.hit_rate = sum(1 for rr in reciprocal_ranks if rr > 0) / len(reciprocal_ranks)
+            result.mrr = sum(reciprocal_ranks) / len(reciprocal_ranks)
+        results.append(result)
+        print(f"{splitter_name} chunk_size={chunk_size} overlap={chunk_overlap}: {result.num_chunks} 块，"
+              f"新嵌入 {result.new_embeddings} 块，命中率 {result.hit_rate:.1%}，MRR {result.mrr:.3f}")
+
+    print(f"共请求嵌入 {embedder.num_requested} 段文本，实际调用模型 {embedder.num_computed} 段")
+    return results
+
+
+def print_results(results):
+    print(f"\n{'分块器':<10}{'大小':>6}{'重叠':>6}{'块数':>6}{'新嵌入':>8}{'切块(s)':>9}{'嵌入(s)':>9}"
+          f"{'建索引(s)':>10}{'内存(MB)':>10}{'命中率':>8}{'MRR':>7}")
+    for r in results:
+        print(f"{r.splitter:<10}{r.chunk_size:>6}{r.chunk_overlap:>6}{r.num_chunks:>6}{r.new_embeddings:>8}"
+              f"{r.chunk_seconds:>9.2f}{r.embed_seconds:>9.2f}{r.index_seconds:>10.2f}{r.index_memory_mb:>10.1f}"
+              f"{r.hit_rate:>8.1%}{r.mrr:>7.3f}")
+
+
+def best_config(results):
+    """MRR最高的参数组合；MRR相同时选块数最少的（索引更小）"""
+    return max(results, key=lambda r: (r.mrr, r.hit_rate, -r.num_chunks)) if results else None
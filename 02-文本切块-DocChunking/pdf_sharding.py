@@ -0,0 +1,142 @@
+"""
+大PDF分片并行解析：先切片，再用多个进程同时解析，最后按页码合并
+- 源PDF只打开和解析一次，一次性写出N个连续页码区间的分片PDF（而不是每个分片都重新读一遍源文件）
+- 分片按源文件内容哈希缓存在 output/pdf_shards 下，同一份PDF再次解析时不用重新切片
+- 每个分片交给进程池中的一个进程解析，可选 PyPDF、PyMuPDF、Unstructured、LlamaParse
+- 结果按分片顺序合并，页码换算回源PDF中的全局页码（page从0开始，与PyPDFLoader一致），
+  total_pages、page_label、source、file_path等元数据也换算回源PDF，与不分片直接加载的结果一致，
+  另外记录所在的分片文件
+
+用法（程序中创建了进程池，需要放在 if __name__ == "__main__": 下运行）：
+    import sys
+    sys.path.append("02-文本切块-DocChunking")
+    sys.path.append("01-数据导入-DataLoading")  # 共用的file_hashing模块
+    sys.path.append("01-数据导入-DataLoading/04-PDF文件读取")  # 共用的页码区间切分
+    from pdf_sharding import parse_pdf_parallel
+    docs = parse_pdf_parallel("90-文档-Data/复杂PDF/uber_10q_march_2022.pdf", parser="pymupdf")
+"""
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+from typing import List, Optional
+
+from langchain_core.documents import Document
+
+from file_hashing import file_hash
+from pdf_page_iterator import shard_page_ranges
+
+
+def shard_pdf(pdf_path, num_shards, output_dir="output/pdf_shards"):
+    """
+    把PDF切成num_shards个分片，返回 [(分片路径, 起始页, 结束页, 分片内各页的页码标签), ...]，
+    页码从0开始、左闭右开；源文件只读取一次，分片已存在时直接复用
+    分片保留源PDF的文档信息（标题、作者、创建时间等）
+    """
+    from pypdf import PdfReader, PdfWriter
+    shard_dir = os.path.join(output_dir, file_hash(pdf_path)[:16])
+    reader = PdfReader(pdf_path)
+    page_labels = reader.page_labels  # 源PDF中每页的页码标签，如 "iii"、"31"
+    shards = []
+    for start, stop in shard_page_ranges(len(reader.pages), num_shards):
+        shard_path = os.path.join(shard_dir, f"pages_{start:05d}-{stop:05d}.pdf")
+        shards.append((shard_path, start, stop, page_labels[start:stop]))
+        if os.path.exists(shard_path):
+            continue
+        writer = PdfWriter()
+        for page_number in range(start, stop):
+            writer.add_page(reader.pages[page_number])
+        if reader.metadata:
+            writer.add_metadata(reader.metadata)
+        os.makedirs(shard_dir, exist_ok=True)
+        tmp_path = f"{shard_path}.tmp"
+        with open(tmp_path, "wb") as f:
+            writer.write(f)
+        os.replace(tmp_path, shard_path)  # 写完再改名，中断时不会留下半个分片
+    return shards
+
+
+# ---------- 各解析器：输入分片路径，返回 [(分片内页码(从0开始), Document), ...] ----------
+
+def _parse_pypdf(shard_path, **kwargs):
+    from langchain_community.document_loaders import PyPDFLoader
+    return [(doc.metadata.get("page", i), doc) for i, doc in enumerate(PyPDFLoader(shard_path, **kwargs).load())]
+
+
+def _parse_pymupdf(shard_path, **kwargs):
+    from langchain_community.document_loaders import PyMuPDFLoader
+    return [(doc.metadata.get("page", i), doc) for i, doc in enumerate(PyMuPDFLoader(shard_path, **kwargs).load())]
+
+
+def _parse_unstructured(shard_path, **kwargs):
+    from langchain_unstructured import UnstructuredLoader
+    docs = UnstructuredLoader(shard_path, **kwargs).load()
+    # Unstructured的page_number从1开始，每页有多个元素
+    return [(doc.metadata.get("page_number", 1) - 1, doc) for doc in docs]
+
+
+def _parse_llamaparse(shard_path, **kwargs):
+    from llama_parse import LlamaParse  # 需要LLAMA_CLOUD_API_KEY
+    kwargs.setdefault("result_type", "markdown")
+    docs = LlamaParse(**kwargs).load_data(shard_path)
+    # LlamaParse默认每页返回一个Document，按顺序即为页码
+    return [(i, Document(page_content=doc.text, metadata=dict(doc.metadata))) for i, doc in enumerate(docs)]
+
+
+PARSERS = {
+    "pypdf": _parse_pypdf,
+    "pymupdf": _parse_pymupdf,
+    "unstructured": _parse_unstructured,
+    "llamaparse": _parse_llamaparse,
+}
+
+
+def _parse_shard(parser, pdf_path, shard_path, start, total_pages, page_labels, parser_kwargs):
+    """在子进程中解析一个分片，把分片内的页码、页数、文件路径等元数据换算回源PDF"""
+    if parser == "llamaparse":
+        from dotenv import load_dotenv
+        load_dotenv()
+    docs = []
+    for local_page, doc in PARSERS[parser](shard_path, **parser_kwargs):
+        metadata = doc.metadata
+        metadata.update({"source": pdf_path, "page": start + local_page, "total_pages": total_pages,
+                         "shard": shard_path})
+        if "page_number" in metadata:
+            metadata["page_number"] = start + local_page + 1
+        if "page_label" in metadata and local_page < len(page_labels):
+            metadata["page_label"] = page_labels[local_page]
+        if "file_path" in metadata:
+            metadata["file_path"] = pdf_path
+        if "filename" in metadata:  # Unstructured
+            metadata["filename"] = os.path.basename(pdf_path)
+            metadata["file_directory"] = os.path.dirname(pdf_path)
+        if "file_name" in metadata:  # LlamaParse
+            metadata["file_name"] = os.path.basename(pdf_path)
+        docs.append(doc)
+    return docs
+
+
+def parse_pdf_parallel(pdf_path, parser="pymupdf", num_shards=None, max_workers=None,
+                       shard_dir="output/pdf_shards", parser_kwargs: Optional[dict] = None) -> List[Document]:
+    """
+    分片并行解析PDF，返回按页码排序的Document列表
+    num_shards: 分片数，默认等于进程数；页数多、各页耗时差异大时可以设为进程数的2~4倍，负载更均衡
+    parser_kwargs: 传给解析器的参数，如Unstructured的 {"strategy": "hi_res"}
+    """
+    if parser not in PARSERS:
+        raise ValueError(f"不支持的解析器: {parser}，可选: {list(PARSERS)}")
+    max_workers = max_workers or os.cpu_count()
+    start_time = time.perf_counter()
+    shards = shard_pdf(pdf_path, num_shards or max_workers, shard_dir)
+    total_pages = shards[-1][2] if shards else 0
+    print(f"{pdf_path} 切成 {len(shards)} 个分片，用时 {time.perf_counter() - start_time:.2f} 秒")
+
+    docs = []
+    with ProcessPoolExecutor(max_workers=min(max_workers, len(shards))) as executor:
+        futures = [executor.submit(_parse_shard, parser, pdf_path, shard_path, start, total_pages,
+                                   page_labels, parser_kwargs or {})
+                   for shard_path, start, _, page_labels in shards]
+        # 按提交顺序取结果，合并后自然是页码顺序
+        for future in futures:
+            docs.extend(future.result())
+    print(f"{parser} 解析完成：{len(docs)} 个Document，总用时 {time.perf_counter() - start_time:.2f} 秒")
+    return docs
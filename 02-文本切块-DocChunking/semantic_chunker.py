@@ -0,0 +1,209 @@
+"""
+快速语义分块：每个句子只嵌入一次，调参不再重复计算嵌入
+SemanticSplitterNodeParser 对每个"句子+前后buffer_size个句子"的组合文本分别调用嵌入模型，
+换一个buffer_size就要把所有组合重新嵌入一遍。这里的做法是：
+- 按中英文标点切句，所有文档的句子合在一起，用本地模型大批量嵌入一次（向量归一化后缓存到内存和磁盘）
+- 句子组的向量 = 窗口内句子向量之和，用累加和（cumsum）一次性算出所有窗口，不再嵌入组合文本
+- 相邻句子组的余弦距离、百分位阈值、断点位置全部用NumPy向量化计算
+- 扫描不同的buffer_size和阈值时只做上面的矩阵运算，调参只需要一次嵌入的开销
+
+块的文本直接从原文按句子的字符区间切出，保留原有的空白和换行。
+
+用法：
+    import sys
+    sys.path.append("02-文本切块-DocChunking")
+    from semantic_chunker import SemanticChunker
+    chunker = SemanticChunker.from_sentence_transformer("BAAI/bge-small-zh")
+    nodes = chunker.get_nodes_from_documents(documents, buffer_size=3, breakpoint_percentile_threshold=90)
+    print(chunker.sweep(documents, buffer_sizes=[1, 2, 3], thresholds=[85, 90, 95]))
+"""
+import hashlib
+import os
+import re
+from typing import Callable, Dict, List, Tuple
+
+import numpy as np
+
+# 句子结束位置：中英文句末标点（连同后面的引号、括号）或换行
+SENTENCE_END = re.compile(r"[。！？!?]+[”’」』）)]*|\.(?=\s)|\n+")
+# 切句规则的版本，写进句子向量的缓存键；修改SENTENCE_END或split_sentences后加1，旧缓存自动失效
+SPLITTER_VERSION = 1
+
+
+def split_sentences(text) -> List[Tuple[int, int]]:
+    """切句，返回每个句子在原文中的 (start, end)，去掉两端空白"""
+    spans, start = [], 0
+    for match in list(SENTENCE_END.finditer(text)) + [None]:
+        end = match.end() if match else len(text)
+        left, right = start, end
+        while left < right and text[left].isspace():
+            left += 1
+        while right > left and text[right - 1].isspace():
+            right -= 1
+        if left < right:
+            spans.append((left, right))
+        start = end
+    return spans
+
+
+def _normalize(matrix):
+    norms = np.linalg.norm(matrix, axis=1, keepdims=True)
+    return matrix / np.maximum(norms, 1e-12)
+
+
+def group_distances(embeddings, buffer_size=1):
+    """
+    相邻句子组之间的余弦距离
+    第i组包含第 i-buffer_size 到 i+buffer_size 个句子，组向量为这些句子向量之和（用累加和计算）
+    """
+    n = len(embeddings)
+    if n < 2:
+        return np.zeros(0, dtype=np.float32)
+    cumsum = np.vstack([np.zeros((1, embeddings.shape[1]), dtype=embeddings.dtype), np.cumsum(embeddings, axis=0)])
+    index = np.arange(n)
+    low = np.clip(index - buffer_size, 0, n)
+    high = np.clip(index + buffer_size + 1, 0, n)
+    groups = _normalize(cumsum[high] - cumsum[low])
+    return 1.0 - np.einsum("ij,ij->i", groups[:-1], groups[1:])
+
+
+def breakpoints(distances, percentile=95):
+    """距离超过百分位阈值的位置；返回的下标i表示在第i个句子之后切开"""
+    if len(distances) == 0:
+        return np.zeros(0, dtype=np.int64)
+    threshold = np.percentile(distances, percentile)
+    return np.flatnonzero(distances > threshold)
+
+
+class SemanticChunker:
+    """语义分块引擎：缓存句子向量，按任意buffer_size和阈值分块"""
+    def __init__(self, embed_fn: Callable[[List[str]], np.ndarray], model_name: str,
+                 cache_dir: str = "output/semantic_cache"):
+        """
+        embed_fn: 输入句子列表，返回向量矩阵（内部已按批处理）
+        model_name: 模型名称，用于区分缓存
+        cache_dir: 句子向量的磁盘缓存目录，为None时只缓存在内存中
+        """
+        self.embed_fn = embed_fn
+        self.model_name = model_name
+        self.cache_dir = os.path.join(cache_dir, re.sub(r"[^\w\-.]+", "_", model_name)) if cache_dir else None
+        self._embeddings: Dict[str, np.ndarray] = {}  # 文本哈希 -> 句子向量矩阵
+        self._distances: Dict[Tuple[str, int], np.ndarray] = {}  # (文本哈希, buffer_size) -> 距离
+        self._sentences: Dict[str, List[Tuple[int, int]]] = {}  # 文本哈希 -> 句子区间
+
+    @classmethod
+    def from_sentence_transformer(cls, model_name="BAAI/bge-small-zh", batch_size=256, device=None, **kwargs):
+        """使用本地的sentence-transformers模型"""
+        from sentence_transformers import SentenceTransformer
+        model = SentenceTransformer(model_name, device=device)
+
+        def embed(sentences):
+            return model.encode(sentences, batch_size=batch_size, normalize_embeddings=True,
+                                convert_to_numpy=True, show_progress_bar=len(sentences) > batch_size)
+        return cls(embed, model_name, **kwargs)
+
+    @classmethod
+    def from_llama_index(cls, embed_model, **kwargs):
+        """使用LlamaIndex的嵌入模型，如 HuggingFaceEmbedding(model_name="BAAI/bge-small-zh")"""
+        def embed(sentences):
+            return np.asarray(embed_model.get_text_embedding_batch(sentences), dtype=np.float32)
+        return cls(embed, embed_model.model_name, **kwargs)
+
+    # ---------- 句子向量 ----------
+
+    def _cache_path(self, key):
+        return os.path.join(self.cache_dir, f"{key}.npy") if self.cache_dir else None
+
+    def prepare(self, texts) -> List[str]:
+        """
+        为所有文本准备句子向量：先查内存和磁盘缓存，未命中的文本的句子合在一起一次性嵌入
+        返回每个文本的缓存键
+        """
+        keys = [hashlib.sha256(f"v{SPLITTER_VERSION}\0{text}".encode("utf-8")).hexdigest()[:32] for text in texts]
+        missing = {}
+        for key, text in zip(keys, texts):
+            if key in self._embeddings or key in missing:
+                continue
+            path = self._cache_path(key)
+            embeddings = np.load(path) if path and os.path.exists(path) else None
+            # 行数与句子数不一致说明缓存不是按当前的切句结果生成的，重新嵌入
+            if embeddings is not None and len(embeddings) == len(self._sentence_spans(key, text)):
+                self._embeddings[key] = embeddings
+            else:
+                missing[key] = text
+        if missing:
+            sentence_lists = {key: [text[start:end] for start, end in self._sentence_spans(key, text)]
+                              for key, text in missing.items()}
+            all_sentences = [sentence for sentences in sentence_lists.values() for sentence in sentences]
+            print(f"嵌入 {len(all_sentences)} 个句子（{len(missing)} 个文本）")
+            matrix = _normalize(np.asarray(self.embed_fn(all_sentences), dtype=np.float32)) \
+                if all_sentences else np.zeros((0, 0), dtype=np.float32)
+            offset = 0
+            for key, sentences in sentence_lists.items():
+                embeddings = matrix[offset:offset + len(sentences)]
+                offset += len(sentences)
+                self._embeddings[key] = embeddings
+                path = self._cache_path(key)
+                if path:
+                    os.makedirs(self.cache_dir, exist_ok=True)
+                    tmp_path = f"{path}.tmp.npy"
+                    np.save(tmp_path, embeddings)
+                    os.replace(tmp_path, path)
+        return keys
+
+    def _sentence_spans(self, key, text):
+        if key not in self._sentences:
+            self._sentences[key] = split_sentences(text)
+        return self._sentences[key]
+
+    def _group_distances(self, key, buffer_size):
+        if (key, buffer_size) not in self._distances:
+            self._distances[key, buffer_size] = group_distances(self._embeddings[key], buffer_size)
+        return self._distances[key, buffer_size]
+
+    # ---------- 分块 ----------
+
+    def split_spans(self, texts, buffer_size=1, breakpoint_percentile_threshold=95) -> List[List[Tuple[int, int]]]:
+        """返回每个文本的语义块字符区间 [(start, end), ...]"""
+        results = []
+        for key, text in zip(self.prepare(texts), texts):
+            sentences = self._sentence_spans(key, text)
+            if not sentences:
+                results.append([])
+                continue
+            cuts = breakpoints(self._group_distances(key, buffer_size), breakpoint_percentile_threshold)
+            bounds = [0, *(cuts + 1).tolist(), len(sentences)]
+            results.append([(sentences[first][0], sentences[last - 1][1]) for first, last in zip(bounds, bounds[1:])])
+        return results
+
+    def split_text(self, text, buffer_size=1, breakpoint_percentile_threshold=95) -> List[str]:
+        return [text[start:end] for start, end in self.split_spans([text], buffer_size,
+                                                                    breakpoint_percentile_threshold)[0]]
+
+    def get_nodes_from_documents(self, documents, buffer_size=1, breakpoint_percentile_threshold=95):
+        """与SemanticSplitterNodeParser相同的输出：LlamaIndex TextNode列表，带有指向源文档的关系"""
+        from llama_index.core.node_parser.node_utils import build_nodes_from_splits
+        texts = [document.get_content() for document in documents]
+        nodes = []
+        for document, text, spans in zip(documents, texts,
+                                         self.split_spans(texts, buffer_size, breakpoint_percentile_threshold)):
+            doc_nodes = build_nodes_from_splits([text[start:end] for start, end in spans], document)
+            for node, (start, end) in zip(doc_nodes, spans):
+                node.start_char_idx, node.end_char_idx = start, end
+            nodes.extend(doc_nodes)
+        return nodes
+
+    def sweep(self, documents, buffer_sizes=(1, 2, 3), thresholds=(80, 85, 90, 95)) -> List[Dict]:
+        """扫描参数组合，统计块数和平均长度；所有组合共用一次嵌入"""
+        texts = [document.get_content() if hasattr(document, "get_content") else document
+                 for document in documents]
+        self.prepare(texts)
+        rows = []
+        for buffer_size in buffer_sizes:
+            for threshold in thresholds:
+                lengths = [end - start for spans in self.split_spans(texts, buffer_size, threshold)
+                           for start, end in spans]
+                rows.append({"buffer_size": buffer_size, "threshold": threshold, "num_chunks": len(lengths),
+                             "avg_chars": float(np.mean(lengths)) if lengths else 0.0,
+                             "max_chars": max(lengths, default=0)})
+        return rows
@@ -0,0 +1,178 @@
+"""
+记录偏移量的分块器：只产出 (start, end) 区间，不复制文本
+与 CharacterTextSplitter / RecursiveCharacterTextSplitter 相比：
+- 切分过程只在原文上用 str.find(sep, start, end) 查找分隔符，不生成中间子串列表；
+  每个块就是原文中的一个区间，块之间的重叠用区间端点直接算出来
+- 分块是生成器，内存中只保留当前正在合并的几个区间，几百MB的语料也只占用原文本身的内存
+- 块的文本在第一次访问 SpanChunk.text 时才从原文切出来（惰性生成）
+- 每个块都带有在原文中的精确偏移量，可以用来高亮命中位置、向前后扩展上下文
+
+分隔符的优先级和递归方式与 RecursiveCharacterTextSplitter 相同，分隔符保留在前一个片段的末尾
+（中文句号、问号等留在句子结尾）；只传一个分隔符时相当于 CharacterTextSplitter。
+
+用法：
+    import sys
+    sys.path.append("02-文本切块-DocChunking")
+    from span_splitter import SpanTextSplitter, CHINESE_SEPARATORS
+    splitter = SpanTextSplitter(chunk_size=200, chunk_overlap=50, separators=CHINESE_SEPARATORS)
+    for chunk in splitter.iter_chunks(text):
+        print(chunk.start, chunk.end, chunk.text)
+"""
+from collections import deque
+from typing import Iterator, List, Optional, Tuple
+
+from langchain_core.documents import Document
+
+# 与 06-索引优化-Indexing/01-从小块到大上下文/02-父子文本块检索.py 中使用的分隔符相同
+CHINESE_SEPARATORS = ["\n\n", "\n", "。", "！", "？", "；", ",", " ", ""]
+
+
+class SpanChunk:
+    """原文中的一个区间 [start, end)，text在访问时才生成"""
+    __slots__ = ("source_text", "start", "end", "metadata")
+
+    def __init__(self, source_text, start, end, metadata=None):
+        self.source_text = source_text
+        self.start = start
+        self.end = end
+        self.metadata = metadata or {}
+
+    @property
+    def text(self):
+        return self.source_text[self.start:self.end]
+
+    def __len__(self):
+        return self.end - self.start
+
+    def __repr__(self):
+        return f"SpanChunk({self.start}, {self.end})"
+
+    def expand(self, before=0, after=0):
+        """向前后各扩展若干字符，返回扩展后的文本，用于给检索结果补充上下文"""
+        return self.source_text[max(0, self.start - before):min(len(self.source_text), self.end + after)]
+
+    def highlight(self, start, end, marker=("【", "】")):
+        """把原文区间 [start, end) 在本块中标记出来，区间超出本块的部分会被截掉"""
+        start, end = max(start, self.start), min(end, self.end)
+        if start >= end:
+            return self.text
+        text = self.source_text
+        return f"{text[self.start:start]}{marker[0]}{text[start:end]}{marker[1]}{text[end:self.end]}"
+
+    def to_document(self):
+        return Document(page_content=self.text,
+                        metadata={**self.metadata, "start_index": self.start, "end_index": self.end})
+
+
+class SpanTextSplitter:
+    """按分隔符优先级递归切分，产出原文区间"""
+    def __init__(self, chunk_size=1000, chunk_overlap=200, separators: Optional[List[str]] = None,
+                 strip_whitespace=True):
+        if chunk_overlap >= chunk_size:
+            raise ValueError(f"chunk_overlap ({chunk_overlap}) 必须小于 chunk_size ({chunk_size})")
+        self.chunk_size = chunk_size
+        self.chunk_overlap = chunk_overlap
+        self.separators = separators if separators is not None else CHINESE_SEPARATORS
+        self.strip_whitespace = strip_whitespace
+
+    # ---------- 区间运算 ----------
+
+    def _trim(self, text, start, end):
+        """去掉区间两端的空白，只移动端点"""
+        if self.strip_whitespace:
+            while start < end and text[start].isspace():
+                start += 1
+            while end > start and text[end - 1].isspace():
+                end -= 1
+        return start, end
+
+    @staticmethod
+    def _iter_pieces(text, start, end, separator):
+        """按分隔符把区间切成片段，分隔符留在片段末尾"""
+        position = start
+        while position < end:
+            index = text.find(separator, position, end)
+            if index == -1:
+                yield position, end
+                return
+            yield position, index + len(separator)
+            position = index + len(separator)
+
+    def _split_characters(self, start, end):
+        """没有可用的分隔符时按固定长度切，步长为 chunk_size - chunk_overlap"""
+        step = self.chunk_size - self.chunk_overlap
+        for position in range(start, end, step):
+            yield position, min(position + self.chunk_size, end)
+            if position + self.chunk_size >= end:
+                return
+
+    def _split(self, text, start, end, separators) -> Iterator[Tuple[int, int]]:
+        # 选择区间中出现的第一个分隔符，后面的分隔符留给过长的片段递归使用
+        separator, rest = "", []
+        for i, candidate in enumerate(separators):
+            if candidate == "":
+                separator, rest = "", []
+                break
+            if text.find(candidate, start, end) != -1:
+                separator, rest = candidate, separators[i + 1:]
+                break
+        else:
+            yield start, end  # 没有任何分隔符可用，整段作为一个块（与CharacterTextSplitter一致）
+            return
+        if separator == "":
+            yield from self._split_characters(start, end)
+            return
+
+        # 合并相邻的短片段；片段在原文中是连续的，块长度 = 最后一个片段的end - 第一个片段的start
+        merged = deque()
+        for piece_start, piece_end in self._iter_pieces(text, start, end, separator):
+            if piece_end - piece_start > self.chunk_size:
+                if merged:
+                    yield merged[0][0], merged[-1][1]
+                    merged.clear()
+                if rest:
+                    yield from self._split(text, piece_start, piece_end, rest)
+                else:
+                    yield piece_start, piece_end
+                continue
+            if merged and piece_end - merged[0][0] > self.chunk_size:
+                yield merged[0][0], merged[-1][1]
+                # 从前面丢掉片段，直到剩下的部分不超过重叠长度，且能放下新片段
+                while merged and (merged[-1][1] - merged[0][0] > self.chunk_overlap
+                                  or piece_end - merged[0][0] > self.chunk_size):
+                    merged.popleft()
+            merged.append((piece_start, piece_end))
+        if merged:
+            yield merged[0][0], merged[-1][1]
+
+    # ---------- 对外接口 ----------
+
+    def split_spans(self, text) -> Iterator[Tuple[int, int]]:
+        """产出每个块在原文中的 (start, end)"""
+        for start, end in self._split(text, 0, len(text), self.separators):
+            start, end = self._trim(text, start, end)
+            if start < end:
+                yield start, end
+
+    def iter_chunks(self, text, metadata=None) -> Iterator[SpanChunk]:
+        for start, end in self.split_spans(text):
+            yield SpanChunk(text, start, end, metadata)
+
+    def split_text(self, text) -> List[str]:
+        return [text[start:end] for start, end in self.split_spans(text)]
+
+    def lazy_split_documents(self, documents) -> Iterator[Document]:
+        """切分Document，元数据中记录 start_index 和 end_index"""
+        for document in documents:
+            for chunk in self.iter_chunks(document.page_content, document.metadata):
+                yield chunk.to_document()
+
+    def split_documents(self, documents) -> List[Document]:
+        return list(self.lazy_split_documents(documents))
+
+
+def neighbor_span(chunks, index, window=1):
+    """第index个块与前后各window个块合并后的原文区间，用于把命中的小块扩展成更大的上下文"""
+    first = chunks[max(0, index - window)]
+    last = chunks[min(len(chunks) - 1, index + window)]
+    return first.start, last.end
@@ -0,0 +1,245 @@
+"""
+按Token预算切块：每个文档只分词一次
+RecursiveCharacterTextSplitter.from_tiktoken_encoder 合并片段时会对候选文本反复调用分词器计算长度，
+同一段文字往往要被分词很多次。这里的做法是：
+- 一批文档一起分词（tiktoken的encode_ordinary_batch、HuggingFace快速分词器的批量调用），每个文档只分词一次，
+  同时拿到每个Token在原文中的字符偏移量
+- 按句子边界切出句子后，每个句子的Token数直接由Token偏移量算出（句子区间内的Token个数），不再调用分词器
+- 按Token下标合并句子；超长的句子沿Token边界硬切，块的长度就是Token下标之差
+- tiktoken的Token偏移量由每个Token的字节数换算成字符数得到，按Token id缓存，不再逐个解码Token
+- strict=True时把接近预算的块再批量分词一次做校验（BPE在块边界处可能与整篇分词结果相差一两个Token），
+  超长的块单独重新切分，保证每个块都不超过嵌入模型的最大长度，不会被静默截断；
+  离预算还远的块不会超长，不再重复分词
+
+用法：
+    import sys
+    sys.path.append("02-文本切块-DocChunking")
+    from token_splitter import TokenBudgetSplitter
+    splitter = TokenBudgetSplitter.from_tiktoken("cl100k_base", chunk_size=250)        # OpenAI嵌入模型
+    splitter = TokenBudgetSplitter.from_huggingface("BAAI/bge-small-zh-v1.5")          # 默认按模型最大长度
+    doc_splits = splitter.split_documents(docs_list)
+"""
+import re
+from bisect import bisect_left
+from collections import deque
+from typing import Iterator, List, Optional, Tuple
+
+from langchain_core.documents import Document
+
+# 句子结束位置：中文标点之后，或英文标点后面跟空白
+SENTENCE_END = re.compile(r"[。！？；\n]+|[.!?;]+(?=\s)")
+
+
+class TiktokenTokenizer:
+    """tiktoken分词器，OpenAI嵌入模型使用cl100k_base"""
+    def __init__(self, encoding_name="cl100k_base", model_name=None):
+        import tiktoken
+        self.encoding = tiktoken.encoding_for_model(model_name) if model_name else tiktoken.get_encoding(encoding_name)
+        self.num_special_tokens = 0
+        self.model_max_length = None
+        self._token_chars = {}  # Token id -> (包含的字符起始字节数, 是否从一个字符的中间开始)
+
+    def _char_info(self, token):
+        data = self.encoding.decode_single_token_bytes(token)
+        # UTF-8中0x80~0xBF是多字节字符的后续字节，其余字节各对应一个字符的开头
+        info = (sum(1 for byte in data if not 0x80 <= byte < 0xC0), 1 if 0x80 <= data[0] < 0xC0 else 0)
+        self._token_chars[token] = info
+        return info
+
+    def _token_starts(self, tokens) -> List[int]:
+        """与decode_with_offsets结果相同：从中间开始的Token算作所在字符的位置"""
+        token_chars, starts, position = self._token_chars, [], 0
+        for token in tokens:
+            num_chars, inside = token_chars.get(token) or self._char_info(token)
+            starts.append(position - inside if position > inside else 0)
+            position += num_chars
+        return starts
+
+    def token_starts_batch(self, texts) -> List[List[int]]:
+        """批量分词，返回每个Token在原文中的起始字符位置"""
+        return [self._token_starts(tokens) for tokens in self.encoding.encode_ordinary_batch(texts)]
+
+    def count_batch(self, texts) -> List[int]:
+        return [len(tokens) for tokens in self.encoding.encode_ordinary_batch(texts)]
+
+
+class HuggingFaceTokenizer:
+    """嵌入模型自己的HuggingFace分词器（需要快速分词器才能返回偏移量）"""
+    def __init__(self, model_name_or_tokenizer):
+        if isinstance(model_name_or_tokenizer, str):
+            from transformers import AutoTokenizer
+            model_name_or_tokenizer = AutoTokenizer.from_pretrained(model_name_or_tokenizer, use_fast=True)
+        self.tokenizer = model_name_or_tokenizer
+        # 模型输入中还要加上 [CLS]、[SEP] 等特殊Token，它们也占用最大长度
+        self.num_special_tokens = self.tokenizer.num_special_tokens_to_add()
+        max_length = self.tokenizer.model_max_length
+        self.model_max_length = max_length if max_length < 1_000_000 else None  # 未配置时是一个极大的占位值
+
+    def token_starts_batch(self, texts) -> List[List[int]]:
+        encoded = self.tokenizer(list(texts), add_special_tokens=False, return_offsets_mapping=True)
+        return [[start for start, _ in offsets] for offsets in encoded["offset_mapping"]]
+
+    def count_batch(self, texts) -> List[int]:
+        encoded = self.tokenizer(list(texts), add_special_tokens=False)
+        return [len(ids) for ids in encoded["input_ids"]]
+
+
+class TokenBudgetSplitter:
+    """按Token数切块，块的Token数（加上特殊Token）不超过chunk_size"""
+    def __init__(self, tokenizer, chunk_size: Optional[int] = None, chunk_overlap: int = 0,
+                 batch_size: int = 64, strict: bool = True, strict_margin: int = 8):
+        """
+        tokenizer: TiktokenTokenizer 或 HuggingFaceTokenizer
+        chunk_size: 每块的Token上限，默认取分词器对应模型的最大长度
+        chunk_overlap: 相邻块之间重叠的Token数（按整句重叠）
+        batch_size: 每次一起分词的文档数
+        strict: 是否对切好的块再批量分词校验一次
+        strict_margin: 只校验估计Token数距离预算不到这么多的块
+        """
+        chunk_size = chunk_size or tokenizer.model_max_length
+        if not chunk_size:
+            raise ValueError("分词器没有提供模型最大长度，必须指定chunk_size")
+        self.tokenizer = tokenizer
+        self.chunk_size = chunk_size
+        self.budget = chunk_size - tokenizer.num_special_tokens  # 留出特殊Token的位置
+        if chunk_overlap >= self.budget:
+            raise ValueError(f"chunk_overlap ({chunk_overlap}) 必须小于可用的Token数 ({self.budget})")
+        self.chunk_overlap = chunk_overlap
+        self.batch_size = batch_size
+        self.strict = strict
+        self.strict_margin = strict_margin
+
+    @classmethod
+    def from_tiktoken(cls, encoding_name="cl100k_base", model_name=None, **kwargs):
+        return cls(TiktokenTokenizer(encoding_name, model_name), **kwargs)
+
+    @classmethod
+    def from_huggingface(cls, model_name_or_tokenizer, **kwargs):
+        return cls(HuggingFaceTokenizer(model_name_or_tokenizer), **kwargs)
+
+    # ---------- 按Token下标切分 ----------
+
+    @staticmethod
+    def _sentences(text, starts):
+        """句子边界换算成Token下标，返回每个句子的Token区间 [i, j)"""
+        boundaries = [0]
+        for match in SENTENCE_END.finditer(text):
+            index = bisect_left(starts, match.end())
+            if index > boundaries[-1]:
+                boundaries.append(index)
+        if boundaries[-1] < len(starts):
+            boundaries.append(len(starts))
+        return list(zip(boundaries, boundaries[1:]))
+
+    def _token_spans(self, text, starts) -> Iterator[Tuple[int, int]]:
+        budget, overlap = self.budget, self.chunk_overlap
+        merged = deque()
+        for first, last in self._sentences(text, starts):
+            if last - first > budget:
+                # 超长的句子沿Token边界硬切
+                if merged:
+                    yield merged[0][0], merged[-1][1]
+                    merged.clear()
+                step = budget - overlap
+                for position in range(first, last, step):
+                    yield position, min(position + budget, last)
+                    if position + budget >= last:
+                        break
+                continue
+            if merged and last - merged[0][0] > budget:
+                yield merged[0][0], merged[-1][1]
+                while merged and (merged[-1][1] - merged[0][0] > overlap or last - merged[0][0] > budget):
+                    merged.popleft()
+            merged.append((first, last))
+        if merged:
+            yield merged[0][0], merged[-1][1]
+
+    @staticmethod
+    def _char_span(text, starts, first, last):
+        start = starts[first]
+        end = starts[last] if last < len(starts) else len(text)
+        # 去掉两端空白，只移动字符位置
+        while start < end and text[start].isspace():
+            start += 1
+        while end > start and text[end - 1].isspace():
+            end -= 1
+        return start, end
+
+    def _split_batch(self, texts) -> List[List[Tuple[int, int, int]]]:
+        """一批文本分词一次，返回每个文本的 [(字符起点, 字符终点, Token数), ...]"""
+        results = []
+        for text, starts in zip(texts, self.tokenizer.token_starts_batch(texts)):
+            spans = []
+            for first, last in self._token_spans(text, starts):
+                start, end = self._char_span(text, starts, first, last)
+                if start < end:
+                    spans.append((start, end, last - first))
+            results.append(spans)
+        if self.strict:
+            self._enforce_budget(texts, results)
+        return results
+
+    def _enforce_budget(self, texts, results):
+        """接近预算的块一起再分词一次，真实Token数超出预算的块单独重新切分，保证不会被嵌入模型截断"""
+        threshold = self.budget - self.strict_margin
+        near = [(i, k) for i, spans in enumerate(results) for k, (_, _, count) in enumerate(spans) if count > threshold]
+        if not near:
+            return
+        counts = self.tokenizer.count_batch([texts[i][results[i][k][0]:results[i][k][1]] for i, k in near])
+        refits = {}
+        for (i, k), count in zip(near, counts):
+            start, end, _ = results[i][k]
+            if count <= self.budget:
+                results[i][k] = (start, end, count)
+            else:
+                refits[i, k] = self._refit(texts[i], start, end)
+        for i in {i for i, _ in refits}:
+            results[i] = [span for k, span in enumerate(results[i])
+                          for span in refits.get((i, k), [span])]
+
+    def _refit(self, text, start, end):
+        """
+        对单个块按它自己的分词结果重新切分，直到每一段都不超过预算
+        按句子切不动时改为沿Token边界硬切；单个字符本身就超出预算时（如chunk_size很小时的emoji）无法再切，原样保留
+        """
+        spans, pending = [], [(start, end)]
+        while pending:
+            start, end = pending.pop()
+            piece = text[start:end]
+            starts = self.tokenizer.token_starts_batch([piece])[0]
+            if len(starts) <= self.budget:
+                spans.append((start, end, len(starts)))
+                continue
+            parts = [self._char_span(piece, starts, first, last) for first, last in self._token_spans(piece, starts)]
+            if any(part_end - part_start >= end - start for part_start, part_end in parts):
+                parts = [self._char_span(piece, starts, position, min(position + self.budget, len(starts)))
+                         for position in range(0, len(starts), self.budget)]
+            smaller = []
+            for part_start, part_end in parts:
+                if part_end - part_start >= end - start:
+                    spans.append((start, end, len(starts)))
+                    smaller = []
+                    break
+                if part_start < part_end:
+                    smaller.append((start + part_start, start + part_end))
+            pending.extend(reversed(smaller))
+        return spans
+
+    # ---------- 对外接口 ----------
+
+    def split_text(self, text) -> List[str]:
+        return [text[start:end] for start, end, _ in self._split_batch([text])[0]]
+
+    def lazy_split_documents(self, documents) -> Iterator[Document]:
+        """按batch_size个文档一批分词，元数据中记录 start_index 和 token_count"""
+        documents = list(documents)
+        for offset in range(0, len(documents), self.batch_size):
+            batch = documents[offset:offset + self.batch_size]
+            texts = [document.page_content for document in batch]
+            for document, text, spans in zip(batch, texts, self._split_batch(texts)):
+                for start, end, count in spans:
+                    yield Document(page_content=text[start:end],
+                                   metadata={**document.metadata, "start_index": start, "token_count": count})
+
+    def split_documents(self, documents) -> List[Document]:
+        return list(self.lazy_split_documents(documents))
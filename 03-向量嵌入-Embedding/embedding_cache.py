@@ -0,0 +1,378 @@
+"""
+内容寻址的嵌入缓存：所有SentenceTransformer / HuggingFaceEmbeddings调用点共用
+功能：
+1. 以（模型名称, 模型版本, 是否归一化, prompt/precision/truncate_dim等影响输出的参数, 文本哈希）为键缓存嵌入向量
+2. 向量存放在内存映射的float32/float16数组中，键表存放在SQLite中
+3. 超过容量上限时按LRU（最近最少使用）淘汰
+4. 透明包装嵌入模型，只有新增或修改过的文本才会真正调用模型
+5. 多个进程可以共用同一个缓存目录
+
+其它目录下的程序默认在仓库根目录运行，使用前先把本目录加入搜索路径：
+    import sys
+    sys.path.append("03-向量嵌入-Embedding")
+    from embedding_cache import CachedSentenceTransformer, cached_huggingface_embeddings
+"""
+import hashlib
+import json
+import os
+import sqlite3
+import threading
+
+import numpy as np
+
+try:
+    import fcntl
+except ImportError:  # Windows
+    fcntl = None
+    import msvcrt
+
+try:
+    from langchain_core.embeddings import Embeddings
+except ImportError:  # 只使用SentenceTransformer时不需要安装LangChain
+    Embeddings = object
+
+DEFAULT_CACHE_DIR = "vector_store/embedding_cache"
+DEFAULT_MAX_ENTRIES = 1_000_000
+INITIAL_CAPACITY = 1024
+SQLITE_MAX_VARIABLES = 900  # SQLite单条语句的参数个数有上限，分批查询
+
+
+def text_hash(text):
+    """计算文本的内容哈希"""
+    return hashlib.sha256(text.encode("utf-8")).hexdigest()
+
+
+class _FileLock:
+    """跨进程的排他文件锁：多个进程（或多个包装对象）共用同一个缓存目录时，扩容和写入依次进行"""
+    def __init__(self, path):
+        self.path = path
+        self._file = None
+
+    def __enter__(self):
+        self._file = open(self.path, "a+b")
+        if fcntl is not None:
+            fcntl.flock(self._file.fileno(), fcntl.LOCK_EX)
+        else:
+            self._file.seek(0)
+            msvcrt.locking(self._file.fileno(), msvcrt.LK_LOCK, 1)
+        return self
+
+    def __exit__(self, *exc):
+        if fcntl is not None:
+            fcntl.flock(self._file.fileno(), fcntl.LOCK_UN)
+        else:
+            self._file.seek(0)
+            msvcrt.locking(self._file.fileno(), msvcrt.LK_UNLCK, 1)
+        self._file.close()
+        self._file = None
+
+
+class EmbeddingCache:
+    """
+    磁盘嵌入缓存，一个缓存目录对应一组（模型名称, 模型版本, 是否归一化, 存储精度, 其它影响输出的参数）
+    目录结构：
+        vectors.bin   内存映射的向量数组，形状为 (capacity, dim)
+        index.sqlite  entries表：文本哈希 -> 数组槽位、最近使用时间；
+                      meta表：维度、容量、下一个空槽位、LRU时钟
+        lock          跨进程文件锁
+    槽位分配和容量、时钟等计数都在SQLite事务中读写，并由文件锁保护，多个进程共用一个目录也不会分到相同的槽位；
+    向量先写入数组再提交事务，进程在两者之间崩溃时只会留下未被引用的槽位。
+    """
+    def __init__(self, model_name, revision="main", normalize=False,
+                 cache_dir=DEFAULT_CACHE_DIR, dtype="float32", max_entries=DEFAULT_MAX_ENTRIES, variant=""):
+        if dtype not in ("float32", "float16"):
+            raise ValueError(f"不支持的存储精度: {dtype}，只支持float32和float16")
+        namespace = f"{model_name}|{revision}|{int(bool(normalize))}|{dtype}"
+        if variant:
+            namespace += f"|{variant}"
+        self.dir = os.path.join(cache_dir, hashlib.sha256(namespace.encode("utf-8")).hexdigest()[:16])
+        os.makedirs(self.dir, exist_ok=True)
+        self.vectors_path = os.path.join(self.dir, "vectors.bin")
+        self.dtype = np.dtype(dtype)
+        self.max_entries = max_entries
+        self._lock = threading.Lock()
+        self._file_lock = _FileLock(os.path.join(self.dir, "lock"))
+        self._vectors = None
+        self._mapped_capacity = 0
+
+        # isolation_level=None：由下面的代码显式开始和提交事务
+        self.db = sqlite3.connect(os.path.join(self.dir, "index.sqlite"), check_same_thread=False,
+                                  timeout=60, isolation_level=None)
+        with self._file_lock:
+            self.db.execute(
+                "CREATE TABLE IF NOT EXISTS entries ("
+                "text_hash TEXT PRIMARY KEY, slot INTEGER NOT NULL, last_used INTEGER NOT NULL)"
+            )
+            self.db.execute("CREATE INDEX IF NOT EXISTS idx_last_used ON entries(last_used)")
+            self.db.execute("CREATE TABLE IF NOT EXISTS meta (key TEXT PRIMARY KEY, value)")
+            if not self._read_meta():
+                meta = {"model_name": model_name, "revision": revision, "normalize": int(bool(normalize)),
+                        "dtype": dtype, "variant": variant, "dim": None, "capacity": 0, "next_slot": 0, "clock": 0}
+                # 旧版本把计数保存在meta.json中，首次打开时迁移到SQLite
+                meta_path = os.path.join(self.dir, "meta.json")
+                if os.path.exists(meta_path):
+                    with open(meta_path, "r", encoding="utf-8") as f:
+                        meta.update(json.load(f))
+                self._write_meta(meta)
+
+    def __len__(self):
+        return self.db.execute("SELECT COUNT(*) FROM entries").fetchone()[0]
+
+    # ==================== 元信息与向量数组管理 ====================
+    def _read_meta(self):
+        return dict(self.db.execute("SELECT key, value FROM meta"))
+
+    def _write_meta(self, meta):
+        self.db.executemany("INSERT OR REPLACE INTO meta (key, value) VALUES (?, ?)", list(meta.items()))
+
+    def _map_vectors(self, meta):
+        """以读写模式内存映射向量文件；其它进程扩容后重新映射"""
+        if not meta["dim"] or not meta["capacity"] or meta["capacity"] == self._mapped_capacity:
+            return
+        if self._vectors is not None:
+            self._vectors.flush()
+        self._vectors = np.memmap(self.vectors_path, dtype=self.dtype, mode="r+",
+                                  shape=(meta["capacity"], meta["dim"]))
+        self._mapped_capacity = meta["capacity"]
+
+    def _grow(self, meta, min_capacity):
+        """扩容向量文件（容量翻倍，不超过max_entries），在文件锁和事务内调用"""
+        capacity = meta["capacity"]
+        new_capacity = min(max(min_capacity, 2 * capacity, INITIAL_CAPACITY), self.max_entries)
+        if new_capacity <= capacity:
+            return
+        with open(self.vectors_path, "ab") as f:
+            f.truncate(new_capacity * meta["dim"] * self.dtype.itemsize)
+        meta["capacity"] = new_capacity
+        self._map_vectors(meta)
+
+    def _allocate_slots(self, meta, count):
+        """分配count个槽位：先用从未使用过的槽位（必要时扩容），满了以后按LRU淘汰旧条目"""
+        slots = []
+        next_slot = meta["next_slot"]
+        if next_slot + count > meta["capacity"]:
+            self._grow(meta, next_slot + count)
+        fresh = max(0, min(count, meta["capacity"] - next_slot))
+        slots.extend(range(next_slot, next_slot + fresh))
+        meta["next_slot"] = next_slot + fresh
+
+        remaining = count - fresh
+        if remaining > 0:
+            evicted = self.db.execute(
+                "SELECT text_hash, slot FROM entries ORDER BY last_used LIMIT ?", (remaining,)
+            ).fetchall()
+            self.db.executemany("DELETE FROM entries WHERE text_hash = ?", [(h,) for h, _ in evicted])
+            slots.extend(slot for _, slot in evicted)
+        return slots
+
+    # ==================== 查询与写入 ====================
+    def _lookup(self, hashes):
+        """批量查询文本哈希对应的槽位，返回 {text_hash: slot}"""
+        found = {}
+        for start in range(0, len(hashes), SQLITE_MAX_VARIABLES):
+            batch = hashes[start:start + SQLITE_MAX_VARIABLES]
+            placeholders = ",".join("?" * len(batch))
+            rows = self.db.execute(
+                f"SELECT text_hash, slot FROM entries WHERE text_hash IN ({placeholders})", batch
+            )
+            found.update(rows)
+        return found
+
+    def _transaction(self, fn):
+        """在文件锁和SQLite写事务中执行fn(meta)，成功时把meta写回并提交"""
+        with self._lock, self._file_lock:
+            self.db.execute("BEGIN IMMEDIATE")
+            try:
+                meta = self._read_meta()
+                self._map_vectors(meta)
+                result = fn(meta)
+                self._write_meta(meta)
+                self.db.execute("COMMIT")
+            except BaseException:
+                self.db.execute("ROLLBACK")
+                raise
+        return result
+
+    def _read_hits(self, meta, hashes):
+        """读出命中的向量并更新最近使用时间，返回 (结果矩阵或None, 命中的哈希集合)"""
+        found = self._lookup(list(set(hashes)))
+        if not found:
+            return None, found
+        hit_rows = [i for i, h in enumerate(hashes) if h in found]
+        hit_slots = np.asarray([found[hashes[i]] for i in hit_rows])
+        result = np.empty((len(hashes), meta["dim"]), dtype="float32")
+        result[hit_rows] = self._vectors[hit_slots]
+        meta["clock"] += 1
+        self.db.executemany(
+            "UPDATE entries SET last_used = ? WHERE text_hash = ?",
+            [(meta["clock"], h) for h in found]
+        )
+        return result, found
+
+    def _store(self, meta, hashes, vectors):
+        """写入新向量，超过容量上限时只保留最后max_entries条"""
+        if meta["dim"] is None:
+            meta["dim"] = int(vectors.shape[1])
+        elif vectors.shape[1] != meta["dim"]:
+            raise ValueError(f"向量维度({vectors.shape[1]})与缓存维度({meta['dim']})不一致")
+        # 计算期间其它进程可能已经写入了其中一部分，跳过它们
+        existing = self._lookup(hashes)
+        keep = [i for i, h in enumerate(hashes) if h not in existing]
+        hashes, vectors = [hashes[i] for i in keep], vectors[keep]
+        if len(hashes) > self.max_entries:
+            hashes, vectors = hashes[-self.max_entries:], vectors[-self.max_entries:]
+        if not hashes:
+            return
+
+        slots = self._allocate_slots(meta, len(hashes))
+        # 槽位可能不连续，用花式索引一次写入；先落盘再提交事务
+        self._vectors[np.asarray(slots)] = vectors[:len(slots)].astype(self.dtype)
+        self._vectors.flush()
+        meta["clock"] += 1
+        self.db.executemany(
+            "INSERT OR REPLACE INTO entries (text_hash, slot, last_used) VALUES (?, ?, ?)",
+            [(h, s, meta["clock"]) for h, s in zip(hashes, slots)]
+        )
+
+    def embed(self, texts, embed_fn):
+        """
+        返回texts的嵌入矩阵 (n, dim)，类型为float32
+        命中缓存的文本直接从内存映射数组读取，未命中的去重后一次性交给embed_fn计算
+        （计算期间不持有锁，其它进程可以同时读写缓存）
+        """
+        texts = list(texts)
+        if not texts:
+            dim = self._read_meta().get("dim")
+            return np.zeros((0, dim or 0), dtype="float32")
+        hashes = [text_hash(t) for t in texts]
+        result, found = self._transaction(lambda meta: self._read_hits(meta, hashes))
+
+        # 未命中的文本去重，保持首次出现的顺序
+        missing = {}
+        for h, t in zip(hashes, texts):
+            if h not in found and h not in missing:
+                missing[h] = t
+        if missing:
+            new_vectors = np.asarray(embed_fn(list(missing.values())), dtype="float32")
+            if result is None:
+                result = np.empty((len(texts), new_vectors.shape[1]), dtype="float32")
+            position = {h: i for i, h in enumerate(missing)}
+            miss_rows = [i for i, h in enumerate(hashes) if h in position]
+            result[miss_rows] = new_vectors[[position[hashes[i]] for i in miss_rows]]
+            self._transaction(lambda meta: self._store(meta, list(missing), new_vectors))
+        return result
+
+
+# ==================== 嵌入模型的透明包装 ====================
+def _resolve_revision(model):
+    """尽量从transformers配置中读出模型的提交哈希，读不到时退回main"""
+    try:
+        return model[0].auto_model.config._commit_hash or "main"
+    except (AttributeError, IndexError, KeyError, TypeError):
+        return "main"
+
+
+# 会改变encode输出的参数，作为缓存键的一部分
+OUTPUT_KWARGS = ("prompt", "prompt_name", "precision", "truncate_dim", "output_value")
+
+
+class CachedSentenceTransformer:
+    """带嵌入缓存的SentenceTransformer，encode用法与原模型一致（返回numpy数组）"""
+    def __init__(self, model_name_or_path, revision=None, cache_dir=DEFAULT_CACHE_DIR,
+                 dtype="float32", max_entries=DEFAULT_MAX_ENTRIES, **model_kwargs):
+        from sentence_transformers import SentenceTransformer
+        self.model = SentenceTransformer(model_name_or_path, revision=revision, **model_kwargs)
+        self.model_name = model_name_or_path
+        self.revision = revision or _resolve_revision(self.model)
+        self.cache_dir = cache_dir
+        self.dtype = dtype
+        self.max_entries = max_entries
+        self._caches = {}
+
+    def _cache(self, normalize, variant):
+        key = (normalize, variant)
+        if key not in self._caches:
+            self._caches[key] = EmbeddingCache(
+                self.model_name, self.revision, normalize,
+                cache_dir=self.cache_dir, dtype=self.dtype, max_entries=self.max_entries, variant=variant
+            )
+        return self._caches[key]
+
+    def _variant(self, kwargs):
+        options = {name: kwargs[name] for name in OUTPUT_KWARGS if kwargs.get(name) is not None}
+        # 构造模型时指定的truncate_dim同样会改变输出
+        if "truncate_dim" not in options and getattr(self.model, "truncate_dim", None):
+            options["truncate_dim"] = self.model.truncate_dim
+        return json.dumps(options, sort_keys=True, ensure_ascii=False) if options else ""
+
+    def encode(self, sentences, normalize_embeddings=False, **kwargs):
+        single = isinstance(sentences, str)
+        texts = [sentences] if single else list(sentences)
+        kwargs.pop("convert_to_numpy", None)
+        kwargs.pop("convert_to_tensor", None)
+        vectors = self._cache(bool(normalize_embeddings), self._variant(kwargs)).embed(
+            texts,
+            lambda batch: self.model.encode(
+                batch, normalize_embeddings=normalize_embeddings, convert_to_numpy=True, **kwargs
+            )
+        )
+        return vectors[0] if single else vectors
+
+    def __getattr__(self, name):
+        # 其它属性和方法（如get_sentence_embedding_dimension）直接转发给原模型；
+        # self.model还不存在时（构造失败、反序列化、copy）直接报错，避免无限递归
+        if name == "model":
+            raise AttributeError(name)
+        return getattr(self.model, name)
+
+
+class CachedEmbeddings(Embeddings):
+    """
+    LangChain Embeddings的缓存包装：embed_documents走缓存，embed_query直接调用原模型
+    （查询文本很少重复，缓存只会挤占语料的空间）
+    """
+    def __init__(self, embeddings, model_name=None, revision="main", normalize=None,
+                 cache_dir=DEFAULT_CACHE_DIR, dtype="float32", max_entries=DEFAULT_MAX_ENTRIES):
+        self.embeddings = embeddings
+        model_name = model_name or getattr(embeddings, "model_name", None) or getattr(embeddings, "model", None)
+        if model_name is None:
+            raise ValueError("无法从嵌入模型上读出模型名称，请显式传入model_name")
+        if normalize is None:
+            encode_kwargs = getattr(embeddings, "encode_kwargs", None) or {}
+            normalize = bool(encode_kwargs.get("normalize_embeddings", False))
+        self.cache = EmbeddingCache(
+            model_name, revision, normalize,
+            cache_dir=cache_dir, dtype=dtype, max_entries=max_entries
+        )
+
+    def embed_documents(self, texts):
+        return self.cache.embed(texts, self.embeddings.embed_documents).tolist()
+
+    def embed_query(self, text):
+        return self.embeddings.embed_query(text)
+
+
+def cached_huggingface_embeddings(cache_dir=DEFAULT_CACHE_DIR, dtype="float32",
+                                  max_entries=DEFAULT_MAX_ENTRIES, **kwargs):
+    """创建带缓存的HuggingFaceEmbeddings，kwargs与HuggingFaceEmbeddings的参数一致"""
+    from langchain_huggingface import HuggingFaceEmbeddings
+    embeddings = HuggingFaceEmbeddings(**kwargs)
+    revision = (embeddings.model_kwargs or {}).get("revision", "main")
+    return CachedEmbeddings(
+        embeddings, revision=revision,
+        cache_dir=cache_dir, dtype=dtype, max_entries=max_entries
+    )
+
+
+if __name__ == "__main__":
+    import time
+    texts = [
+        "黑神话悟空的战斗如同武侠小说活过来一般",
+        "72变神通不只是变化形态，更是开启新世界的钥匙",
+        "每场BOSS战都是一场惊心动魄的较量",
+    ]
+    model = CachedSentenceTransformer("sentence-transformers/all-MiniLM-L6-v2")
+    for round_name in ["首次运行", "再次运行"]:
+        start = time.perf_counter()
+        vectors = model.encode(texts)
+        print(f"{round_name}: 形状 {vectors.shape}，耗时 {time.perf_counter() - start:.3f}s")
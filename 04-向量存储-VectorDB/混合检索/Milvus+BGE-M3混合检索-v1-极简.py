@@ -1,5 +1,7 @@
-import json
+import os
+import sys
 import time
+import ijson
 from milvus_model.hybrid import BGEM3EmbeddingFunction
 from pymilvus import (
     connections,
@@ -13,6 +15,8 @@ from pymilvus import (
 )
 from pymilvus.exceptions import MilvusException
 import scipy.sparse # 确保已安装 scipy
+sys.path.append("01-数据导入-DataLoading/02-结构化文档读取")
+from streaming_json_loader import iter_json_items # 流式读取JSON，pip install ijson
 
 # 0. 配置 (方便修改)
 DATA_PATH = "/root/AI-BOX/code/rag/rag-in-action/90-文档-Data/灭神纪/战斗场景.json"
@@ -25,32 +29,30 @@ print("脚本开始执行...")
 
 # 1. 加载数据
 print(f"1. 正在从 {DATA_PATH} 加载数据...")
-try:
-    with open(DATA_PATH, 'r', encoding='utf-8') as f:
-        dataset = json.load(f)
-except FileNotFoundError:
+if not os.path.exists(DATA_PATH):
     print(f"错误: 数据文件 {DATA_PATH} 未找到。请检查路径。")
     exit()
-except json.JSONDecodeError:
-    print(f"错误: 数据文件 {DATA_PATH} JSON 格式错误。")
-    exit()
 
 docs = []
 metadata = []
-for item in dataset.get('data', []): # 使用 .get 避免 'data' 键不存在的错误
-    text_parts = [item.get('title', ''), item.get('description', '')]
-    if 'combat_details' in item and isinstance(item['combat_details'], dict):
-        text_parts.extend(item['combat_details'].get('combat_style', []))
-        text_parts.extend(item['combat_details'].get('abilities_used', []))
-    if 'scene_info' in item and isinstance(item['scene_info'], dict):
-        text_parts.extend([
-            item['scene_info'].get('location', ''),
-            item['scene_info'].get('environment', ''),
-            item['scene_info'].get('time_of_day', '')
-        ])
-    # 过滤掉 None 和空字符串，然后连接
-    docs.append(' '.join(filter(None, [str(part).strip() for part in text_parts if part])))
-    metadata.append(item)
+try:
+    for item in iter_json_items(DATA_PATH, ".data[]"): # 逐条流式读取 data 数组，'data' 键不存在时不产出任何记录
+        text_parts = [item.get('title', ''), item.get('description', '')]
+        if 'combat_details' in item and isinstance(item['combat_details'], dict):
+            text_parts.extend(item['combat_details'].get('combat_style', []))
+            text_parts.extend(item['combat_details'].get('abilities_used', []))
+        if 'scene_info' in item and isinstance(item['scene_info'], dict):
+            text_parts.extend([
+                item['scene_info'].get('location', ''),
+                item['scene_info'].get('environment', ''),
+                item['scene_info'].get('time_of_day', '')
+            ])
+        # 过滤掉 None 和空字符串，然后连接
+        docs.append(' '.join(filter(None, [str(part).strip() for part in text_parts if part])))
+        metadata.append(item)
+except ijson.JSONError as e:
+    print(f"错误: 数据文件 {DATA_PATH} JSON 格式错误。({e})")
+    exit()
 
 if not docs:
     print("错误: 未能从数据文件中加载任何文档。请检查文件内容和结构。")
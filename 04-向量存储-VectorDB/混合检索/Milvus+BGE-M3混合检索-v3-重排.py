@@ -1,13 +1,13 @@
 # 1. 加载并预处理数据集
-import json
+import sys
 from typing import Optional, Dict
-with open("90-文档-Data/灭神纪/战斗场景.json", 'r', encoding='utf-8') as f:
-    dataset = json.load(f)
+sys.path.append("01-数据导入-DataLoading/02-结构化文档读取")
+from streaming_json_loader import iter_json_items # 流式读取JSON，pip install ijson
 
 docs = []
 metadata = []
 
-for item in dataset['data']:
+for item in iter_json_items("90-文档-Data/灭神纪/战斗场景.json", ".data[]"):
     text_parts = [item['title'], item['description']]
 
     if 'combat_details' in item:
@@ -5,7 +5,9 @@ from langchain_community.document_loaders import YoutubeLoader
 from langchain.chains.query_constructor.base import AttributeInfo
 from langchain.retrievers.self_query.base import SelfQueryRetriever
 from langchain_chroma import Chroma
-from langchain_huggingface import HuggingFaceEmbeddings
+import sys
+sys.path.append("03-向量嵌入-Embedding")
+from embedding_cache import cached_huggingface_embeddings # 带磁盘缓存的HuggingFaceEmbeddings
 from pydantic import BaseModel, Field
 # 定义视频元数据模型
 class VideoMetadata(BaseModel):
@@ -35,7 +37,7 @@ for url in video_urls:
     except Exception as e:
         print(f"加载失败 {url}: {str(e)}")
 # 创建向量存储
-embed_model = HuggingFaceEmbeddings(model_name="BAAI/bge-small-zh")
+embed_model = cached_huggingface_embeddings(model_name="BAAI/bge-small-zh")
 vectorstore = Chroma.from_documents(videos, embed_model)
 # 配置检索器的元数据字段
 metadata_field_info = [
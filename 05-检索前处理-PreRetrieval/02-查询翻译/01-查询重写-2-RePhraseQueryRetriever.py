@@ -3,7 +3,9 @@ from langchain.retrievers import RePhraseQueryRetriever
 from langchain_chroma import Chroma
 from langchain_community.document_loaders import TextLoader
 from langchain_deepseek import ChatDeepSeek
-from langchain_huggingface import HuggingFaceEmbeddings
+import sys
+sys.path.append("03-向量嵌入-Embedding")
+from embedding_cache import cached_huggingface_embeddings # 带磁盘缓存的HuggingFaceEmbeddings
 from langchain_text_splitters import RecursiveCharacterTextSplitter
 # 设置日志记录
 logging.basicConfig()
@@ -15,7 +17,7 @@ data = loader.load()
 text_splitter = RecursiveCharacterTextSplitter(chunk_size=500, chunk_overlap=0)
 all_splits = text_splitter.split_documents(data)
 # 创建向量存储
-embed_model = HuggingFaceEmbeddings(model_name="BAAI/bge-small-zh")
+embed_model = cached_huggingface_embeddings(model_name="BAAI/bge-small-zh")
 vectorstore = Chroma.from_documents(documents=all_splits, embedding= embed_model)
 # 设置RePhraseQueryRetriever
 llm = ChatDeepSeek(model="deepseek-chat", temperature=0)
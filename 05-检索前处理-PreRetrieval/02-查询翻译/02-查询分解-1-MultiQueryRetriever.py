@@ -2,7 +2,9 @@ import logging
 from langchain_chroma import Chroma
 from langchain_community.document_loaders import TextLoader
 from langchain_deepseek import ChatDeepSeek
-from langchain_huggingface import HuggingFaceEmbeddings
+import sys
+sys.path.append("03-向量嵌入-Embedding")
+from embedding_cache import cached_huggingface_embeddings # 带磁盘缓存的HuggingFaceEmbeddings
 from langchain_text_splitters import RecursiveCharacterTextSplitter
 from langchain.retrievers.multi_query import MultiQueryRetriever # 多角度查询检索器
 # 设置日志记录
@@ -13,7 +15,7 @@ loader = TextLoader("90-文档-Data/黑悟空/黑悟空设定.txt", encoding='ut
 data = loader.load()
 text_splitter = RecursiveCharacterTextSplitter(chunk_size=500, chunk_overlap=0)
 splits = text_splitter.split_documents(data)
-embed_model = HuggingFaceEmbeddings(model_name="BAAI/bge-small-zh")
+embed_model = cached_huggingface_embeddings(model_name="BAAI/bge-small-zh")
 vectorstore = Chroma.from_documents(documents=splits, embedding= embed_model)
 # 通过MultiQueryRetriever 生成多角度查询
 llm = ChatDeepSeek(model="deepseek-chat", temperature=0)
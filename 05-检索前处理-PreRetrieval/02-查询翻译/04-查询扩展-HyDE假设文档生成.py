@@ -1,7 +1,9 @@
 from langchain.prompts import ChatPromptTemplate
 from langchain_core.output_parsers import StrOutputParser
 from langchain_deepseek import ChatDeepSeek
-from langchain_huggingface import HuggingFaceEmbeddings
+import sys
+sys.path.append("03-向量嵌入-Embedding")
+from embedding_cache import cached_huggingface_embeddings # 带磁盘缓存的HuggingFaceEmbeddings
 from langchain_community.document_loaders import TextLoader
 from langchain_text_splitters import RecursiveCharacterTextSplitter
 from langchain_chroma import Chroma
@@ -11,7 +13,7 @@ data = loader.load()
 text_splitter = RecursiveCharacterTextSplitter(chunk_size=500, chunk_overlap=0)
 splits = text_splitter.split_documents(data)
 
-embed_model = HuggingFaceEmbeddings(model_name="BAAI/bge-small-zh") 
+embed_model = cached_huggingface_embeddings(model_name="BAAI/bge-small-zh") 
 vectordb = Chroma.from_documents(documents=splits, embedding= embed_model)
 # HyDE文档生成模板
 template = """请撰写一段与以下问题相关的游戏内容：
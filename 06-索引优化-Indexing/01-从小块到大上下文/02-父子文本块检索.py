@@ -1,8 +1,10 @@
 from langchain_deepseek import ChatDeepSeek 
-from langchain_huggingface import HuggingFaceEmbeddings 
+import sys
+sys.path.append("03-向量嵌入-Embedding")
+from embedding_cache import cached_huggingface_embeddings # 带磁盘缓存的HuggingFaceEmbeddings
 # 初始化语言模型和向量嵌入模型
 llm = ChatDeepSeek(model="deepseek-chat", temperature=0.1)
-embed_model = HuggingFaceEmbeddings(model_name="BAAI/bge-small-zh")
+embed_model = cached_huggingface_embeddings(model_name="BAAI/bge-small-zh")
 # 准备游戏知识文本，创建Document对象。
 from langchain.schema import Document
 game_knowledge = """
@@ -1,8 +1,12 @@
 # 双层检索-富豪榜 - 需要pip install openpyxl
 import os
 from dotenv import load_dotenv
-import pandas as pd
-from sentence_transformers import SentenceTransformer
+import sys
+sys.path.append("03-向量嵌入-Embedding")
+from embedding_cache import CachedSentenceTransformer # 带磁盘缓存的SentenceTransformer
+sys.path.append("01-数据导入-DataLoading/05-表格数据读取")
+sys.path.append("01-数据导入-DataLoading")  # 共用的file_hashing模块
+from table_store import TableStore # Parquet表格库，只在首次运行时解析Excel
 import torch
 from pymilvus import MilvusClient, DataType, FieldSchema, CollectionSchema
 import logging
@@ -13,8 +17,8 @@ logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(
 # 加载环境变量
 load_dotenv()
 
-# 初始化嵌入模型
-embedding_function = SentenceTransformer(
+# 初始化嵌入模型（已嵌入过的文本直接读缓存）
+embedding_function = CachedSentenceTransformer(
     'BAAI/bge-m3',
     device='cuda:0' if torch.cuda.is_available() else 'cpu',
     trust_remote_code=True
@@ -62,63 +66,65 @@ if not client.has_collection(details_collection_name):
 # 3. 加载Excel文件并准备数据
 excel_file = "90-文档-Data/复杂PDF/十大富豪/世界十大富豪.xlsx"
 
-# 读取Excel文件中的所有sheet并插入数据
-with pd.ExcelFile(excel_file) as xls:
-    for sheet_name in xls.sheet_names:
-        try:
-            df = pd.read_excel(xls, sheet_name=sheet_name)
-            logging.info(f"正在处理sheet: {sheet_name}")
-            logging.info(f"列名: {df.columns.tolist()}")
-            
-            # 标准化列名（移除换行符和多余的空格）
-            df.columns = [col.replace('\n', ' ').strip() for col in df.columns]
-            
-            # 使用新的列名格式
-            if 'Net_Worth' not in df.columns or 'Name' not in df.columns:
-                raise ValueError(f"找不到必要的列: Net_Worth 或 Name")
+# 每个sheet存为一个Parquet文件，之后的运行以内存映射方式读取，不再解析Excel
+store = TableStore.from_excel(excel_file, "90-文档-Data/复杂PDF/十大富豪/parquet/世界十大富豪")
+
+# 读取所有表格并插入数据
+for sheet_name in store.table_names():
+    try:
+        # 写入表格库时已标准化列名（移除换行符和多余的空格），从索引中就能查到列名
+        columns = [col["name"] for col in store.table_info(sheet_name)["columns"]]
+        logging.info(f"正在处理sheet: {sheet_name}")
+        logging.info(f"列名: {columns}")
+        
+        # 使用新的列名格式
+        if 'Net_Worth' not in columns or 'Name' not in columns:
+            raise ValueError(f"找不到必要的列: Net_Worth 或 Name")
+        # 只读取需要的列
+        df = store.read_table(sheet_name, columns=['No', 'Name', 'Net_Worth', 'Nationality', 'Source'])
+        
+        # 插入summary数据
+        summary_embedding = embedding_function.encode([sheet_name])[0]
+        
+        client.insert(
+            collection_name=summary_collection_name,
+            data=[{
+                "vector": summary_embedding.tolist(),
+                "summary": sheet_name,
+                "table_name": sheet_name
+            }]
+        )
+        
+        # 插入details数据
+        for _, row in df.iterrows():
+            # 清理和格式化数据
+            name = str(row['Name']).strip()
+            wealth = str(row['Net_Worth']).strip()
+            nationality = str(row['Nationality']).strip()
+            source = str(row['Source']).strip()
             
-            # 插入summary数据
-            summary_embedding = embedding_function.encode([sheet_name])[0]
+            detail_text = f"{name} {wealth} {nationality} {source}"
+            detail_embedding = embedding_function.encode([detail_text])[0]
             
             client.insert(
-                collection_name=summary_collection_name,
+                collection_name=details_collection_name,
                 data=[{
-                    "vector": summary_embedding.tolist(),
-                    "summary": sheet_name,
-                    "table_name": sheet_name
+                    "vector": detail_embedding.tolist(),
+                    "table_name": sheet_name,
+                    "rank": int(row['No']),
+                    "name": name,
+                    "wealth": wealth,
+                    "company": source,
+                    "industry": nationality
                 }]
             )
-            
-            # 插入details数据
-            for _, row in df.iterrows():
-                # 清理和格式化数据
-                name = str(row['Name']).strip()
-                wealth = str(row['Net_Worth']).strip()
-                nationality = str(row['Nationality']).strip()
-                source = str(row['Source']).strip()
-                
-                detail_text = f"{name} {wealth} {nationality} {source}"
-                detail_embedding = embedding_function.encode([detail_text])[0]
-                
-                client.insert(
-                    collection_name=details_collection_name,
-                    data=[{
-                        "vector": detail_embedding.tolist(),
-                        "table_name": sheet_name,
-                        "rank": int(row['No']),
-                        "name": name,
-                        "wealth": wealth,
-                        "company": source,
-                        "industry": nationality
-                    }]
-                )
-            
-            logging.info(f"成功处理sheet: {sheet_name}")
-            
-        except Exception as e:
-            logging.error(f"处理sheet {sheet_name} 时出错: {str(e)}")
-            logging.error(f"错误详情: {e.__class__.__name__}")
-            continue
+        
+        logging.info(f"成功处理sheet: {sheet_name}")
+        
+    except Exception as e:
+        logging.error(f"处理sheet {sheet_name} 时出错: {str(e)}")
+        logging.error(f"错误详情: {e.__class__.__name__}")
+        continue
 
 # 4. 创建索引
 # 删除已存在的索引（如果有）
@@ -1,8 +1,11 @@
 # 双层检索-富豪榜 - 需要pip install openpyxl
 import os
 from dotenv import load_dotenv
-import pandas as pd
+import sys
 import logging
+sys.path.append("01-数据导入-DataLoading/05-表格数据读取")
+sys.path.append("01-数据导入-DataLoading")  # 共用的file_hashing模块
+from table_store import TableStore # Parquet表格库，只在首次运行时解析Excel
 from llama_index.core import Document, VectorStoreIndex
 from llama_index.core.node_parser import SentenceSplitter
 from llama_index.core.schema import IndexNode
@@ -39,39 +42,40 @@ table_dfs = []
 df_query_engines = []
 documents = []
 
-# 读取Excel文件中的所有sheet并插入数据
-with pd.ExcelFile(excel_file) as xls:
-    for sheet_name in xls.sheet_names:
-        try:
-            df = pd.read_excel(xls, sheet_name=sheet_name)
-            logging.info(f"正在处理sheet: {sheet_name}")
-            
-            # 将DataFrame转换为字符串
-            table_content = df.to_string(index=False)
-            
-            # 创建Document对象
-            doc = Document(
-                text=table_content,
-                metadata={"table_name": sheet_name}
-            )
-            documents.append(doc)
-            
-            # 存储DataFrame和创建查询引擎
-            table_dfs.append(df)
-            df_query_engine = PandasQueryEngine(df, llm=Settings.llm)
-            df_query_engines.append(df_query_engine)
-            
-            logging.info(f"成功处理sheet: {sheet_name}")
-            
-        except Exception as e:
-            logging.error(f"处理sheet {sheet_name} 时出错: {str(e)}")
-            logging.error(f"错误详情: {e.__class__.__name__}")
-            continue
+# 读取所有表格并插入数据
+# 每个sheet存为一个Parquet文件，之后的运行以内存映射方式读取，不再解析Excel
+store = TableStore.from_excel(excel_file, "90-文档-Data/复杂PDF/十大富豪/parquet/世界十大富豪")
+for sheet_name in store.table_names():
+    try:
+        df = store.read_table(sheet_name)
+        logging.info(f"正在处理sheet: {sheet_name}")
+        
+        # 将DataFrame转换为字符串
+        table_content = df.to_string(index=False)
+        
+        # 创建Document对象
+        doc = Document(
+            text=table_content,
+            metadata={"table_name": sheet_name}
+        )
+        documents.append(doc)
+        
+        # 存储DataFrame和创建查询引擎
+        table_dfs.append(df)
+        df_query_engine = PandasQueryEngine(df, llm=Settings.llm)
+        df_query_engines.append(df_query_engine)
+        
+        logging.info(f"成功处理sheet: {sheet_name}")
+        
+    except Exception as e:
+        logging.error(f"处理sheet {sheet_name} 时出错: {str(e)}")
+        logging.error(f"错误详情: {e.__class__.__name__}")
+        continue
 
 # 创建IndexNode对象
 summaries = [
     f"This node provides information about the world's richest billionaires in {sheet_name}"
-    for sheet_name in xls.sheet_names
+    for sheet_name in store.table_names()
 ]
 
 df_nodes = [
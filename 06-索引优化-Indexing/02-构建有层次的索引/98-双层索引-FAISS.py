@@ -1,6 +1,9 @@
 import os
 from dotenv import load_dotenv
-import pandas as pd
+import sys
+sys.path.append("01-数据导入-DataLoading/05-表格数据读取")
+sys.path.append("01-数据导入-DataLoading")  # 共用的file_hashing模块
+from table_store import TableStore # Parquet表格库，只在首次运行时解析Excel
 from sentence_transformers import SentenceTransformer
 import faiss
 import numpy as np
@@ -31,13 +34,14 @@ desc_index.add(desc_embeddings.astype('float32'))
 excel_file = "90-文档-Data/复杂PDF/十大富豪/世界十大富豪.xlsx"
 all_tables_data = {}
 
-# 读取Excel文件中的所有sheet
-with pd.ExcelFile(excel_file) as xls:
-    for sheet_name in xls.sheet_names:
-        df = pd.read_excel(xls, sheet_name=sheet_name)
-        # 将DataFrame转换为文本格式
-        table_text = df.to_string(index=False)
-        all_tables_data[sheet_name] = table_text
+# 读取所有表格
+# 每个sheet存为一个Parquet文件，之后的运行以内存映射方式读取，不再解析Excel
+store = TableStore.from_excel(excel_file, "90-文档-Data/复杂PDF/十大富豪/parquet/世界十大富豪")
+for sheet_name in store.table_names():
+    df = store.read_table(sheet_name)
+    # 将DataFrame转换为文本格式
+    table_text = df.to_string(index=False)
+    all_tables_data[sheet_name] = table_text
 
 # 5. 创建第二层向量存储
 table_embeddings = model.encode(list(all_tables_data.values()))
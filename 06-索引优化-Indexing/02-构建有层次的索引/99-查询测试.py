@@ -1,6 +1,8 @@
 import os
 from dotenv import load_dotenv
-from sentence_transformers import SentenceTransformer
+import sys
+sys.path.append("03-向量嵌入-Embedding")
+from embedding_cache import CachedSentenceTransformer # 带磁盘缓存的SentenceTransformer
 import torch
 from pymilvus import MilvusClient
 import logging
@@ -11,8 +13,8 @@ logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(
 # 加载环境变量
 load_dotenv()
 
-# 初始化嵌入模型
-embedding_function = SentenceTransformer(
+# 初始化嵌入模型（已嵌入过的文本直接读缓存）
+embedding_function = CachedSentenceTransformer(
     'BAAI/bge-m3',
     device='cuda:0' if torch.cuda.is_available() else 'cpu',
     trust_remote_code=True
@@ -1,4 +1,6 @@
-from langchain_huggingface import HuggingFaceEmbeddings
+import sys
+sys.path.append("03-向量嵌入-Embedding")
+from embedding_cache import cached_huggingface_embeddings # 带磁盘缓存的HuggingFaceEmbeddings
 from langchain_deepseek import ChatDeepSeek
 from langchain.chains import RetrievalQA
 # 系统设定文档：关注具体游戏机制和系统
@@ -29,7 +31,7 @@ bm25_retriever = BM25Retriever.from_texts(
 )
 bm25_retriever.k = 2
 # 创建向量检索器
-embed_model = HuggingFaceEmbeddings(model_name="BAAI/bge-small-zh")
+embed_model = cached_huggingface_embeddings(model_name="BAAI/bge-small-zh")
 vectorstore = FAISS.from_texts(
     system_docs + lore_docs,
     embed_model,
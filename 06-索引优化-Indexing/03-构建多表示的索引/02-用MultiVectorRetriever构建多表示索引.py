@@ -15,10 +15,12 @@ chain = (
 summaries = chain.batch(docs, {"max_concurrency": 5})
 # 设置多向量检索器
 from langchain.storage import InMemoryByteStore # 内存存储
-from langchain_huggingface import HuggingFaceEmbeddings # 向量模型
+import sys
+sys.path.append("03-向量嵌入-Embedding")
+from embedding_cache import cached_huggingface_embeddings # 带磁盘缓存的向量模型
 from langchain_community.vectorstores import Chroma # 向量数据库
 from langchain.retrievers.multi_vector import MultiVectorRetriever # 多向量检索器
-embed_model = HuggingFaceEmbeddings(model_name="BAAI/bge-small-zh") # 向量模型
+embed_model = cached_huggingface_embeddings(model_name="BAAI/bge-small-zh") # 向量模型
 vectorstore = Chroma(collection_name="summaries", embedding_function= embed_model) # 向量数据库
 store = InMemoryByteStore() # 内存存储
 id_key = "doc_id" # 文档ID
@@ -8,32 +8,30 @@ from langchain.prompts import ChatPromptTemplate
 from langchain_core.output_parsers import StrOutputParser
 from langchain_deepseek import ChatDeepSeek
 from langchain.load import dumps, loads
-# 加载文档
+# 加载文档：通过导入清单增量处理，只有新增或修改过的文件才会重新加载、切块和嵌入
+import sys
+sys.path.append("01-数据导入-DataLoading")
+from ingestion_manifest import IngestionManifest, incremental_ingest
 doc_dir = "90-文档-Data/山西文旅"
-def load_documents(directory):
-    """读取目录中的所有文档（包括PDF、TXT、DOCX)"""
-    documents = []
-    for filename in os.listdir(directory):
-        filepath = os.path.join(directory, filename)
-        
-        if filename.endswith(".pdf"):
-            loader = PyPDFLoader(filepath)
-        elif filename.endswith(".txt"):
-            loader = TextLoader(filepath)
-        else:
-            continue  # 跳过不支持的文件类型
-        documents.extend(loader.load())
-    return documents
-docs = load_documents(doc_dir)
+def load_document(filepath):
+    """按文件类型读取单个文档（支持PDF、TXT），返回 (文档列表, 加载器名称)"""
+    if filepath.endswith(".pdf"):
+        return PyPDFLoader(filepath).load(), "PyPDFLoader"
+    if filepath.endswith(".txt"):
+        return TextLoader(filepath).load(), "TextLoader"
+    return [], None  # 跳过不支持的文件类型
+filepaths = sorted(os.path.join(doc_dir, filename) for filename in os.listdir(doc_dir))
 # 文本切块
 text_splitter = RecursiveCharacterTextSplitter(
     chunk_size=300,
     chunk_overlap=50
 )
-splits = text_splitter.split_documents(docs)
-# 获取嵌入并创建向量索引
+# 获取嵌入并创建持久化的向量索引，清单和向量库放在同一目录，保持一致
 embed_model = HuggingFaceEmbeddings(model_name="all-MiniLM-L6-v2")
-vectorstore = Chroma.from_documents(documents=splits, embedding=embed_model)
+persist_dir = "vector_store/shanxi_rrf"
+vectorstore = Chroma(persist_directory=persist_dir, embedding_function=embed_model)
+manifest = IngestionManifest(os.path.join(persist_dir, "manifest.sqlite"))
+incremental_ingest(manifest, filepaths, load_document, text_splitter, vectorstore)
 retriever = vectorstore.as_retriever()
 # RRF算法
 def reciprocal_rank_fusion(results: list[list], k=60):
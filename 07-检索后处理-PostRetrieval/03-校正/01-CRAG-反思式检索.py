@@ -1,5 +1,7 @@
 #1 为3篇博客文章创建索引
-from langchain.text_splitter import RecursiveCharacterTextSplitter
+import sys
+sys.path.append("02-文本切块-DocChunking")
+from token_splitter import TokenBudgetSplitter
 from langchain_community.document_loaders import WebBaseLoader
 from langchain_community.vectorstores import Chroma
 from langchain_openai import OpenAIEmbeddings
@@ -14,8 +16,9 @@ urls = [
 docs = [WebBaseLoader(url).load() for url in urls]
 docs_list = [item for sublist in docs for item in sublist]
 
-text_splitter = RecursiveCharacterTextSplitter.from_tiktoken_encoder(
-    chunk_size=250, chunk_overlap=0
+# 每个文档只分词一次，按Token偏移量切块（OpenAI嵌入模型使用cl100k_base编码）
+text_splitter = TokenBudgetSplitter.from_tiktoken(
+    "cl100k_base", chunk_size=250, chunk_overlap=0
 )
 doc_splits = text_splitter.split_documents(docs_list)
 
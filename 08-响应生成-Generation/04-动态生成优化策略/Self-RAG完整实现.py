@@ -1,4 +1,6 @@
-from langchain.text_splitter import RecursiveCharacterTextSplitter
+import sys
+sys.path.append("02-文本切块-DocChunking")
+from token_splitter import TokenBudgetSplitter
 from langchain_community.document_loaders import WebBaseLoader
 from langchain_community.vectorstores import Chroma
 from langchain_openai import OpenAIEmbeddings
@@ -16,9 +18,9 @@ urls = [
 docs = [WebBaseLoader(url).load() for url in urls]
 docs_list = [item for sublist in docs for item in sublist]
 
-# 创建文本分割器
-text_splitter = RecursiveCharacterTextSplitter.from_tiktoken_encoder(
-    chunk_size=250, chunk_overlap=0
+# 创建文本分割器：每个文档只分词一次，按Token偏移量切块
+text_splitter = TokenBudgetSplitter.from_tiktoken(
+    "cl100k_base", chunk_size=250, chunk_overlap=0
 )
 doc_splits = text_splitter.split_documents(docs_list)
 
@@ -6,7 +6,9 @@ from pprint import pprint
 from langchain_community.document_loaders import WebBaseLoader
 from langchain_community.vectorstores import Chroma
 from langchain_openai import OpenAIEmbeddings, ChatOpenAI
-from langchain_text_splitters import RecursiveCharacterTextSplitter
+import sys
+sys.path.append("02-文本切块-DocChunking")
+from token_splitter import TokenBudgetSplitter
 from langchain.tools.retriever import create_retriever_tool
 from langchain_core.messages import BaseMessage, HumanMessage
 from langchain_core.prompts import PromptTemplate
@@ -32,8 +34,8 @@ urls = [
 # 加载文档
 docs = [WebBaseLoader(url).load() for url in urls]
 docs_list = [item for sublist in docs for item in sublist]
-# 分块
-splitter = RecursiveCharacterTextSplitter.from_tiktoken_encoder(chunk_size=100, chunk_overlap=50)
+# 分块：每个文档只分词一次，按Token偏移量切块
+splitter = TokenBudgetSplitter.from_tiktoken("cl100k_base", chunk_size=100, chunk_overlap=50)
 doc_splits = splitter.split_documents(docs_list)
 # 向量存储
 vectorstore = Chroma.from_documents(documents=doc_splits,
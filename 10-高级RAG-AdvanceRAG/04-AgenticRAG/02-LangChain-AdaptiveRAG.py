@@ -3,7 +3,9 @@ import getpass
 from typing import Literal, List
 from pprint import pprint
 
-from langchain.text_splitter import RecursiveCharacterTextSplitter
+import sys
+sys.path.append("02-文本切块-DocChunking")
+from token_splitter import TokenBudgetSplitter
 from langchain_community.document_loaders import WebBaseLoader
 from langchain_community.vectorstores import Chroma
 from langchain_openai import OpenAIEmbeddings, ChatOpenAI
@@ -40,7 +42,7 @@ urls = [
 # 2.3 加载并拆分文档
 docs = [WebBaseLoader(url).load() for url in urls]
 docs_list = [d for sub in docs for d in sub]
-splitter = RecursiveCharacterTextSplitter.from_tiktoken_encoder(chunk_size=500, chunk_overlap=0)
+splitter = TokenBudgetSplitter.from_tiktoken("cl100k_base", chunk_size=500, chunk_overlap=0)
 doc_splits = splitter.split_documents(docs_list)
 # 2.4 添加到 Chroma 向量存储
 vectorstore = Chroma.from_documents(documents=doc_splits, collection_name="rag-chroma", embedding=embd)
@@ -1,5 +1,9 @@
 import pandas as pd
 import os
+import sys
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), "../../../01-数据导入-DataLoading/05-表格数据读取"))
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), "../../../01-数据导入-DataLoading"))  # 共用的file_hashing模块
+from table_store import TableStore, read_extracted_csv
 
 # 定义要处理的CSV文件列表
 csv_files = [
@@ -23,4 +27,15 @@ with pd.ExcelWriter('billionaires_merged.xlsx', engine='openpyxl') as writer:
         # 将数据写入Excel的对应sheet
         df.to_excel(writer, sheet_name=sheet_name, index=False)
 
-print("CSV文件已成功合并到 billionaires_merged.xlsx") 
\ No newline at end of file
+print("CSV文件已成功合并到 billionaires_merged.xlsx")
+
+# 同时写入Parquet表格库：每张表一个Parquet文件，带列类型和来源信息，另有index.json列出所有表
+# 之后的程序直接以内存映射方式读取，不必再解析Excel
+store = TableStore("parquet/billionaires_tables")
+for csv_file in csv_files:
+    store.write_table(
+        os.path.splitext(csv_file)[0],
+        read_extracted_csv(csv_file),  # 跳过camelot写出的列序号行，用真正的表头作为列名
+        provenance={"source": csv_file, "pdf": "billionaires_page-1-5.pdf", "extractor": "camelot"},
+    )
+print(f"CSV文件已写入Parquet表格库 parquet/billionaires_tables，共 {len(store.table_names())} 张表")